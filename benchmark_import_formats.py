@@ -0,0 +1,86 @@
+"""
+Benchmark Script for student import formats
+Writes the same long-format registrar export (one row per student-course
+pair) as Excel, CSV and Parquet, then times reading and importing each
+into a temporary database through the same bulk pipeline.
+
+Usage: python benchmark_import_formats.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from src.database.db_manager import db_manager
+from src.utils.bulk_import import import_student_chunks, map_student_columns, STUDENT_COLUMN_MAP
+from src.utils.excel_reader import open_chunk_reader
+
+COURSES_PER_STUDENT = 5
+
+def build_export(rows):
+    """Build a long-format export with Turkish column names"""
+    student = pd.Series(range(rows)) // COURSES_PER_STUDENT
+    return pd.DataFrame({
+        "Öğrenci No": "S" + student.astype(str).str.zfill(7),
+        "Ad Soyad": "Student " + student.astype(str),
+        "Sınıf": (student % 4 + 1).astype(str) + ". Sınıf",
+        "Ders": "C" + ((pd.Series(range(rows)) * 7) % 300).astype(str).str.zfill(3),
+    })
+
+def setup_database(directory):
+    db_manager.db_path = os.path.join(directory, "benchmark.db")
+    if os.path.exists(db_manager.db_path):
+        os.remove(db_manager.db_path)
+    db_manager.initialize_database()
+    with db_manager.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (?, 1, ?, ?)
+        """, [(i + 1, f"C{i:03d}", f"Course {i}") for i in range(300)])
+
+def run_import(file_path):
+    """Return (read seconds, total seconds, result) for one file"""
+    keywords = list(STUDENT_COLUMN_MAP)
+    
+    start = time.perf_counter()
+    rows = sum(len(chunk) for chunk in open_chunk_reader(file_path, keywords))
+    read_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    chunks = map(map_student_columns, open_chunk_reader(file_path, keywords))
+    result = import_student_chunks(chunks, 1)
+    return read_seconds, time.perf_counter() - start, result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    directory = tempfile.mkdtemp()
+    export = build_export(rows)
+    
+    files = {
+        "xlsx": os.path.join(directory, "students.xlsx"),
+        "csv": os.path.join(directory, "students.csv"),
+        "parquet": os.path.join(directory, "students.parquet"),
+    }
+    export.to_excel(files["xlsx"], index=False)
+    export.to_csv(files["csv"], index=False)
+    try:
+        export.to_parquet(files["parquet"], index=False)
+    except ImportError:
+        del files["parquet"]
+        print("pyarrow not installed - skipping Parquet")
+    
+    print("=" * 70)
+    print(f"IMPORT FORMAT BENCHMARK - {rows} rows")
+    print("=" * 70)
+    print(f"{'Format':<10}{'Size (MB)':>12}{'Read (s)':>12}{'Import (s)':>12}{'Students':>12}")
+    
+    for name, file_path in files.items():
+        setup_database(directory)
+        read_seconds, total_seconds, result = run_import(file_path)
+        size = os.path.getsize(file_path) / (1024 * 1024)
+        print(f"{name:<10}{size:>12.1f}{read_seconds:>12.2f}{total_seconds:>12.2f}{result['imported']:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark Script for multi-room seating plan PDFs
+Seats one exam across many classrooms in a temporary database, then times
+the style setup with objects built per export (as before the shared PDF
+theme) against the cached theme, the page header and footer drawn on every
+page against the per-document form, and the full export. A 400-seat hall
+is then exported with the canvas layout renderer against the graphics
+Drawing renderer.
+
+Usage: python benchmark_pdf_exports.py [rooms]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfgen import canvas
+from reportlab.platypus import TableStyle
+from src.database.db_manager import db_manager
+from src.utils.pdf_export import export_seating_plan_pdf
+from src.utils.pdf_theme import page_decorator, paragraph_style, table_style
+from src.utils.seating import SeatingPlanGenerator
+
+STUDENTS_PER_ROOM = 12
+HALL_ROWS, HALL_COLS, HALL_STUDENTS = 20, 10, 380
+REPEATS = 20
+
+def setup_database(directory, rooms):
+    """Create one exam seated across the given number of rooms"""
+    db_manager.db_path = os.path.join(directory, "benchmark.db")
+    if os.path.exists(db_manager.db_path):
+        os.remove(db_manager.db_path)
+    db_manager.initialize_database()
+    with db_manager.transaction() as cursor:
+        cursor.execute("INSERT INTO courses (display_id, department_id, code, name) VALUES (1, 1, 'BEN101', 'Benchmark')")
+        course_id = cursor.lastrowid
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name)
+            VALUES (?, 1, ?, ?)
+        """, [(i + 1, f"B{i:06d}", f"Student {i}") for i in range(rooms * STUDENTS_PER_ROOM)])
+        cursor.execute("INSERT INTO student_courses (student_id, course_id) SELECT id, ? FROM students", (course_id,))
+        cursor.execute("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            VALUES (1, ?, 1, '2026-01-05', '09:00', 60)
+        """, (course_id,))
+        exam_id = cursor.lastrowid
+        for room in range(rooms):
+            cursor.execute("""
+                INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+                VALUES (?, 1, ?, ?, ?, 3, 2, 2)
+            """, (room + 1, f"B-{room:03d}", f"Room {room}", STUDENTS_PER_ROOM))
+            cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)",
+                           (exam_id, cursor.lastrowid))
+    SeatingPlanGenerator(exam_id).generate_seating()
+    return exam_id
+
+def setup_hall():
+    """Seat one more exam in a 400-seat hall (20x10 desks, 2 seats each)"""
+    with db_manager.transaction() as cursor:
+        cursor.execute("INSERT INTO courses (display_id, department_id, code, name) VALUES (2, 1, 'HAL101', 'Hall')")
+        course_id = cursor.lastrowid
+        first_display_id = cursor.execute("SELECT MAX(display_id) FROM students").fetchone()[0] + 1
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name)
+            VALUES (?, 1, ?, ?)
+        """, [(first_display_id + i, f"H{i:06d}", f"Hall Student {i}") for i in range(HALL_STUDENTS)])
+        cursor.execute("""
+            INSERT INTO student_courses (student_id, course_id)
+            SELECT id, ? FROM students WHERE student_no LIKE 'H%'
+        """, (course_id,))
+        cursor.execute("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            VALUES (2, ?, 1, '2026-01-06', '09:00', 60)
+        """, (course_id,))
+        exam_id = cursor.lastrowid
+        display_id = cursor.execute("SELECT MAX(display_id) FROM classrooms").fetchone()[0] + 1
+        cursor.execute("""
+            INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+            VALUES (?, 1, 'HALL', 'Main Hall', ?, ?, ?, 2)
+        """, (display_id, HALL_ROWS * HALL_COLS * 2, HALL_ROWS, HALL_COLS))
+        cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)",
+                       (exam_id, cursor.lastrowid))
+    SeatingPlanGenerator(exam_id).generate_seating()
+    return exam_id
+
+def best_of(func):
+    """Fastest of REPEATS runs in milliseconds"""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def styles_per_export(rooms):
+    """Style objects as the export built them before: sample sheet per export, styles per room"""
+    styles = getSampleStyleSheet()
+    ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=18,
+                   textColor=colors.HexColor('#2C3E50'), spaceAfter=20, alignment=1)
+    ParagraphStyle('InfoStyle', parent=styles['Normal'], fontSize=12, alignment=1)
+    for _ in range(rooms):
+        ParagraphStyle('ClassroomTitle', parent=styles['Heading2'], fontSize=14,
+                       textColor=colors.HexColor('#2C3E50'), spaceAfter=15, alignment=1)
+        TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ])
+
+def styles_from_theme(rooms):
+    """The same lookups against the cached theme"""
+    paragraph_style('PlanTitle')
+    paragraph_style('PlanInfo')
+    for _ in range(rooms):
+        paragraph_style('ClassroomTitle')
+        table_style()
+
+def decorate_pages(pages, use_form):
+    """Draw a header and footer on every page, either directly or through the document's form"""
+    footer, header = "Generated on 2026-01-05 09:00 | Benchmark", "BEN101 | 2026-01-05 09:00"
+    decorate = page_decorator(footer, header)
+    canv = canvas.Canvas(io.BytesIO(), pagesize=landscape(A4))
+    width, height = landscape(A4)
+    for _ in range(pages):
+        if use_form:
+            decorate(canv, None)
+        else:
+            canv.setFont("Helvetica", 8)
+            canv.setFillColor(colors.grey)
+            canv.drawString(30, 18, footer)
+            canv.drawRightString(width - 30, height - 24, header)
+        canv.showPage()
+    canv.save()
+
+def main():
+    rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    directory = tempfile.mkdtemp()
+    exam_id = setup_database(directory, rooms)
+    
+    output = io.BytesIO()
+    export_seating_plan_pdf(exam_id, output)
+    pages = output.getvalue().count(b"/Type /Page\n")
+    
+    print("=" * 70)
+    print(f"SEATING PLAN PDF BENCHMARK - {rooms} rooms, {pages} pages")
+    print("=" * 70)
+    print(f"{'Step':<28}{'Per export (ms)':>18}{'Shared (ms)':>14}{'Speedup':>10}")
+    
+    steps = [
+        ("Style setup", lambda: styles_per_export(rooms), lambda: styles_from_theme(rooms)),
+        ("Page header/footer", lambda: decorate_pages(pages, False), lambda: decorate_pages(pages, True)),
+    ]
+    for name, uncached, cached in steps:
+        before, after = best_of(uncached), best_of(cached)
+        print(f"{name:<28}{before:>18.2f}{after:>14.2f}{before / after:>9.1f}x")
+    
+    full = best_of(lambda: export_seating_plan_pdf(exam_id, io.BytesIO()))
+    print(f"{'Full export':<28}{'':>18}{full:>14.2f}")
+    
+    hall_exam_id = setup_hall()
+    print()
+    print(f"400-SEAT HALL - {HALL_STUDENTS} students")
+    print(f"{'Step':<28}{'Drawing (ms)':>18}{'Canvas (ms)':>14}{'Speedup':>10}")
+    drawing = best_of(lambda: export_seating_plan_pdf(hall_exam_id, io.BytesIO(), layout_renderer="drawing"))
+    direct = best_of(lambda: export_seating_plan_pdf(hall_exam_id, io.BytesIO(), layout_renderer="canvas"))
+    print(f"{'Seating plan export':<28}{drawing:>18.2f}{direct:>14.2f}{drawing / direct:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
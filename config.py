@@ -44,4 +44,9 @@ COLORS = {
 
 MAX_FILE_SIZE_MB = 10
 ALLOWED_EXCEL_EXTENSIONS = [".xlsx", ".xls"]
+IMPORT_CHUNK_SIZE = 5000
+MAX_CLASS_LEVEL = 6
+
+EXPORT_CACHE_DIR = os.path.join("cache", "exports")
+EXPORT_CACHE_MAX_MB = 200
 
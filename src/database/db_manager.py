@@ -3,10 +3,15 @@ Database Manager - Enhanced with display_id support and CASCADE deletes
 """
 
 import sqlite3
-from typing import Optional, List, Tuple, Any
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Any, Iterator
 import bcrypt
 from config import DATABASE_PATH, DEFAULT_ADMIN
 
+# Tables whose changes are counted in data_versions under the table name
+VERSIONED_TABLES = ('departments', 'classrooms', 'courses', 'students', 'student_courses',
+                    'exams', 'exam_classrooms', 'exam_seating')
+
 class DatabaseManager:
 
     def __init__(self):
@@ -39,6 +44,30 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def iter_query(self, query: str, params: tuple = (), batch_size: int = 1000) -> Iterator[sqlite3.Row]:
+        """
+        Execute a SELECT query and yield its rows without loading them all
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+            batch_size: Rows fetched from the cursor at a time
+        
+        Yields:
+            Rows, one at a time; the connection closes when the generator ends
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+    
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """
         Execute an INSERT, UPDATE, or DELETE query
@@ -79,6 +108,25 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Run several statements on one connection as a single transaction
+        
+        Yields:
+            Cursor - committed when the block finishes, rolled back on error
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            yield cursor
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     def initialize_database(self):
         """Create database schema and seed initial data"""
         conn = self.get_connection()
@@ -87,6 +135,10 @@ class DatabaseManager:
             
             self._create_tables(cursor)
             
+            self._migrate_columns(cursor)
+            
+            self._backfill_slot_index(cursor)
+            
             self._create_triggers(cursor)
             
             cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
@@ -148,6 +200,8 @@ class DatabaseManager:
                 rows INTEGER NOT NULL,
                 cols INTEGER NOT NULL,
                 seats_per_desk INTEGER DEFAULT 1,
+                seat_pattern TEXT DEFAULT 'all',
+                seat_mask BLOB,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (department_id) REFERENCES departments(id) ON DELETE CASCADE,
                 UNIQUE(department_id, code)
@@ -179,6 +233,7 @@ class DatabaseManager:
                 student_no TEXT UNIQUE NOT NULL,
                 name TEXT NOT NULL,
                 class_level INTEGER,
+                import_hash INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (department_id) REFERENCES departments(id) ON DELETE CASCADE
             )
@@ -241,6 +296,26 @@ class DatabaseManager:
             )
         """)
         
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS exam_slot_students (
+                exam_id INTEGER NOT NULL,
+                student_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                FOREIGN KEY (exam_id) REFERENCES exams(id) ON DELETE CASCADE,
+                FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+                PRIMARY KEY (exam_id, student_id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_display_id ON users(display_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_no ON students(student_no)")
@@ -252,6 +327,36 @@ class DatabaseManager:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_exams_date ON exams(date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_exams_display_id ON exams(display_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_deleted_ids_table ON deleted_ids(table_name, display_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_exam_slot_students_slot ON exam_slot_students(date, start_time, student_id)")
+    
+    def _migrate_columns(self, cursor: sqlite3.Cursor):
+        """Add columns introduced after a database was first created"""
+        
+        new_columns = [
+            ("classrooms", "seat_pattern", "TEXT DEFAULT 'all'"),
+            ("classrooms", "seat_mask", "BLOB"),
+            ("students", "import_hash", "INTEGER"),
+        ]
+        
+        for table_name, column_name, column_type in new_columns:
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            columns = [col[1] for col in cursor.fetchall()]
+            if column_name not in columns:
+                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+    
+    def _backfill_slot_index(self, cursor: sqlite3.Cursor):
+        """Fill the exam slot index for schedules saved before it existed"""
+        
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM exam_slot_students)")
+        if cursor.fetchone()[0]:
+            return
+        
+        cursor.execute("""
+            INSERT OR IGNORE INTO exam_slot_students (exam_id, student_id, date, start_time)
+            SELECT e.id, sc.student_id, e.date, e.start_time
+            FROM exams e
+            JOIN student_courses sc ON sc.course_id = e.course_id
+        """)
     
     def _create_triggers(self, cursor: sqlite3.Cursor):
         """Create triggers for automatic display_id management"""
@@ -309,6 +414,31 @@ class DatabaseManager:
                 VALUES ('exams', OLD.display_id);
             END
         """)
+        
+        # Per-table change counters: the lookup cache and the export cache compare
+        # these versions to know when data derived from a table is stale.
+        # Dropped first so older databases pick up changed trigger definitions.
+        # The counter rows are created up front so the per-row trigger is a plain
+        # primary key UPDATE, which keeps bulk imports fast.
+        for table_name in VERSIONED_TABLES:
+            cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)", (table_name,))
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                trigger_name = f"bump_{table_name}_after_{event.lower()}"
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+                cursor.execute(f"""
+                    CREATE TRIGGER {trigger_name}
+                    AFTER {event} ON {table_name}
+                    BEGIN
+                        UPDATE data_versions SET version = version + 1 WHERE name = '{table_name}';
+                    END
+                """)
+        
+        # Random per-database stamp, so version numbers of a recreated database
+        # never match cache entries built from the old one
+        cursor.execute("""
+            INSERT OR IGNORE INTO data_versions (name, version)
+            VALUES ('database', abs(random()))
+        """)
     
     def get_next_display_id(self, table_name: str, department_id: Optional[int] = None) -> int:
         """
@@ -354,6 +484,46 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def allocate_display_ids(self, cursor: sqlite3.Cursor, table_name: str, count: int) -> List[int]:
+        """
+        Reserve several display_ids at once inside an open transaction.
+        Deleted IDs are reused first, the rest continue after the current max.
+        
+        Args:
+            cursor: Cursor of the transaction that will insert the rows
+            table_name: Name of the table
+            count: Number of display_ids needed
+            
+        Returns:
+            List of display_ids, in the order they should be assigned
+        """
+        if count <= 0:
+            return []
+        
+        cursor.execute("""
+            SELECT display_id FROM deleted_ids
+            WHERE table_name = ?
+            ORDER BY display_id ASC
+            LIMIT ?
+        """, (table_name, count))
+        recycled = [row[0] for row in cursor.fetchall()]
+        
+        if recycled:
+            cursor.execute("""
+                DELETE FROM deleted_ids
+                WHERE table_name = ? AND display_id <= ?
+            """, (table_name, recycled[-1]))
+        
+        cursor.execute(f"SELECT COALESCE(MAX(display_id), 0) FROM {table_name}")
+        next_id = max([cursor.fetchone()[0]] + recycled) + 1
+        
+        return recycled + list(range(next_id, next_id + count - len(recycled)))
+    
+    def get_version(self, name: str) -> int:
+        """Current value of a named data version (0 if never bumped)"""
+        rows = self.execute_query("SELECT version FROM data_versions WHERE name = ?", (name,))
+        return rows[0]['version'] if rows else 0
+    
     def _create_default_admin(self, cursor: sqlite3.Cursor):
         """Create default admin user and departments with coordinators"""
         
@@ -11,6 +11,8 @@ from PyQt6.QtGui import QColor
 from src.database.db_manager import db_manager
 from src.utils.auth import get_current_user
 from src.utils.styles import Styles, apply_shadow, configure_table_widget
+from src.utils.seat_masks import (SEAT_PATTERNS, DEFAULT_PATTERN, build_seat_mask,
+                                  pack_seat_mask, effective_capacity)
 from config import COLORS
 
 class ClassroomsView(QWidget):
@@ -142,7 +144,7 @@ class ClassroomsView(QWidget):
         
         query = f"""
             SELECT c.id, c.display_id, c.code, c.name, c.capacity, c.rows, c.cols, c.seats_per_desk,
-                   c.department_id, d.name as department_name, d.code as department_code
+                   c.seat_pattern, c.seat_mask, c.department_id, d.name as department_name, d.code as department_code
             FROM classrooms c
             LEFT JOIN departments d ON c.department_id = d.id
             {dept_filter}
@@ -180,7 +182,13 @@ class ClassroomsView(QWidget):
                 self.table.setItem(row, col_idx, QTableWidgetItem(f"{dept_name} ({dept_code})"))
                 col_idx += 1
             
-            self.table.setItem(row, col_idx, QTableWidgetItem(str(classroom['capacity'])))
+            usable = effective_capacity(classroom)
+            capacity_text = str(classroom['capacity'])
+            if usable != classroom['capacity']:
+                capacity_text = f"{usable} ({classroom['capacity']})"
+            capacity_item = QTableWidgetItem(capacity_text)
+            capacity_item.setToolTip(SEAT_PATTERNS.get(classroom['seat_pattern'] or DEFAULT_PATTERN, ""))
+            self.table.setItem(row, col_idx, capacity_item)
             col_idx += 1
             self.table.setItem(row, col_idx, QTableWidgetItem(str(classroom['rows'])))
             col_idx += 1
@@ -344,6 +352,13 @@ class ClassroomDialog(QDialog):
         self.seats_input.valueChanged.connect(self.update_preview)
         form_layout.addRow("Masa Başına Kişi:", self.seats_input)
         
+        self.pattern_combo = QComboBox()
+        self.pattern_combo.setStyleSheet(Styles.COMBO_BOX)
+        for pattern, label in SEAT_PATTERNS.items():
+            self.pattern_combo.addItem(label, pattern)
+        self.pattern_combo.currentIndexChanged.connect(self.update_preview)
+        form_layout.addRow("Oturma Düzeni:", self.pattern_combo)
+        
         self.capacity_input = QLineEdit()
         self.capacity_input.setReadOnly(True)
         self.capacity_input.setStyleSheet(Styles.LINE_EDIT)
@@ -392,6 +407,9 @@ class ClassroomDialog(QDialog):
             self.rows_input.setValue(self.classroom_data['rows'])
             self.cols_input.setValue(self.classroom_data['cols'])
             self.seats_input.setValue(self.classroom_data['seats_per_desk'])
+            pattern_index = self.pattern_combo.findData(self.classroom_data.get('seat_pattern') or DEFAULT_PATTERN)
+            if pattern_index >= 0:
+                self.pattern_combo.setCurrentIndex(pattern_index)
             if self.dept_combo and 'department_id' in self.classroom_data:
                 index = self.dept_combo.findData(self.classroom_data['department_id'])
                 if index >= 0:
@@ -411,7 +429,12 @@ class ClassroomDialog(QDialog):
         seats_per_desk = self.seats_input.value()
         
         capacity = rows * cols * seats_per_desk
-        self.capacity_input.setText(str(capacity))
+        seat_mask = build_seat_mask(rows, cols, seats_per_desk, self.pattern_combo.currentData())
+        usable = int(seat_mask.sum())
+        if usable != capacity:
+            self.capacity_input.setText(f"{usable} / {capacity}")
+        else:
+            self.capacity_input.setText(str(capacity))
         
         max_preview_rows = min(rows, 15)
         max_preview_cols = min(cols, 15)
@@ -426,6 +449,8 @@ class ClassroomDialog(QDialog):
                     QColor(255, 243, 224),  
                 ]
                 bg_color = colors[group_index]
+                if not seat_mask[r, c].any():
+                    bg_color = QColor(213, 219, 219)
                 
                 desk = QFrame()
                 desk.setFixedSize(35, 35)
@@ -461,6 +486,8 @@ class ClassroomDialog(QDialog):
         cols = self.cols_input.value()
         seats = self.seats_input.value()
         capacity = rows * cols * seats
+        seat_pattern = self.pattern_combo.currentData()
+        seat_mask = pack_seat_mask(build_seat_mask(rows, cols, seats, seat_pattern))
         
         if not name:
             QMessageBox.warning(self, "Validation Error", "Classroom name cannot be empty")
@@ -480,18 +507,22 @@ class ClassroomDialog(QDialog):
             if self.is_edit:
                 query = """
                     UPDATE classrooms
-                    SET department_id = ?, code = ?, name = ?, capacity = ?, rows = ?, cols = ?, seats_per_desk = ?
+                    SET department_id = ?, code = ?, name = ?, capacity = ?, rows = ?, cols = ?, seats_per_desk = ?,
+                        seat_pattern = ?, seat_mask = ?
                     WHERE id = ?
                 """
-                db_manager.execute_update(query, (dept_id, code, name, capacity, rows, cols, seats, self.classroom_data['id']))
+                db_manager.execute_update(query, (dept_id, code, name, capacity, rows, cols, seats,
+                                                  seat_pattern, seat_mask, self.classroom_data['id']))
                 QMessageBox.information(self, "Success", "Classroom updated successfully!")
             else:
                 display_id = db_manager.get_next_display_id('classrooms')
                 query = """
-                    INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk,
+                                            seat_pattern, seat_mask)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """
-                db_manager.execute_update(query, (display_id, dept_id, code, name, capacity, rows, cols, seats))
+                db_manager.execute_update(query, (display_id, dept_id, code, name, capacity, rows, cols, seats,
+                                                  seat_pattern, seat_mask))
                 QMessageBox.information(self, "Success", "Classroom added successfully!")
             
             self.accept()
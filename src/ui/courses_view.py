@@ -6,9 +6,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
                              QFileDialog, QMessageBox, QProgressDialog, QComboBox, QLineEdit, QDialog)
 from PyQt6.QtCore import Qt
+import itertools
 import pandas as pd
-import re
 from src.database.db_manager import db_manager
+from src.utils.bulk_import import import_course_chunks, iter_course_sections
+from src.utils.excel_reader import open_chunk_reader
+from src.utils.background_jobs import BackgroundJob, run_with_progress
 from src.utils.auth import get_current_user
 from src.utils.styles import Styles, configure_table_widget
 from config import ALLOWED_EXCEL_EXTENSIONS
@@ -16,6 +19,34 @@ from config import ALLOWED_EXCEL_EXTENSIONS
 class CoursesView(QWidget):
     """Courses management view with Excel import"""
     
+    COLUMN_MAP = {
+        # Turkish variants
+        'DERS KODU': 'code',
+        'Ders Kodu': 'code',
+        'ders kodu': 'code',
+        'DERS ADI': 'name',
+        'Ders Adı': 'name',
+        'ders adı': 'name',
+        'DERSİN ADI': 'name',
+        'Dersin Adı': 'name',
+        'dersin adı': 'name',
+        'DERSİ VEREN ÖĞR. ELEMANI': 'instructor',
+        'Dersi Veren Öğr. Elemanı': 'instructor',
+        'dersi veren öğr. elemanı': 'instructor',
+        'Öğretim Elemanı': 'instructor',
+        'öğretim elemanı': 'instructor',
+        # English variants
+        'COURSE CODE': 'code',
+        'Course Code': 'code',
+        'course code': 'code',
+        'COURSE NAME': 'name',
+        'Course Name': 'name',
+        'course name': 'name',
+        'INSTRUCTOR': 'instructor',
+        'Instructor': 'instructor',
+        'instructor': 'instructor',
+    }
+    
     def __init__(self):
         super().__init__()
         self.all_courses = []  
@@ -220,44 +251,13 @@ class CoursesView(QWidget):
         
         self.populate_table(filtered)
     
-    def _normalize_turkish_courses(self, df):
-        """Normalize course format to standard format
-        Handles hierarchical structure where class level and course type are indicated
-        by section header rows (e.g., "2. Class", "ELECTIVE COURSE")
-        """
-        column_map = {
-            # Turkish variants
-            'DERS KODU': 'code',
-            'Ders Kodu': 'code',
-            'ders kodu': 'code',
-            'DERS ADI': 'name',
-            'Ders Adı': 'name',
-            'ders adı': 'name',
-            'DERSİN ADI': 'name',
-            'Dersin Adı': 'name',
-            'dersin adı': 'name',
-            'DERSİ VEREN ÖĞR. ELEMANI': 'instructor',
-            'Dersi Veren Öğr. Elemanı': 'instructor',
-            'dersi veren öğr. elemanı': 'instructor',
-            'Öğretim Elemanı': 'instructor',
-            'öğretim elemanı': 'instructor',
-            # English variants
-            'COURSE CODE': 'code',
-            'Course Code': 'code',
-            'course code': 'code',
-            'COURSE NAME': 'name',
-            'Course Name': 'name',
-            'course name': 'name',
-            'INSTRUCTOR': 'instructor',
-            'Instructor': 'instructor',
-            'instructor': 'instructor',
-        }
-        
+    def _map_course_columns(self, df):
+        """Rename Turkish or English catalogue columns to code, name and instructor"""
         new_columns = {}
         for col in df.columns:
             col_str = str(col).strip()
-            if col_str in column_map:
-                new_columns[col] = column_map[col_str]
+            if col_str in self.COLUMN_MAP:
+                new_columns[col] = self.COLUMN_MAP[col_str]
         
         df = df.rename(columns=new_columns)
         
@@ -266,83 +266,55 @@ class CoursesView(QWidget):
             if unnamed_cols:
                 df = df.rename(columns={unnamed_cols[0]: 'name'})
         
-        if 'code' not in df.columns:
-            return df
-        
-        current_class_level = 1  
-        current_course_type = None  
-        
-        processed_rows = []
+        return df
+    
+    def _normalize_turkish_courses(self, chunks):
+        """Normalize course chunks to standard format
+        Handles hierarchical structure where class level and course type are indicated
+        by section header rows (e.g., "2. Class", "ELECTIVE COURSE")
+        """
+        chunks = map(self._map_course_columns, chunks)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            return iter(())
         
-        for idx, row in df.iterrows():
-            code_value = str(row['code']).strip() if pd.notna(row['code']) else ''
-            name_value = str(row['name']).strip() if 'name' in row and pd.notna(row.get('name')) else ''
-            
-            # Check for class level indicators (Turkish and English)
-            if any(keyword in code_value for keyword in ['Sınıf', 'SINIF', 'sınıf', 'Class', 'CLASS', 'class']):
-                match = re.search(r'(\d+)', code_value)
-                if match:
-                    current_class_level = int(match.group(1))
-                    current_course_type = None  
-                continue  
-            
-            # Check for elective course indicators (Turkish and English)
-            if any(keyword in code_value for keyword in ['SEÇMELİ', 'SEÇİMLİK', 'SEÇ', 'ELECTIVE', 'Elective', 'elective']):
-                current_course_type = 'elective'
-                continue  
-            
-            # Check for course code header
-            if any(keyword in code_value for keyword in ['DERS KODU', 'Ders Kodu', 'COURSE CODE', 'Course Code']):
-                continue  
-            
-            # Check for mandatory course indicators (Turkish and English)
-            if any(keyword in code_value for keyword in ['ZORUNLU', 'Zorunlu', 'MANDATORY', 'Mandatory', 'mandatory']):
-                current_course_type = 'mandatory'
-                continue  
-            
-            if code_value and code_value not in ['', 'nan', 'NaN']:
-                new_row = row.copy()
-                new_row['class_level'] = current_class_level
-                
-                if current_course_type is None:
-                    new_row['type'] = 'mandatory'
-                else:
-                    new_row['type'] = current_course_type
-                
-                if name_value and name_value not in ['', 'nan', 'NaN']:
-                    processed_rows.append(new_row)
+        chunks = itertools.chain([first_chunk], chunks)
+        if 'code' not in first_chunk.columns:
+            return chunks
         
-        if processed_rows:
-            result_df = pd.DataFrame(processed_rows)
-            result_df = result_df.reset_index(drop=True)
-            return result_df
-        else:
-            return pd.DataFrame(columns=['code', 'name', 'instructor', 'class_level', 'type'])
+        return iter_course_sections(chunks)
     
     def import_from_excel(self):
-        """Import courses from Excel file"""
+        """Import courses from an Excel, CSV or Parquet file"""
         file_path, _ = QFileDialog.getOpenFileName(
             self,
-            "Select Excel File",
+            "Select Import File",
             "",
-            "Excel Files (*.xlsx *.xls)"
+            "Data Files (*.xlsx *.xls *.csv *.parquet);;Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;Parquet Files (*.parquet)"
         )
         
         if not file_path:
             return
         
         try:
-            df = pd.read_excel(file_path)
-            
-            if any('Sınıf' in str(col) for col in df.columns):
-                df = pd.read_excel(file_path, header=1)
-                df = self._normalize_turkish_courses(df)
+            reader = open_chunk_reader(file_path, list(self.COLUMN_MAP) + ['code', 'name'])
+            chunks = iter(reader)
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                QMessageBox.warning(self, "Empty File", "The selected file contains no course rows.")
+                return
             
-            elif 'DERS KODU' in df.columns or 'Ders Kodu' in df.columns:
-                df = self._normalize_turkish_courses(df)
+            chunks = itertools.chain([first_chunk], chunks)
+            if any(self.COLUMN_MAP.get(str(col).strip()) == 'code' for col in first_chunk.columns):
+                chunks = self._normalize_turkish_courses(chunks)
+                first_chunk = next(chunks, None)
+                if first_chunk is None:
+                    QMessageBox.warning(self, "Empty File", "The selected file contains no course rows.")
+                    return
+                chunks = itertools.chain([first_chunk], chunks)
             
             required_columns = ['code', 'name']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in required_columns if col not in first_chunk.columns]
             
             if missing_columns:
                 QMessageBox.warning(
@@ -371,69 +343,39 @@ class CoursesView(QWidget):
                     return
                 selected_dept_id = dept_map[item]
             
-            progress = QProgressDialog("Importing courses...", "Cancel", 0, len(df), self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            
-            imported_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
-                if progress.wasCanceled():
-                    break
-                
-                try:
-                    code = str(row['code']).strip()
-                    name = str(row['name']).strip()
-                    instructor = str(row.get('instructor', '')).strip() if pd.notna(row.get('instructor')) else None
-                    class_level = int(row.get('class_level', 0)) if pd.notna(row.get('class_level')) else None
-                    course_type = str(row.get('type', '')).strip().lower() if pd.notna(row.get('type')) else None
-                    
-                    if course_type and course_type not in ['mandatory', 'elective']:
-                        course_type = None
-                    
-                    check_query = "SELECT id FROM courses WHERE department_id = ? AND code = ?"
-                    existing = db_manager.execute_query(check_query, (selected_dept_id, code))
-                    
-                    if existing:
-                        query = """
-                            UPDATE courses
-                            SET name = ?, instructor = ?, class_level = ?, type = ?
-                            WHERE department_id = ? AND code = ?
-                        """
-                        db_manager.execute_update(query, (
-                            name, instructor, class_level, course_type, selected_dept_id, code
-                        ))
-                    else:
-                        display_id = db_manager.get_next_display_id('courses')
-                        query = """
-                            INSERT INTO courses (display_id, department_id, code, name, instructor, class_level, type)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """
-                        db_manager.execute_update(query, (
-                            display_id, selected_dept_id, code, name, instructor, class_level, course_type
-                        ))
-                    
-                    imported_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {index + 2}: {str(e)}")
-                
-                progress.setValue(index + 1)
-            
-            progress.close()
-            
-            message = f"Successfully imported {imported_count} courses."
-            if errors:
-                message += f"\n\nErrors encountered:\n" + "\n".join(errors[:10])
-                if len(errors) > 10:
-                    message += f"\n... and {len(errors) - 10} more errors"
+            def run_import(job):
+                return import_course_chunks(
+                    chunks, selected_dept_id,
+                    progress_callback=lambda _rows: job.report_progress(reader.rows_read, reader.total_rows)
+                )
             
-            QMessageBox.information(self, "Import Complete", message)
-            self.load_courses()
+            job = BackgroundJob(run_import)
+            job.signals.finished.connect(self._show_import_result)
+            job.signals.failed.connect(
+                lambda error: QMessageBox.critical(self, "Import Error", f"Failed to import Excel file:\n{error}")
+            )
+            job.signals.cancelled.connect(
+                lambda: QMessageBox.information(self, "Import Cancelled", "Import cancelled. No courses were changed.")
+            )
+            run_with_progress(self, "Importing courses...", job)
             
         except Exception as e:
             QMessageBox.critical(self, "Import Error", f"Failed to import Excel file:\n{str(e)}")
     
+    def _show_import_result(self, result):
+        """Report a finished import and reload the table"""
+        imported_count = result['imported']
+        errors = result['errors']
+        
+        message = f"Successfully imported {imported_count} courses."
+        if errors:
+            message += f"\n\nErrors encountered:\n" + "\n".join(errors[:10])
+            if len(errors) > 10:
+                message += f"\n... and {len(errors) - 10} more errors"
+        
+        QMessageBox.information(self, "Import Complete", message)
+        self.load_courses()
+    
     def toggle_course_status(self):
         """Toggle course active/inactive status"""
         row = self.table.currentRow()
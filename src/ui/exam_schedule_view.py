@@ -5,15 +5,19 @@ Exam Schedule View - Generate and view exam schedules
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
                              QDialog, QFormLayout, QDateEdit, QSpinBox, QCheckBox,
-                             QMessageBox, QFrame, QGridLayout, QComboBox, QFileDialog)
+                             QMessageBox, QFrame, QGridLayout, QComboBox, QFileDialog,
+                             QTabWidget, QLineEdit, QStackedWidget)
 from PyQt6.QtCore import Qt, QDate
 from datetime import datetime
 from src.database.db_manager import db_manager
 from src.utils.auth import get_current_user
 from src.utils.scheduler import ExamScheduler
+from src.utils.schedule_audit import audit_schedule
+from src.utils.schedule_feeds import export_schedule_feed, FEED_FORMATS
+from src.utils.background_jobs import run_export
+from src.utils.excel_export import export_exam_schedule_to_excmanual, export_combined_schedule_to_excmanual
 from src.utils.styles import Styles, configure_table_widget
 from config import COLORS, DEFAULT_EXAM_DURATION, DEFAULT_BREAK_TIME
-import pandas as pd
 
 class ExamScheduleView(QWidget):
     """Exam scheduling view"""
@@ -65,6 +69,18 @@ class ExamScheduleView(QWidget):
         export_excel_btn.clicked.connect(self.export_to_excel)
         top_bar.addWidget(export_excel_btn)
         
+        feed_btn = QPushButton("📅 Export Calendar Feed")
+        feed_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        feed_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        feed_btn.clicked.connect(self.export_feed)
+        top_bar.addWidget(feed_btn)
+        
+        audit_btn = QPushButton("🩺 Audit Schedule")
+        audit_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        audit_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        audit_btn.clicked.connect(self.audit_schedule)
+        top_bar.addWidget(audit_btn)
+        
         refresh_btn = QPushButton("🔄 Refresh")
         refresh_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
         refresh_btn.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -130,12 +146,18 @@ class ExamScheduleView(QWidget):
             params = (user['department_id'],)
         
         query = f"""
+            WITH enrollment_counts AS (
+                SELECT course_id, COUNT(*) as students
+                FROM student_courses
+                GROUP BY course_id
+            )
             SELECT e.*, c.code as course_code, c.name as course_name,
                    GROUP_CONCAT(cl.name, ', ') as classroom_names,
-                   (SELECT COUNT(*) FROM student_courses sc WHERE sc.course_id = e.course_id) as student_count,
+                   COALESCE(en.students, 0) as student_count,
                    d.name as department_name, d.code as department_code
             FROM exams e
             JOIN courses c ON e.course_id = c.id
+            LEFT JOIN enrollment_counts en ON en.course_id = e.course_id
             LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
             LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
             LEFT JOIN departments d ON e.department_id = d.id
@@ -280,64 +302,30 @@ class ExamScheduleView(QWidget):
             self.load_schedule()
     
     def export_to_excel(self):
-        """Export schedule to Excel"""
+        """Export schedule to Excel in the background"""
         user = get_current_user()
         if not user:
             return
         
         if user['role'] == 'admin':
-            dept_filter = ""
-            params = ()
+            department_id = self.dept_filter.currentData()
         else:
-            dept_filter = "WHERE e.department_id = ?"
-            params = (user['department_id'],)
-        
-        query = f"""
-            SELECT e.date, e.start_time, c.code as course_code, c.name as course_name,
-                   e.duration, e.exam_type,
-                   (SELECT COUNT(*) FROM student_courses sc WHERE sc.course_id = e.course_id) as students,
-                   GROUP_CONCAT(cl.name, ', ') as classrooms
-            FROM exams e
-            JOIN courses c ON e.course_id = c.id
-            LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
-            LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
-            {dept_filter}
-            GROUP BY e.id
-            ORDER BY e.date, e.start_time
-        """
+            department_id = user['department_id']
         
-        exams = db_manager.execute_query(query, params)
+        if department_id is None:
+            exams = db_manager.execute_query("SELECT 1 FROM exams LIMIT 1")
+        else:
+            exams = db_manager.execute_query("SELECT 1 FROM exams WHERE department_id = ? LIMIT 1", (department_id,))
         
         if not exams:
             QMessageBox.warning(self, "No Data", "No exam schedule to export")
             return
         
-        data = []
-        for exam in exams:
-            exam_type = exam['exam_type'] if 'exam_type' in exam.keys() else 'final'
-            exam_type_display = {
-                'final': 'Final Exam',
-                'midterm': 'Midterm Exam',
-                'resit': 'Resit Exam'
-            }.get(exam_type, 'Final Exam')
-            
-            data.append({
-                'Date': exam['date'],
-                'Time': exam['start_time'],
-                'Course Code': exam['course_code'],
-                'Course Name': exam['course_name'],
-                'Exam Type': exam_type_display,
-                'Duration (min)': exam['duration'],
-                'Students': exam['students'],
-                'Classrooms': exam['classrooms'] or 'N/A'
-            })
-        
-        df = pd.DataFrame(data)
-        
-        if user['role'] == 'admin':
+        if department_id is None:
             dept_code = 'all'
         else:
-            dept_code = user.get('department_code', 'dept')
+            dept = db_manager.execute_query("SELECT code FROM departments WHERE id = ?", (department_id,))
+            dept_code = dept[0]['code'] if dept else 'dept'
         
         default_filename = f"exam_schedule_{dept_code}_{datetime.now().strftime('%Y%m%d')}.xlsx"
         
@@ -354,11 +342,91 @@ class ExamScheduleView(QWidget):
         if not file_path.lower().endswith('.xlsx'):
             file_path += '.xlsx'
         
+        if department_id is None:
+            # All departments: one sheet per department in a single workbook
+            export = lambda path, job: export_combined_schedule_to_excmanual(
+                path, progress_callback=job.report_progress
+            )
+        else:
+            export = lambda path, job: export_exam_schedule_to_excmanual(
+                department_id, path, progress_callback=job.report_progress
+            )
+        
+        run_export(self, "Exporting exam schedule...", export, file_path)
+    
+    def export_feed(self):
+        """Stream the schedule of a department, room or student as iCalendar or NDJSON"""
+        user = get_current_user()
+        if not user:
+            return
+        
+        if user['role'] == 'admin':
+            department_id = self.dept_filter.currentData()
+        else:
+            department_id = user['department_id']
+        
+        dialog = ScheduleFeedDialog(self, department_id)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        options = dialog.get_options()
+        
+        if options['scope'] == 'student':
+            student = db_manager.execute_query(
+                "SELECT id, department_id FROM students WHERE student_no = ?", (options['student_no'],)
+            )
+            if not student or (department_id is not None and student[0]['department_id'] != department_id):
+                QMessageBox.warning(self, "Not Found", f"No student with number {options['student_no']}")
+                return
+        
+        feed_format = options['format']
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Schedule Feed",
+            f"exam_schedule_{options['name']}.{feed_format}",
+            f"{FEED_FORMATS[feed_format]};;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        if not file_path.lower().endswith(f'.{feed_format}'):
+            file_path += f'.{feed_format}'
+        
+        filters = {'department_id': department_id}
+        if options['scope'] == 'classroom':
+            filters = {'classroom_id': options['classroom_id']}
+        elif options['scope'] == 'student':
+            filters = {'student_id': student[0]['id']}
+        
+        run_export(self, "Exporting schedule feed...", lambda path, job: export_schedule_feed(
+            path, feed_format, calendar_name=f"Exam Schedule - {options['name']}",
+            progress_callback=lambda done: job.report_progress(done, 0, f"{done} exams written..."),
+            **filters
+        ), file_path)
+    
+    def audit_schedule(self):
+        """Audit the saved schedule for clashes and capacity problems"""
+        user = get_current_user()
+        if not user:
+            return
+        
+        if user['role'] == 'admin':
+            department_id = self.dept_filter.currentData() if hasattr(self, 'dept_filter') else None
+        else:
+            department_id = user['department_id']
+        
         try:
-            df.to_excel(file_path, index=False)
-            QMessageBox.information(self, "Export Successful", f"Schedule exported to:\n{file_path}")
+            report = audit_schedule(department_id)
         except Exception as e:
-            QMessageBox.critical(self, "Export Failed", f"Failed to export schedule:\n{str(e)}")
+            QMessageBox.critical(self, "Audit Failed", f"Failed to audit schedule:\n{str(e)}")
+            return
+        
+        if report['exam_count'] == 0:
+            QMessageBox.warning(self, "No Data", "No exam schedule to audit")
+            return
+        
+        dialog = ScheduleAuditDialog(self, report)
+        dialog.exec()
     
     def clear_schedule(self):
         """Clear all scheduled exams"""
@@ -383,6 +451,185 @@ class ExamScheduleView(QWidget):
                 db_manager.execute_update("DELETE FROM exams WHERE department_id = ?", (user['department_id'],))
             self.load_schedule()
 
+class ScheduleAuditDialog(QDialog):
+    """Dialog showing the result of a whole-schedule audit"""
+    
+    def __init__(self, parent=None, report=None):
+        super().__init__(parent)
+        self.report = report
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the UI"""
+        self.setWindowTitle("Schedule Audit")
+        self.setMinimumSize(900, 600)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(20)
+        
+        problems = (len(self.report['student_clashes']) + len(self.report['room_conflicts']) +
+                    len(self.report['capacity_shortfalls']))
+        
+        if problems:
+            summary_text = f"⚠️ {problems} problems found in {self.report['exam_count']} exams"
+        else:
+            summary_text = f"✅ No clashes or capacity problems in {self.report['exam_count']} exams"
+        
+        summary = QLabel(summary_text)
+        summary.setStyleSheet(Styles.SUBTITLE_LABEL)
+        layout.addWidget(summary)
+        
+        tabs = QTabWidget()
+        
+        tabs.addTab(self.create_table(
+            ["Date", "Time", "Student No", "Name", "Courses"],
+            [[c['date'], c['start_time'], c['student_no'], c['name'], ", ".join(c['courses'])]
+             for c in self.report['student_clashes']]
+        ), f"Student Clashes ({len(self.report['student_clashes'])})")
+        
+        tabs.addTab(self.create_table(
+            ["Date", "Time", "Classroom", "Courses"],
+            [[r['date'], r['start_time'], r['classroom'], ", ".join(r['courses'])]
+             for r in self.report['room_conflicts']]
+        ), f"Double-Booked Rooms ({len(self.report['room_conflicts'])})")
+        
+        tabs.addTab(self.create_table(
+            ["Date", "Time", "Course Code", "Course Name", "Students", "Capacity"],
+            [[c['date'], c['start_time'], c['course_code'], c['course_name'], c['students'], c['capacity']]
+             for c in self.report['capacity_shortfalls']]
+        ), f"Capacity Shortfalls ({len(self.report['capacity_shortfalls'])})")
+        
+        tabs.addTab(self.create_table(
+            ["Date", "Student No", "Name", "Exams", "Courses"],
+            [[d['date'], d['student_no'], d['name'], d['exam_count'], ", ".join(d['courses'])]
+             for d in self.report['heavy_days']]
+        ), f"3+ Exams a Day ({len(self.report['heavy_days'])})")
+        
+        layout.addWidget(tabs)
+        
+        close_btn = QPushButton("Close")
+        close_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+    
+    def create_table(self, headers, rows) -> QTableWidget:
+        """Create a read-only table for one audit section"""
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setStyleSheet(Styles.TABLE_WIDGET)
+        
+        configure_table_widget(table, min_row_height=36, min_total_height=350)
+        
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row_idx, row in enumerate(rows):
+            for col_idx, value in enumerate(row):
+                table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+        table.setSortingEnabled(True)
+        
+        return table
+
+class ScheduleFeedDialog(QDialog):
+    """Dialog to choose the format and scope of a schedule feed"""
+    
+    def __init__(self, parent, department_id=None):
+        super().__init__(parent)
+        self.department_id = department_id
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the UI"""
+        self.setWindowTitle("Export Calendar Feed")
+        self.setMinimumWidth(450)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(20)
+        
+        form_layout = QFormLayout()
+        form_layout.setSpacing(15)
+        
+        self.format_combo = QComboBox()
+        self.format_combo.setStyleSheet(Styles.COMBO_BOX)
+        for feed_format, label in FEED_FORMATS.items():
+            self.format_combo.addItem(label, feed_format)
+        form_layout.addRow("Format:", self.format_combo)
+        
+        self.scope_combo = QComboBox()
+        self.scope_combo.setStyleSheet(Styles.COMBO_BOX)
+        self.scope_combo.addItem("Whole Department" if self.department_id else "All Departments", "department")
+        self.scope_combo.addItem("One Classroom", "classroom")
+        self.scope_combo.addItem("One Student", "student")
+        form_layout.addRow("Schedule Of:", self.scope_combo)
+        
+        self.target_stack = QStackedWidget()
+        self.target_stack.addWidget(QWidget())
+        
+        self.classroom_combo = QComboBox()
+        self.classroom_combo.setStyleSheet(Styles.COMBO_BOX)
+        if self.department_id is None:
+            classrooms = db_manager.execute_query("SELECT id, code, name FROM classrooms ORDER BY name")
+        else:
+            classrooms = db_manager.execute_query(
+                "SELECT id, code, name FROM classrooms WHERE department_id = ? ORDER BY name", (self.department_id,)
+            )
+        self.classroom_codes = {}
+        for classroom in classrooms:
+            self.classroom_combo.addItem(f"{classroom['name']} ({classroom['code']})", classroom['id'])
+            self.classroom_codes[classroom['id']] = classroom['code']
+        self.target_stack.addWidget(self.classroom_combo)
+        
+        self.student_input = QLineEdit()
+        self.student_input.setPlaceholderText("Student No")
+        self.student_input.setStyleSheet(Styles.LINE_EDIT)
+        self.target_stack.addWidget(self.student_input)
+        
+        self.scope_combo.currentIndexChanged.connect(self.target_stack.setCurrentIndex)
+        form_layout.addRow("", self.target_stack)
+        
+        layout.addLayout(form_layout)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        export_btn = QPushButton("Export")
+        export_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        export_btn.clicked.connect(self.validate_and_accept)
+        button_layout.addWidget(export_btn)
+        
+        layout.addLayout(button_layout)
+    
+    def validate_and_accept(self):
+        """Require a classroom or student number for the narrower scopes"""
+        scope = self.scope_combo.currentData()
+        if scope == 'classroom' and self.classroom_combo.currentData() is None:
+            QMessageBox.warning(self, "Validation Error", "No classroom to export")
+            return
+        if scope == 'student' and not self.student_input.text().strip():
+            QMessageBox.warning(self, "Validation Error", "Please enter a student number")
+            return
+        self.accept()
+    
+    def get_options(self):
+        """Return format, scope, the chosen classroom or student and a file name part"""
+        scope = self.scope_combo.currentData()
+        options = {"format": self.format_combo.currentData(), "scope": scope, "name": "all"}
+        if scope == 'classroom':
+            options["classroom_id"] = self.classroom_combo.currentData()
+            options["name"] = self.classroom_codes[options["classroom_id"]]
+        elif scope == 'student':
+            options["student_no"] = self.student_input.text().strip()
+            options["name"] = options["student_no"]
+        elif self.department_id is not None:
+            department = db_manager.execute_query("SELECT code FROM departments WHERE id = ?", (self.department_id,))
+            options["name"] = department[0]['code'] if department else "department"
+        return options
+
 class ScheduleConfigDialog(QDialog):
     """Dialog for configuring exam schedule generation"""
     
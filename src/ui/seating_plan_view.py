@@ -5,14 +5,20 @@ Seating Plan View - Generate and visualize seating arrangements
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
                              QComboBox, QMessageBox, QDialog, QGridLayout, QFrame,
-                             QScrollArea, QFileDialog)
-from PyQt6.QtCore import Qt
+                             QScrollArea, QFileDialog, QFormLayout, QDateEdit, QCheckBox)
+from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QFont
 from src.database.db_manager import db_manager
 from src.utils.auth import get_current_user
-from src.utils.seating import SeatingPlanGenerator
+from src.utils.seating import SeatingPlanGenerator, load_exam_seating
+from src.utils.seat_masks import effective_capacity, get_seat_mask
+from src.utils.clash_index import get_exam_clashes
 from src.utils.styles import Styles, configure_table_widget
 from src.utils.pdf_export import export_seating_plan_pdf
+from src.utils.excel_export import export_seating_plan_to_excmanual
+from src.utils.batch_export import export_all_seating_plans, find_seated_exams
+from src.utils.door_lists import exam_date_range, export_door_lists
+from src.utils.background_jobs import run_export
 from config import COLORS
 
 class SeatingPlanView(QWidget):
@@ -58,6 +64,12 @@ class SeatingPlanView(QWidget):
         generate_btn.clicked.connect(self.generate_seating)
         action_bar.addWidget(generate_btn)
         
+        update_btn = QPushButton("🔁 Update for Enrollment")
+        update_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        update_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        update_btn.clicked.connect(self.update_seating)
+        action_bar.addWidget(update_btn)
+        
         view_btn = QPushButton("👁️ View Layout")
         view_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
         view_btn.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -70,6 +82,24 @@ class SeatingPlanView(QWidget):
         export_btn.clicked.connect(self.export_to_pdf)
         action_bar.addWidget(export_btn)
         
+        export_excel_btn = QPushButton("📊 Export to Excel")
+        export_excel_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        export_excel_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        export_excel_btn.clicked.connect(self.export_to_excel)
+        action_bar.addWidget(export_excel_btn)
+        
+        export_all_btn = QPushButton("📦 Export All")
+        export_all_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        export_all_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        export_all_btn.clicked.connect(self.export_all_plans)
+        action_bar.addWidget(export_all_btn)
+        
+        door_lists_btn = QPushButton("🚪 Door Lists")
+        door_lists_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        door_lists_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        door_lists_btn.clicked.connect(self.export_door_lists)
+        action_bar.addWidget(door_lists_btn)
+        
         layout.addLayout(action_bar)
         
         self.table = QTableWidget()
@@ -156,23 +186,15 @@ class SeatingPlanView(QWidget):
         self.table.setColumnCount(len(headers))
         self.table.setHorizontalHeaderLabels(headers)
         
-        query = """
-            SELECT s.student_no, s.name, cl.name as classroom_name, 
-                   es.row, es.col, es.seat_position,
-                   d.name as department_name, d.code as department_code
-            FROM exam_seating es
-            JOIN students s ON es.student_id = s.id
-            JOIN classrooms cl ON es.classroom_id = cl.id
-            LEFT JOIN departments d ON s.department_id = d.id
-            WHERE es.exam_id = ?
-            ORDER BY cl.name, es.row, es.col, es.seat_position
-        """
-        
-        seating = db_manager.execute_query(query, (self.current_exam_id,))
+        seating = [
+            (classroom['name'], seat)
+            for classroom in load_exam_seating(self.current_exam_id)
+            for seat in classroom['seats']
+        ]
         
         self.table.setRowCount(len(seating))
         
-        for row, seat in enumerate(seating):
+        for row, (classroom_name, seat) in enumerate(seating):
             col_idx = 0
             self.table.setItem(row, col_idx, QTableWidgetItem(seat['student_no']))
             col_idx += 1
@@ -185,7 +207,7 @@ class SeatingPlanView(QWidget):
                 self.table.setItem(row, col_idx, QTableWidgetItem(f"{dept_name} ({dept_code})"))
                 col_idx += 1
             
-            self.table.setItem(row, col_idx, QTableWidgetItem(seat['classroom_name']))
+            self.table.setItem(row, col_idx, QTableWidgetItem(classroom_name))
             col_idx += 1
             self.table.setItem(row, col_idx, QTableWidgetItem(f"Row {seat['row'] + 1}"))
             col_idx += 1
@@ -233,13 +255,15 @@ class SeatingPlanView(QWidget):
             return
         
         classrooms_query = """
-            SELECT cl.*, 
-                   (cl.rows * cl.cols * cl.seats_per_desk) as capacity
+            SELECT cl.*
             FROM classrooms cl
             JOIN exam_classrooms ec ON cl.id = ec.classroom_id
             WHERE ec.exam_id = ?
         """
-        classrooms = list(db_manager.execute_query(classrooms_query, (self.current_exam_id,)))
+        classrooms = [
+            dict(cl, capacity=effective_capacity(cl))
+            for cl in db_manager.execute_query(classrooms_query, (self.current_exam_id,))
+        ]
         
         if not classrooms:
             QMessageBox.warning(
@@ -265,18 +289,7 @@ class SeatingPlanView(QWidget):
             )
             return
         
-        conflicts_query = """
-            SELECT s.student_no, s.name, 
-                   GROUP_CONCAT(c.code || ' - ' || c.name, ', ') as courses
-            FROM students s
-            JOIN student_courses sc ON s.id = sc.student_id
-            JOIN courses c ON sc.course_id = c.id
-            JOIN exams e ON c.id = e.course_id
-            WHERE e.date = ? AND e.start_time = ? AND e.id != ?
-            GROUP BY s.id, s.student_no, s.name
-            HAVING COUNT(DISTINCT e.id) > 1
-        """
-        conflicts = list(db_manager.execute_query(conflicts_query, (exam['date'], exam['start_time'], self.current_exam_id)))
+        conflicts = get_exam_clashes(self.current_exam_id)
         
         if conflicts:
             conflict_list = "\n".join([f"  • {c['student_no']} - {c['name']}: {c['courses']}" for c in conflicts[:5]])
@@ -335,26 +348,61 @@ class SeatingPlanView(QWidget):
                     f"❌ Error occurred while creating seating plan:\n\n{str(e)}"
                 )
     
+    def update_seating(self):
+        """Apply late enrollment changes to the existing seating plan"""
+        if not self.current_exam_id:
+            QMessageBox.warning(self, "No Exam", "Please select an exam first")
+            return
+        
+        seated = db_manager.execute_query(
+            "SELECT COUNT(*) as count FROM exam_seating WHERE exam_id = ?",
+            (self.current_exam_id,)
+        )
+        if not seated or seated[0]['count'] == 0:
+            QMessageBox.warning(
+                self,
+                "No Seating Plan",
+                "❌ This exam has no seating plan yet.\n\nPlease generate the seating plan first."
+            )
+            return
+        
+        try:
+            generator = SeatingPlanGenerator(self.current_exam_id)
+            result = generator.sync_with_enrollment()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"❌ Error occurred while updating seating plan:\n\n{str(e)}")
+            return
+        
+        if not result['added'] and not result['removed'] and not result['unplaced']:
+            QMessageBox.information(self, "Up to Date", "✅ Seating plan already matches the enrollment.")
+            return
+        
+        message = (
+            f"✅ Seating plan updated!\n\n"
+            f"Students placed: {len(result['added'])}\n"
+            f"Seats freed: {len(result['removed'])}\n\n"
+            f"All other students keep their seats."
+        )
+        if result['unplaced']:
+            message += f"\n\n⚠️ {len(result['unplaced'])} students could not be placed: no free seats left."
+        
+        QMessageBox.information(self, "Seating Updated", message)
+        self.load_seating()
+    
     def view_layout(self):
         """View classroom layout with seating"""
         if not self.current_exam_id:
             QMessageBox.warning(self, "No Exam", "Please select an exam first")
             return
         
-        query = """
-            SELECT cl.id, cl.name
-            FROM classrooms cl
-            JOIN exam_classrooms ec ON cl.id = ec.classroom_id
-            WHERE ec.exam_id = ?
-        """
-        classrooms = db_manager.execute_query(query, (self.current_exam_id,))
+        classrooms = load_exam_seating(self.current_exam_id)
         
         if not classrooms:
             QMessageBox.warning(self, "No Classrooms", "No classrooms assigned to this exam")
             return
         
         for classroom in classrooms:
-            dialog = SeatingLayoutDialog(self, self.current_exam_id, classroom['id'], classroom['name'])
+            dialog = SeatingLayoutDialog(self, self.current_exam_id, classroom['id'], classroom['name'], classroom)
             dialog.exec()
     
     def export_to_pdf(self):
@@ -388,20 +436,215 @@ class SeatingPlanView(QWidget):
         if not file_path.lower().endswith('.pdf'):
             file_path += '.pdf'
         
-        try:
-            filename = export_seating_plan_pdf(self.current_exam_id, file_path)
-            QMessageBox.information(self, "Success", f"Seating plan exported to:\n{filename}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export PDF:\n{str(e)}")
+        exam_id = self.current_exam_id
+        run_export(self, "Exporting seating plan PDF...", lambda path, job: export_seating_plan_pdf(
+            exam_id, path, progress_callback=lambda page: job.report_progress(page, 0, f"Rendering page {page}...")
+        ), file_path)
+    
+    def export_to_excel(self):
+        """Export seating plan to Excel"""
+        if not self.current_exam_id:
+            QMessageBox.warning(self, "No Exam", "Please select an exam first")
+            return
+        
+        exam = db_manager.execute_query(
+            "SELECT c.code, e.date, e.start_time FROM exams e JOIN courses c ON e.course_id = c.id WHERE e.id = ?",
+            (self.current_exam_id,)
+        )
+        
+        default_filename = "seating_plan.xlsx"
+        if exam:
+            course_code = exam[0]['code'].replace('/', '_').replace('\\', '_')
+            exam_date = exam[0]['date'].replace('-', '_')
+            exam_time = exam[0]['start_time'].replace(':', '-')
+            default_filename = f"seating_plan_{course_code}_{exam_date}_{exam_time}.xlsx"
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Seating Plan Excel",
+            default_filename,
+            "Excel Files (*.xlsx);;All Files (*)"
+        )
+        
+        if not file_path:  
+            return
+        
+        if not file_path.lower().endswith('.xlsx'):
+            file_path += '.xlsx'
+        
+        exam_id = self.current_exam_id
+        run_export(self, "Exporting seating plan Excel...", lambda path, job: export_seating_plan_to_excmanual(
+            exam_id, path, progress_callback=job.report_progress
+        ), file_path)
+
+    def export_all_plans(self):
+        """Export the PDF and Excel seating plans of many exams into one ZIP"""
+        user = get_current_user()
+        if not user:
+            return
+        
+        department_id = None if user['role'] == 'admin' else user['department_id']
+        exams = find_seated_exams(department_id)
+        if not exams:
+            QMessageBox.warning(self, "No Data", "No seating plans have been generated yet")
+            return
+        
+        dialog = BatchExportDialog(self, user['role'] == 'admin', exams[0]['date'], exams[-1]['date'])
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        options = dialog.get_options()
+        if department_id is not None:
+            options['department_id'] = department_id
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Seating Plans",
+            f"seating_plans_{options['start_date'] or 'all'}.zip",
+            "ZIP Archives (*.zip);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        if not file_path.lower().endswith('.zip'):
+            file_path += '.zip'
+        
+        def ready_message(result):
+            message = f"{result['exported']} seating plans exported to:\n{file_path}"
+            if result['errors']:
+                message += f"\n\n{len(result['errors'])} exams failed:\n" + "\n".join(result['errors'][:10])
+            return message
+        
+        run_export(self, "Exporting seating plans...", lambda path, job: export_all_seating_plans(
+            path, progress_callback=job.report_progress, **options
+        ), file_path, ready_message)
+    
+    def export_door_lists(self):
+        """Export alphabetical door lists of every exam in a period as PDF and Excel in one ZIP"""
+        user = get_current_user()
+        if not user:
+            return
+        
+        department_id = None if user['role'] == 'admin' else user['department_id']
+        period = exam_date_range(department_id)
+        if not period:
+            QMessageBox.warning(self, "No Data", "No exams have been scheduled yet")
+            return
+        
+        dialog = BatchExportDialog(self, user['role'] == 'admin', *period, title="Export Door Lists")
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        options = dialog.get_options()
+        if department_id is not None:
+            options['department_id'] = department_id
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Door Lists",
+            f"door_lists_{options['start_date'] or 'all'}.zip",
+            "ZIP Archives (*.zip);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        if not file_path.lower().endswith('.zip'):
+            file_path += '.zip'
+        
+        def ready_message(result):
+            return f"Door lists of {result['exams']} exams ({result['ranges']} ranges) exported to:\n{file_path}"
+        
+        run_export(self, "Exporting door lists...", lambda path, job: export_door_lists(
+            path, progress_callback=job.report_progress, **options
+        ), file_path, ready_message)
+
+class BatchExportDialog(QDialog):
+    """Dialog to choose which exams are exported together"""
+    
+    def __init__(self, parent, is_admin: bool, first_date: str, last_date: str,
+                 title: str = "Export All Seating Plans"):
+        super().__init__(parent)
+        self.is_admin = is_admin
+        self.first_date = first_date
+        self.last_date = last_date
+        self.title = title
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the UI"""
+        self.setWindowTitle(self.title)
+        self.setMinimumWidth(450)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(20)
+        
+        form_layout = QFormLayout()
+        form_layout.setSpacing(15)
+        
+        if self.is_admin:
+            self.dept_combo = QComboBox()
+            self.dept_combo.setStyleSheet(Styles.COMBO_BOX)
+            self.dept_combo.addItem("All Departments", None)
+            for dept in db_manager.execute_query("SELECT id, name, code FROM departments ORDER BY name"):
+                self.dept_combo.addItem(f"{dept['name']} ({dept['code']})", dept['id'])
+            form_layout.addRow("Department:", self.dept_combo)
+        
+        self.range_checkbox = QCheckBox("Only exams in a date range")
+        self.range_checkbox.setStyleSheet(Styles.NORMAL_LABEL)
+        form_layout.addRow(self.range_checkbox)
+        
+        self.start_date_input = QDateEdit()
+        self.start_date_input.setCalendarPopup(True)
+        self.start_date_input.setDate(QDate.fromString(self.first_date, "yyyy-MM-dd"))
+        form_layout.addRow("Start Date:", self.start_date_input)
+        
+        self.end_date_input = QDateEdit()
+        self.end_date_input.setCalendarPopup(True)
+        self.end_date_input.setDate(QDate.fromString(self.last_date, "yyyy-MM-dd"))
+        form_layout.addRow("End Date:", self.end_date_input)
+        
+        for date_input in (self.start_date_input, self.end_date_input):
+            date_input.setEnabled(False)
+            self.range_checkbox.toggled.connect(date_input.setEnabled)
+        
+        layout.addLayout(form_layout)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        export_btn = QPushButton("Export")
+        export_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        export_btn.clicked.connect(self.accept)
+        button_layout.addWidget(export_btn)
+        
+        layout.addLayout(button_layout)
+    
+    def get_options(self):
+        """Return department and date filters for export_all_seating_plans and export_door_lists"""
+        options = {
+            "department_id": self.dept_combo.currentData() if self.is_admin else None,
+            "start_date": None,
+            "end_date": None
+        }
+        if self.range_checkbox.isChecked():
+            options["start_date"] = self.start_date_input.date().toString("yyyy-MM-dd")
+            options["end_date"] = self.end_date_input.date().toString("yyyy-MM-dd")
+        return options
 
 class SeatingLayoutDialog(QDialog):
     """Dialog showing visual classroom layout"""
     
-    def __init__(self, parent=None, exam_id=None, classroom_id=None, classroom_name=None):
+    def __init__(self, parent=None, exam_id=None, classroom_id=None, classroom_name=None, classroom_data=None):
         super().__init__(parent)
         self.exam_id = exam_id
         self.classroom_id = classroom_id
         self.classroom_name = classroom_name
+        self.classroom_data = classroom_data
         self.init_ui()
         
     def init_ui(self):
@@ -424,14 +667,17 @@ class SeatingLayoutDialog(QDialog):
         grid_layout = QGridLayout(grid_widget)
         grid_layout.setSpacing(10)
         
-        generator = SeatingPlanGenerator(self.exam_id)
-        classroom_data = generator.get_seating_by_classroom(self.classroom_id)
+        classroom_data = self.classroom_data
+        if classroom_data is None:
+            generator = SeatingPlanGenerator(self.exam_id)
+            classroom_data = generator.get_seating_by_classroom(self.classroom_id)
         
         if classroom_data:
             grid = classroom_data['seating_grid']
             rows = classroom_data['rows']
             cols = classroom_data['cols']
             seats_per_desk = classroom_data['seats_per_desk']
+            seat_mask = get_seat_mask(classroom_data)
             
             for row in range(rows):
                 for col in range(cols):
@@ -462,6 +708,17 @@ class SeatingLayoutDialog(QDialog):
                                     font-size: 11px;
                                 }}
                             """)
+                        elif not seat_mask[row, col, seat_pos - 1]:
+                            seat_label = QLabel("—")
+                            seat_label.setStyleSheet(f"""
+                                QLabel {{
+                                    background-color: {COLORS['border']};
+                                    color: {COLORS['text_light']};
+                                    padding: 8px;
+                                    border-radius: 4px;
+                                    font-size: 11px;
+                                }}
+                            """)
                         else:
                             seat_label = QLabel("Empty")
                             seat_label.setStyleSheet(f"""
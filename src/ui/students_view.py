@@ -3,17 +3,54 @@ from src.utils.auth import get_current_user
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
-                             QFileDialog, QMessageBox, QProgressDialog, QLineEdit, QComboBox, QDialog)
+                             QFileDialog, QMessageBox, QProgressDialog, QLineEdit, QComboBox, QDialog,
+                             QTabWidget, QCheckBox, QStackedWidget)
+import itertools
 import pandas as pd
 from src.utils.styles import Styles, configure_table_widget
 from src.database.db_manager import db_manager
+from src.utils.bulk_import import (plan_student_import, apply_student_import, plan_has_changes,
+                                   map_student_columns, STUDENT_COLUMN_MAP)
+from src.utils.excel_reader import open_chunk_reader
+from src.utils.import_validator import StudentImportValidator, write_error_report
+from src.utils.background_jobs import BackgroundJob, run_with_progress, run_export
+from src.utils.enrollments import add_enrollments, remove_enrollments, move_enrollments
+from src.utils.exam_cards import export_exam_cards
+
+def format_unresolved_codes(unresolved_codes, limit=10):
+    """Summarise unknown course codes as "CODE (count)", most frequent first"""
+    parts = [f"{code} ({count})" for code, count in list(unresolved_codes.items())[:limit]]
+    if len(unresolved_codes) > limit:
+        parts.append(f"... and {len(unresolved_codes) - limit} more")
+    return ", ".join(parts)
+
+
+def save_validation_report(parent, report):
+    """Ask for a path and save an import validation report there"""
+    file_path, _ = QFileDialog.getSaveFileName(
+        parent,
+        "Save Error Report",
+        "import_errors.xlsx",
+        "Excel Files (*.xlsx);;CSV Files (*.csv)"
+    )
+    if not file_path:
+        return
+    
+    try:
+        write_error_report(report, file_path)
+        QMessageBox.information(parent, "Report Saved", f"Error report saved to:\n{file_path}")
+    except Exception as e:
+        QMessageBox.critical(parent, "Save Error", f"Failed to save error report:\n{str(e)}")
+
 
 class StudentsView(QWidget):
+    COLUMN_MAP = STUDENT_COLUMN_MAP
+    
     def __init__(self):
         super().__init__()
         self.all_students = []  
         self.init_ui()
-        
+    
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 30, 30, 30)
@@ -88,6 +125,18 @@ class StudentsView(QWidget):
         view_details_btn.clicked.connect(self.view_student_details)
         action_bar.addWidget(view_details_btn)
         
+        enrollments_btn = QPushButton("📝 Edit Enrollments")
+        enrollments_btn.setStyleSheet(Styles.PRIMARY_BUTTON)
+        enrollments_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        enrollments_btn.clicked.connect(self.edit_enrollments)
+        action_bar.addWidget(enrollments_btn)
+        
+        cards_btn = QPushButton("🪪 Exam Cards")
+        cards_btn.setStyleSheet(Styles.PRIMARY_BUTTON)
+        cards_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        cards_btn.clicked.connect(self.export_cards)
+        action_bar.addWidget(cards_btn)
+        
         delete_btn = QPushButton("🗑️ Delete Selected")
         delete_btn.setStyleSheet(Styles.DANGER_BUTTON)
         delete_btn.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -192,96 +241,36 @@ class StudentsView(QWidget):
         
         self.display_students(filtered)
     
-    def _normalize_turkish_students(self, df):
-        """Normalize Turkish or English student format to standard format
-        Long format: one row per student-course pair
-        Need to convert to wide format: one row per student with all courses
-        """
-        column_map = {
-            # Turkish variants
-            'Öğrenci No': 'student_no',
-            'öğrenci no': 'student_no',
-            'ÖĞRENCI NO': 'student_no',
-            'Ad Soyad': 'name',
-            'ad soyad': 'name',
-            'AD SOYAD': 'name',
-            'İsim': 'name',
-            'isim': 'name',
-            'Sınıf': 'class_level_str',
-            'sınıf': 'class_level_str',
-            'SINIF': 'class_level_str',
-            'Ders': 'course_code',
-            'ders': 'course_code',
-            'DERS': 'course_code',
-            'Ders Kodu': 'course_code',
-            'ders kodu': 'course_code',
-            # English variants
-            'Student No': 'student_no',
-            'student no': 'student_no',
-            'STUDENT NO': 'student_no',
-            'Full Name': 'name',
-            'full name': 'name',
-            'Name': 'name',
-            'name': 'name',
-            'Class': 'class_level_str',
-            'class': 'class_level_str',
-            'CLASS': 'class_level_str',
-            'Course': 'course_code',
-            'course': 'course_code',
-            'COURSE': 'course_code',
-            'Course Code': 'course_code',
-            'course code': 'course_code',
-        }
-        
-        new_columns = {}
-        for col in df.columns:
-            col_str = str(col).strip()
-            if col_str in column_map:
-                new_columns[col] = column_map[col_str]
-        
-        df = df.rename(columns=new_columns)
-        
-        df = df.dropna(how='all')
-        
-        if 'student_no' in df.columns and 'course_code' in df.columns:
-            if 'class_level_str' in df.columns:
-                df['class_level'] = df['class_level_str'].astype(str).str.extract(r'(\d+)')[0]
-                df['class_level'] = pd.to_numeric(df['class_level'], errors='coerce')
-            
-            grouped = df.groupby(['student_no', 'name']).agg({
-                'class_level': 'first',  
-                'course_code': lambda x: ','.join(x.dropna().astype(str))  
-            }).reset_index()
-            
-            grouped = grouped.rename(columns={'course_code': 'course_codes'})
-            
-            return grouped
-        
-        return df
-    
     def import_from_excel(self):
-        """Import students from Excel file"""
+        """Import students from an Excel, CSV or Parquet file"""
         file_path, _ = QFileDialog.getOpenFileName(
             self,
-            "Select Excel File",
+            "Select Import File",
             "",
-            "Excel Files (*.xlsx *.xls)"
+            "Data Files (*.xlsx *.xls *.csv *.parquet);;Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;Parquet Files (*.parquet)"
         )
         
         if not file_path:
             return
         
         try:
-            df = pd.read_excel(file_path)
+            reader = open_chunk_reader(file_path, list(self.COLUMN_MAP) + ['student_no', 'course_codes'])
+            chunks = iter(reader)
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                QMessageBox.warning(self, "Empty File", "The selected file contains no student rows.")
+                return
             
             # Check for both Turkish and English column formats
             format_columns = ['Öğrenci No', 'Ad Soyad', 'Sınıf', 'Ders', 
                             'Student No', 'Full Name', 'Class', 'Course']
-            if any(col in df.columns for col in format_columns):
-                df = self._normalize_turkish_students(df)
+            if any(col in first_chunk.columns for col in format_columns):
+                first_chunk = map_student_columns(first_chunk)
+                chunks = map(map_student_columns, chunks)
+            chunks = itertools.chain([first_chunk], chunks)
             
             required_columns = ['student_no', 'name']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in required_columns if col not in first_chunk.columns]
             
             if missing_columns:
                 QMessageBox.warning(
@@ -310,82 +299,90 @@ class StudentsView(QWidget):
                     return
                 selected_dept_id = dept_map[item]
             
-            progress = QProgressDialog("Importing students...", "Cancel", 0, len(df), self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
+            course_dept_id = None if user['role'] == 'admin' else user['department_id']
             
-            imported_count = 0
-            errors = []
+            validator = StudentImportValidator(selected_dept_id, course_dept_id)
             
-            for index, row in df.iterrows():
-                if progress.wasCanceled():
-                    break
-                
-                try:
-                    student_no = str(row['student_no']).strip()
-                    name = str(row['name']).strip()
-                    class_level = int(row.get('class_level', 0)) if pd.notna(row.get('class_level')) else None
-                    course_codes_str = str(row.get('course_codes', '')).strip() if pd.notna(row.get('course_codes')) else ""
-                    
-                    check_query = "SELECT id FROM students WHERE student_no = ?"
-                    existing = db_manager.execute_query(check_query, (student_no,))
-                    
-                    if existing:
-                        query = """
-                            UPDATE students
-                            SET name = ?, class_level = ?
-                            WHERE student_no = ?
-                        """
-                        db_manager.execute_update(query, (name, class_level, student_no))
-                        student_id = existing[0]['id']
-                    else:
-                        display_id = db_manager.get_next_display_id('students')
-                        query = """
-                            INSERT INTO students (display_id, department_id, student_no, name, class_level)
-                            VALUES (?, ?, ?, ?, ?)
-                        """
-                        student_id = db_manager.execute_update(query, (
-                            display_id, selected_dept_id, student_no, name, class_level
-                        ))
-                    
-                    if course_codes_str and student_id:
-                        course_codes = [c.strip() for c in course_codes_str.split(',') if c.strip()]
-                        
-                        for course_code in course_codes:
-                            if user['role'] == 'admin':
-                                course_query = "SELECT id FROM courses WHERE code = ?"
-                                course_result = db_manager.execute_query(course_query, (course_code,))
-                            else:
-                                course_query = "SELECT id FROM courses WHERE code = ? AND department_id = ?"
-                                course_result = db_manager.execute_query(course_query, (course_code, user['department_id']))
-                            
-                            if course_result:
-                                enroll_query = """
-                                    INSERT OR IGNORE INTO student_courses (student_id, course_id)
-                                    VALUES (?, ?)
-                                """
-                                db_manager.execute_update(enroll_query, (student_id, course_result[0]['id']))
-                    
-                    imported_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {index + 2}: {str(e)}")
-                
-                progress.setValue(index + 1)
-            
-            progress.close()
+            def validated_chunks():
+                for chunk in chunks:
+                    validator.add_chunk(chunk)
+                    yield chunk
             
-            message = f"Successfully imported {imported_count} students."
-            if errors:
-                message += f"\n\nErrors encountered:\n" + "\n".join(errors[:10])
-                if len(errors) > 10:
-                    message += f"\n... and {len(errors) - 10} more errors"
+            def run_plan(job):
+                plan = plan_student_import(
+                    validated_chunks(), selected_dept_id, course_dept_id,
+                    progress_callback=lambda _rows: job.report_progress(reader.rows_read, reader.total_rows)
+                )
+                job.report_progress(reader.rows_read, reader.total_rows, "Validating rows...")
+                plan['validation'] = validator.report()
+                return plan
             
-            QMessageBox.information(self, "Import Complete", message)
-            self.load_students()
+            job = BackgroundJob(run_plan)
+            job.signals.finished.connect(self._review_import_plan)
+            job.signals.failed.connect(
+                lambda error: QMessageBox.critical(self, "Import Error", f"Failed to import Excel file:\n{error}")
+            )
+            job.signals.cancelled.connect(
+                lambda: QMessageBox.information(self, "Import Cancelled", "Import cancelled. No students were changed.")
+            )
+            run_with_progress(self, "Comparing students with the database...", job)
             
         except Exception as e:
             QMessageBox.critical(self, "Import Error", f"Failed to import Excel file:\n{str(e)}")
     
+    def _review_import_plan(self, plan):
+        """Show the import diff and apply it once confirmed"""
+        if not plan_has_changes(plan):
+            message = f"No changes: all {len(plan['unchanged'])} students are already up to date."
+            if len(plan['removed']):
+                message += f"\n{len(plan['removed'])} students of this department are not in the file."
+            if len(plan['validation']):
+                message += f"\n{len(plan['validation'])} validation issues were found."
+                reply = QMessageBox.question(
+                    self, "Import Complete", message + "\n\nSave the error report?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                if reply == QMessageBox.StandardButton.Yes:
+                    save_validation_report(self, plan['validation'])
+                return
+            QMessageBox.information(self, "Import Complete", message)
+            return
+        
+        dialog = ImportDiffDialog(self, plan)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        
+        job = BackgroundJob(lambda job: apply_student_import(
+            plan, progress_callback=lambda done: job.report_progress(done, len(plan['added']) + len(plan['changed']))
+        ))
+        job.signals.finished.connect(self._show_import_result)
+        job.signals.failed.connect(
+            lambda error: QMessageBox.critical(self, "Import Error", f"Failed to import students:\n{error}")
+        )
+        job.signals.cancelled.connect(
+            lambda: QMessageBox.information(self, "Import Cancelled", "Import cancelled. No students were changed.")
+        )
+        run_with_progress(self, "Importing students...", job)
+    
+    def _show_import_result(self, result):
+        """Report a finished import and reload the table"""
+        imported_count = result['imported']
+        errors = result['errors']
+        
+        message = (f"Successfully imported {imported_count} students: {result['added']} added, "
+                   f"{result['changed']} changed, {result['unchanged']} unchanged.\n"
+                   f"Enrollments: {result['enrollments_added']} added, {result['enrollments_removed']} removed.")
+        if result['skipped_enrollments']:
+            message += (f"\n{result['skipped_enrollments']} enrollments skipped for unknown course codes: "
+                        f"{format_unresolved_codes(result['unresolved_codes'])}")
+        if errors:
+            message += f"\n\nErrors encountered:\n" + "\n".join(errors[:10])
+            if len(errors) > 10:
+                message += f"\n... and {len(errors) - 10} more errors"
+        
+        QMessageBox.information(self, "Import Complete", message)
+        self.load_students()
+    
     def delete_student(self):
         """Delete selected student"""
         row = self.table.currentRow()
@@ -437,6 +434,95 @@ class StudentsView(QWidget):
             self.all_students = []
             self.load_students()
     
+    def selected_student_ids(self):
+        """IDs of all students selected in the table"""
+        return [self.table.item(index.row(), 0).data(Qt.ItemDataRole.UserRole)
+                for index in self.table.selectionModel().selectedRows()]
+    
+    def edit_enrollments(self):
+        """Add, remove or move enrollments of the selected students in one go"""
+        student_ids = self.selected_student_ids()
+        if not student_ids:
+            QMessageBox.warning(self, "No Selection", "Please select one or more students")
+            return
+        
+        user = get_current_user()
+        if user['role'] == 'admin':
+            dept_id = self.dept_filter.currentData() if hasattr(self, 'dept_filter') else None
+        else:
+            dept_id = user['department_id']
+        
+        query = """
+            SELECT c.id, c.code, c.name, d.code as department_code,
+                   COUNT(sc.student_id) as student_count
+            FROM courses c
+            LEFT JOIN departments d ON c.department_id = d.id
+            LEFT JOIN student_courses sc ON sc.course_id = c.id
+        """
+        params = ()
+        if dept_id is not None:
+            query += " WHERE c.department_id = ?"
+            params = (dept_id,)
+        query += " GROUP BY c.id, c.code, c.name, d.code ORDER BY c.code"
+        courses = list(db_manager.execute_query(query, params))
+        
+        if not courses:
+            QMessageBox.warning(self, "No Courses", "There are no courses to enroll students in")
+            return
+        
+        dialog = BulkEnrollmentDialog(self, len(student_ids), courses)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        
+        operation = dialog.get_operation()
+        try:
+            if operation['action'] == 'add':
+                count = add_enrollments(student_ids, operation['course_ids'])
+                message = f"{count} enrollments added."
+            elif operation['action'] == 'remove':
+                count = remove_enrollments(student_ids, operation['course_ids'])
+                message = f"{count} enrollments removed."
+            else:
+                count = move_enrollments(operation['from_course_id'], operation['to_course_id'],
+                                         None if operation['whole_course'] else student_ids)
+                message = f"{count} students moved."
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to update enrollments:\n{str(e)}")
+            return
+        
+        QMessageBox.information(self, "Enrollments Updated", message)
+        self.load_students()
+    
+    def export_cards(self):
+        """Export a one-page exam card for every student of the department"""
+        user = get_current_user()
+        if not user:
+            return
+        
+        if hasattr(self, 'dept_filter'):
+            department_id = self.dept_filter.currentData()
+        else:
+            department_id = user['department_id']
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Exam Cards",
+            "exam_cards.zip",
+            "ZIP Archives (*.zip);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        if not file_path.lower().endswith('.zip'):
+            file_path += '.zip'
+        
+        run_export(self, "Generating exam cards...", lambda path, job: export_exam_cards(
+            path, department_id, progress_callback=job.report_progress
+        ), file_path, lambda result: (
+            f"{result['students']} exam cards exported in {result['files']} PDF files to:\n{file_path}"
+        ))
+    
     def view_student_details(self):
         """Show detailed view of selected student with enrolled courses"""
         row = self.table.currentRow()
@@ -538,3 +624,229 @@ class StudentDetailsDialog(QDialog):
         close_btn.clicked.connect(self.accept)
         layout.addWidget(close_btn)
 
+
+class BulkEnrollmentDialog(QDialog):
+    """Dialog to choose a bulk enrollment change for the selected students"""
+    
+    ACTIONS = [
+        ("add", "Add to courses"),
+        ("remove", "Remove from courses"),
+        ("move", "Move to another course"),
+    ]
+    
+    def __init__(self, parent, student_count, courses):
+        super().__init__(parent)
+        self.student_count = student_count
+        self.courses = courses
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the UI"""
+        self.setWindowTitle("Edit Enrollments")
+        self.setMinimumSize(700, 550)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(20)
+        
+        summary = QLabel(f"{self.student_count} students selected")
+        summary.setStyleSheet(Styles.SUBTITLE_LABEL)
+        layout.addWidget(summary)
+        
+        self.action_combo = QComboBox()
+        self.action_combo.setStyleSheet(Styles.COMBO_BOX)
+        for action, label in self.ACTIONS:
+            self.action_combo.addItem(label, action)
+        layout.addWidget(self.action_combo)
+        
+        self.pages = QStackedWidget()
+        
+        self.course_table = QTableWidget()
+        self.course_table.setColumnCount(3)
+        self.course_table.setHorizontalHeaderLabels(["Code", "Name", "Enrolled"])
+        self.course_table.setStyleSheet(Styles.TABLE_WIDGET)
+        configure_table_widget(self.course_table, min_row_height=32, min_total_height=300)
+        self.course_table.setRowCount(len(self.courses))
+        for row, course in enumerate(self.courses):
+            code_item = QTableWidgetItem(f"{course['code']} ({course['department_code']})")
+            code_item.setData(Qt.ItemDataRole.UserRole, course['id'])
+            self.course_table.setItem(row, 0, code_item)
+            self.course_table.setItem(row, 1, QTableWidgetItem(course['name']))
+            self.course_table.setItem(row, 2, QTableWidgetItem(str(course['student_count'])))
+        self.pages.addWidget(self.course_table)
+        
+        move_page = QWidget()
+        move_layout = QVBoxLayout(move_page)
+        move_layout.setSpacing(10)
+        self.from_combo = QComboBox()
+        self.to_combo = QComboBox()
+        for label_text, combo in (("From course:", self.from_combo), ("To course:", self.to_combo)):
+            label = QLabel(label_text)
+            label.setStyleSheet(Styles.NORMAL_LABEL)
+            move_layout.addWidget(label)
+            combo.setStyleSheet(Styles.COMBO_BOX)
+            for course in self.courses:
+                combo.addItem(f"{course['code']} - {course['name']} ({course['student_count']} students)", course['id'])
+            move_layout.addWidget(combo)
+        self.whole_course_checkbox = QCheckBox("Move everyone enrolled in the source course, not only the selected students")
+        self.whole_course_checkbox.setStyleSheet(Styles.NORMAL_LABEL)
+        move_layout.addWidget(self.whole_course_checkbox)
+        move_layout.addStretch()
+        self.pages.addWidget(move_page)
+        
+        layout.addWidget(self.pages)
+        self.action_combo.currentIndexChanged.connect(
+            lambda: self.pages.setCurrentIndex(1 if self.action_combo.currentData() == "move" else 0)
+        )
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        apply_btn = QPushButton("Apply")
+        apply_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        apply_btn.clicked.connect(self.validate_and_accept)
+        button_layout.addWidget(apply_btn)
+        
+        layout.addLayout(button_layout)
+    
+    def selected_course_ids(self):
+        """IDs of the courses selected in the course table"""
+        return [self.course_table.item(index.row(), 0).data(Qt.ItemDataRole.UserRole)
+                for index in self.course_table.selectionModel().selectedRows()]
+    
+    def validate_and_accept(self):
+        """Check the choice before closing the dialog"""
+        if self.action_combo.currentData() == "move":
+            if self.from_combo.currentData() == self.to_combo.currentData():
+                QMessageBox.warning(self, "Invalid Move", "Please choose two different courses")
+                return
+        elif not self.selected_course_ids():
+            QMessageBox.warning(self, "No Courses", "Please select one or more courses")
+            return
+        self.accept()
+    
+    def get_operation(self):
+        """Return the chosen action and its courses"""
+        action = self.action_combo.currentData()
+        if action == "move":
+            return {
+                "action": action,
+                "from_course_id": self.from_combo.currentData(),
+                "to_course_id": self.to_combo.currentData(),
+                "whole_course": self.whole_course_checkbox.isChecked()
+            }
+        return {"action": action, "course_ids": self.selected_course_ids()}
+
+
+class ImportDiffDialog(QDialog):
+    """Dialog showing what a student import would change before it is applied"""
+    
+    MAX_ROWS = 1000
+    
+    def __init__(self, parent, plan):
+        super().__init__(parent)
+        self.plan = plan
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the UI"""
+        self.setWindowTitle("Review Import")
+        self.setMinimumSize(800, 550)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(20)
+        
+        plan = self.plan
+        summary = QLabel(
+            f"{len(plan['added'])} added, {len(plan['changed'])} changed, "
+            f"{len(plan['unchanged'])} unchanged students\n"
+            f"Enrollments: {len(plan['add_edges'])} to add, {len(plan['remove_edges'])} to remove"
+        )
+        if plan['unresolved_codes']:
+            summary.setText(summary.text() + f"\nUnknown course codes: {format_unresolved_codes(plan['unresolved_codes'])}")
+        summary.setWordWrap(True)
+        summary.setStyleSheet(Styles.SUBTITLE_LABEL)
+        layout.addWidget(summary)
+        
+        tabs = QTabWidget()
+        tabs.addTab(self.create_table(plan['added']), f"Added ({len(plan['added'])})")
+        tabs.addTab(self.create_table(plan['changed']), f"Changed ({len(plan['changed'])})")
+        tabs.addTab(self.create_table(plan['removed']), f"Not in File ({len(plan['removed'])})")
+        validation = plan.get('validation')
+        if validation is not None and len(validation):
+            tabs.addTab(self.create_validation_table(validation), f"Validation ({len(validation)})")
+        layout.addWidget(tabs)
+        
+        if len(plan['removed']):
+            note = QLabel("Students that are not in the file are listed only; they are not deleted.")
+            note.setStyleSheet(Styles.NORMAL_LABEL)
+            layout.addWidget(note)
+        
+        if plan['errors']:
+            errors = QLabel(f"⚠️ {len(plan['errors'])} rows skipped: " + "; ".join(plan['errors'][:3]))
+            errors.setStyleSheet(Styles.NORMAL_LABEL)
+            errors.setWordWrap(True)
+            layout.addWidget(errors)
+        
+        button_layout = QHBoxLayout()
+        
+        if validation is not None and len(validation):
+            report_btn = QPushButton("💾 Save Error Report")
+            report_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+            report_btn.clicked.connect(lambda: save_validation_report(self, validation))
+            button_layout.addWidget(report_btn)
+        
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setStyleSheet(Styles.SECONDARY_BUTTON)
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        apply_btn = QPushButton("Apply Changes")
+        apply_btn.setStyleSheet(Styles.SUCCESS_BUTTON)
+        apply_btn.clicked.connect(self.accept)
+        button_layout.addWidget(apply_btn)
+        
+        layout.addLayout(button_layout)
+    
+    def create_table(self, students):
+        """Create a read-only table of student numbers, names and class levels"""
+        table = QTableWidget()
+        table.setColumnCount(3)
+        table.setHorizontalHeaderLabels(["Student No", "Name", "Class Level"])
+        table.setStyleSheet(Styles.TABLE_WIDGET)
+        configure_table_widget(table, min_row_height=32, min_total_height=250)
+        
+        shown = students.head(self.MAX_ROWS)
+        table.setRowCount(len(shown))
+        for row, (student_no, name, class_level) in enumerate(
+                zip(shown['student_no'], shown['name'], shown['class_level'])):
+            table.setItem(row, 0, QTableWidgetItem(str(student_no)))
+            table.setItem(row, 1, QTableWidgetItem(str(name)))
+            table.setItem(row, 2, QTableWidgetItem("" if pd.isna(class_level) else str(int(class_level))))
+        
+        return table
+    
+    def create_validation_table(self, report):
+        """Create a read-only table of validation issues with their file rows"""
+        table = QTableWidget()
+        table.setColumnCount(4)
+        table.setHorizontalHeaderLabels(["Row", "Student No", "Severity", "Message"])
+        table.setStyleSheet(Styles.TABLE_WIDGET)
+        configure_table_widget(table, min_row_height=32, min_total_height=250)
+        
+        shown = report.head(self.MAX_ROWS)
+        table.setRowCount(len(shown))
+        for row, (file_row, student_no, severity, message) in enumerate(
+                zip(shown['row'], shown['student_no'], shown['severity'], shown['message'])):
+            table.setItem(row, 0, QTableWidgetItem("" if pd.isna(file_row) else str(int(file_row))))
+            table.setItem(row, 1, QTableWidgetItem(str(student_no)))
+            table.setItem(row, 2, QTableWidgetItem(severity))
+            table.setItem(row, 3, QTableWidgetItem(message))
+        
+        return table
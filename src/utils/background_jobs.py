@@ -0,0 +1,287 @@
+"""
+Background Jobs - Run long imports and exports off the GUI thread
+"""
+
+import os
+import threading
+from typing import Callable, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, Qt
+from PyQt6.QtWidgets import (QProgressDialog, QWidget, QMainWindow, QHBoxLayout, QLabel,
+                             QProgressBar, QPushButton, QMessageBox)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when the user cancelled it"""
+
+
+class CancelToken:
+    """Thread-safe flag a job polls to stop early"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """Raise JobCancelled once cancel() has been called"""
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class JobSignals(QObject):
+    """Signals of a background job, delivered on the GUI thread"""
+    progress = pyqtSignal(int, int)
+    message = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class BackgroundJob(QRunnable):
+    """
+    Run a function on the global thread pool
+    
+    The function receives the job as its `job` keyword argument so it can
+    report progress and check for cancellation between chunks of work.
+    """
+    
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = CancelToken()
+        self.signals = JobSignals()
+    
+    def report_progress(self, done: int, total: int = 0, message: Optional[str] = None):
+        """
+        Report progress and stop if the job was cancelled
+        
+        Args:
+            done: Units of work finished so far
+            total: Total units of work (0 when unknown)
+            message: Optional status text
+        """
+        self.token.raise_if_cancelled()
+        self.signals.progress.emit(done, total)
+        if message:
+            self.signals.message.emit(message)
+    
+    def cancel(self):
+        self.token.cancel()
+    
+    def run(self):
+        try:
+            result = self.fn(*self.args, job=self, **self.kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            # Complete the progress bar even when the work reported none, e.g. an export served from the cache
+            self.signals.progress.emit(1, 1)
+            self.signals.finished.emit(result)
+
+
+def start_job(job: BackgroundJob) -> BackgroundJob:
+    """Queue a job on the global thread pool"""
+    job.setAutoDelete(False)
+    QThreadPool.globalInstance().start(job)
+    return job
+
+
+def run_with_progress(parent: QWidget, label: str, job: BackgroundJob) -> BackgroundJob:
+    """
+    Start a job behind a modal progress dialog with a Cancel button
+    
+    Args:
+        parent: Widget that owns the dialog
+        label: Text shown above the progress bar
+        job: Job to start, with its signals already connected
+    
+    Returns:
+        The started job
+    """
+    dialog = QProgressDialog(label, "Cancel", 0, 0, parent)
+    dialog.setWindowModality(Qt.WindowModality.WindowModal)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    dialog.setMinimumDuration(0)
+    
+    def update_progress(done: int, total: int):
+        dialog.setMaximum(max(total, 0))
+        dialog.setValue(min(done, total) if total else 0)
+    
+    def cancel():
+        dialog.setLabelText("Cancelling...")
+        job.cancel()
+    
+    job.signals.progress.connect(update_progress)
+    job.signals.message.connect(dialog.setLabelText)
+    dialog.canceled.connect(cancel)
+    for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+        signal.connect(dialog.close)
+    
+    # Keep the dialog and the job alive until the job ends
+    parent._background_job = job
+    job._dialog = dialog
+    
+    dialog.show()
+    return start_job(job)
+
+
+class JobStatusWidget(QWidget):
+    """Label, progress bar and Cancel button of one job in the status bar"""
+    
+    def __init__(self, label: str, job: BackgroundJob):
+        super().__init__()
+        self.job = job
+        
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(8)
+        
+        self.label = QLabel(label)
+        layout.addWidget(self.label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedWidth(140)
+        layout.addWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.cancel_btn.clicked.connect(self.cancel)
+        layout.addWidget(self.cancel_btn)
+        
+        job.signals.progress.connect(self.update_progress)
+        job.signals.message.connect(self.label.setText)
+    
+    def update_progress(self, done: int, total: int):
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+        else:
+            self.progress_bar.setRange(0, 0)
+    
+    def cancel(self):
+        self.label.setText("Cancelling...")
+        self.cancel_btn.setEnabled(False)
+        self.job.cancel()
+
+
+def notify(parent: QWidget, title: str, text: str):
+    """Show an information box that does not block the rest of the window"""
+    box = QMessageBox(QMessageBox.Icon.Information, title, text, QMessageBox.StandardButton.Ok, parent)
+    box.setWindowModality(Qt.WindowModality.NonModal)
+    box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+    box.show()
+
+
+def run_in_status_bar(parent: QWidget, label: str, job: BackgroundJob) -> BackgroundJob:
+    """
+    Start a job with its progress and a Cancel button in the main window's status bar
+    
+    Unlike run_with_progress the window stays usable while the job runs.
+    Widgets that are not inside a QMainWindow fall back to the progress dialog.
+    
+    Args:
+        parent: Widget starting the job
+        label: Text shown next to the progress bar
+        job: Job to start, with its signals already connected
+    
+    Returns:
+        The started job
+    """
+    window = parent.window()
+    if not isinstance(window, QMainWindow):
+        return run_with_progress(parent, label, job)
+    
+    status_bar = window.statusBar()
+    widget = JobStatusWidget(label, job)
+    status_bar.addPermanentWidget(widget)
+    
+    def remove_widget(*_):
+        status_bar.removeWidget(widget)
+        widget.deleteLater()
+    
+    for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+        signal.connect(remove_widget)
+    job.signals.cancelled.connect(lambda: status_bar.showMessage(f"Cancelled: {label.rstrip('.')}", 5000))
+    
+    return start_job(job)
+
+
+def atomic_export(export: Callable, file_path: str) -> Callable:
+    """
+    Wrap an export so it only replaces file_path once it has succeeded
+    
+    The export writes a temporary file next to file_path, which is moved
+    into place when the export returns. On failure or cancellation only the
+    temporary file is removed, so an existing file at file_path survives.
+    
+    Args:
+        export: Function called with the path to write and the job as `job`
+        file_path: File the export should produce
+    
+    Returns:
+        Function for BackgroundJob taking the job as `job`
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    stem, extension = os.path.splitext(name)
+    
+    def run(job):
+        # Same directory and extension, so the move is atomic and extension-based formats still apply
+        temp_path = os.path.join(directory, f".{stem}.{os.getpid()}.{threading.get_ident()}{extension}")
+        try:
+            result = export(temp_path, job=job)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return result
+    
+    return run
+
+
+def run_export(parent: QWidget, label: str, export: Callable, file_path: str,
+               ready_message: Optional[Callable[[object], str]] = None) -> BackgroundJob:
+    """
+    Run an export in the background and notify the user when its file is ready
+    
+    The file is written through atomic_export, so a failed or cancelled
+    export leaves any existing file at file_path untouched.
+    
+    Args:
+        parent: Widget starting the export
+        label: Text shown next to the progress bar
+        export: Function called with the path to write and the job (see BackgroundJob) as `job`
+        file_path: File the export produces
+        ready_message: Builds the notification text from the export's result
+                       (default: the saved file path)
+    
+    Returns:
+        The started job
+    """
+    job = BackgroundJob(atomic_export(export, file_path))
+    
+    def finished(result):
+        text = ready_message(result) if ready_message else f"Exported to:\n{file_path}"
+        window = parent.window()
+        if isinstance(window, QMainWindow):
+            window.statusBar().showMessage(f"✅ Saved {os.path.basename(file_path)}", 5000)
+        notify(parent, "Export Ready", text)
+    
+    def failed(error):
+        QMessageBox.critical(parent, "Export Failed", f"Failed to export:\n{error}")
+    
+    job.signals.finished.connect(finished)
+    job.signals.failed.connect(failed)
+    return run_in_status_bar(parent, label, job)
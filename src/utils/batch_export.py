@@ -0,0 +1,129 @@
+"""
+Batch Export - Render many seating plans in parallel into one ZIP archive
+"""
+
+import io
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+from src.database.db_manager import db_manager
+
+
+def find_seated_exams(department_id: Optional[int] = None, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None) -> List[Dict]:
+    """
+    List exams that have a generated seating plan
+
+    Args:
+        department_id: Only exams of this department (None = all)
+        start_date: First exam date, YYYY-MM-DD (None = no lower bound)
+        end_date: Last exam date, YYYY-MM-DD (None = no upper bound)
+
+    Returns:
+        List of dicts with id, date, start_time and course_code, in exam order
+    """
+    conditions = ["EXISTS (SELECT 1 FROM exam_seating es WHERE es.exam_id = e.id)"]
+    params = []
+
+    if department_id is not None:
+        conditions.append("e.department_id = ?")
+        params.append(department_id)
+    if start_date:
+        conditions.append("e.date >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append("e.date <= ?")
+        params.append(end_date)
+
+    query = f"""
+        SELECT e.id, e.date, e.start_time, c.code as course_code
+        FROM exams e
+        JOIN courses c ON e.course_id = c.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY e.date, e.start_time, c.code
+    """
+    return [dict(row) for row in db_manager.execute_query(query, tuple(params))]
+
+
+def _archive_name(exam: Dict) -> str:
+    """Base file name of an exam inside the archive"""
+    code = re.sub(r'[^\w.-]+', '_', exam['course_code'])
+    return f"{exam['date']}_{exam['start_time'].replace(':', '')}_{code}"
+
+
+def _render_seating_plan(db_path: str, exam_id: int):
+    """
+    Render one exam's seating plan PDF and Excel in memory (runs in a worker process)
+
+    Returns:
+        Tuple of (exam_id, pdf bytes, xlsx bytes, error message or None)
+    """
+    from src.utils.pdf_export import export_seating_plan_pdf
+    from src.utils.excel_export import export_seating_plan_to_excmanual
+
+    db_manager.db_path = db_path
+    try:
+        pdf, xlsx = io.BytesIO(), io.BytesIO()
+        export_seating_plan_pdf(exam_id, pdf)
+        export_seating_plan_to_excmanual(exam_id, xlsx)
+        return exam_id, pdf.getvalue(), xlsx.getvalue(), None
+    except Exception as e:
+        return exam_id, None, None, str(e)
+
+
+def export_all_seating_plans(output: Union[str, BinaryIO], department_id: Optional[int] = None,
+                             start_date: Optional[str] = None, end_date: Optional[str] = None,
+                             progress_callback: Optional[Callable[[int, int], None]] = None,
+                             max_workers: Optional[int] = None) -> Dict:
+    """
+    Export the PDF and Excel seating plan of every seated exam into one ZIP
+
+    Exams are rendered in a process pool and each finished pair is written
+    straight into the archive, so no temporary files are created.
+
+    Args:
+        output: Path or writable binary stream for the ZIP archive
+        department_id: Only exams of this department (None = all)
+        start_date: First exam date, YYYY-MM-DD (None = no lower bound)
+        end_date: Last exam date, YYYY-MM-DD (None = no upper bound)
+        progress_callback: Called with (exams done, total) after every exam;
+                           an exception from it stops the export
+        max_workers: Number of worker processes (None = CPU count)
+
+    Returns:
+        Dictionary with exported (exam count) and errors (messages per failed exam)
+    """
+    exams = find_seated_exams(department_id, start_date, end_date)
+    if not exams:
+        raise ValueError("No seating plans found for the selected exams")
+
+    exams_by_id = {exam['id']: exam for exam in exams}
+    result = {"exported": 0, "errors": []}
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(exams)))
+
+    # Spawn keeps the workers independent of the GUI process's threads
+    context = multiprocessing.get_context("spawn")
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        rendered = pool.map(_render_seating_plan, [os.path.abspath(db_manager.db_path)] * len(exams),
+                            [exam['id'] for exam in exams])
+        try:
+            for done, (exam_id, pdf, xlsx, error) in enumerate(rendered, start=1):
+                exam = exams_by_id[exam_id]
+                if error:
+                    result["errors"].append(f"{exam['course_code']} ({exam['date']}): {error}")
+                else:
+                    name = _archive_name(exam)
+                    archive.writestr(f"{name}.pdf", pdf)
+                    archive.writestr(f"{name}.xlsx", xlsx)
+                    result["exported"] += 1
+                if progress_callback:
+                    progress_callback(done, len(exams))
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return result
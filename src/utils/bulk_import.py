@@ -0,0 +1,581 @@
+"""
+Bulk Import Pipeline - Set-based student, course and enrollment import
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+import json
+import re
+import pandas as pd
+from src.database.db_manager import db_manager
+from src.utils.clash_index import rebuild_slot_index
+from src.utils.lookup_cache import lookup_cache
+
+
+def _clean_text(series: pd.Series) -> pd.Series:
+    """Strip a text column and turn blanks / NaN into empty strings"""
+    return series.where(series.notna(), "").astype(str).str.strip().replace({"nan": "", "None": ""})
+
+
+STUDENT_COLUMN_MAP = {
+    # Turkish variants
+    'Öğrenci No': 'student_no',
+    'öğrenci no': 'student_no',
+    'ÖĞRENCI NO': 'student_no',
+    'Ad Soyad': 'name',
+    'ad soyad': 'name',
+    'AD SOYAD': 'name',
+    'İsim': 'name',
+    'isim': 'name',
+    'Sınıf': 'class_level_str',
+    'sınıf': 'class_level_str',
+    'SINIF': 'class_level_str',
+    'Ders': 'course_code',
+    'ders': 'course_code',
+    'DERS': 'course_code',
+    'Ders Kodu': 'course_code',
+    'ders kodu': 'course_code',
+    # English variants
+    'Student No': 'student_no',
+    'student no': 'student_no',
+    'STUDENT NO': 'student_no',
+    'Full Name': 'name',
+    'full name': 'name',
+    'Name': 'name',
+    'name': 'name',
+    'Class': 'class_level_str',
+    'class': 'class_level_str',
+    'CLASS': 'class_level_str',
+    'Course': 'course_code',
+    'course': 'course_code',
+    'COURSE': 'course_code',
+    'Course Code': 'course_code',
+    'course code': 'course_code',
+}
+
+
+def map_student_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename Turkish or English registrar columns and parse "2. Sınıf" class levels"""
+    new_columns = {}
+    for col in df.columns:
+        col_str = str(col).strip()
+        if col_str in STUDENT_COLUMN_MAP:
+            new_columns[col] = STUDENT_COLUMN_MAP[col_str]
+    
+    df = df.rename(columns=new_columns)
+    
+    df = df.dropna(how='all')
+    
+    if 'class_level_str' in df.columns and 'class_level' not in df.columns:
+        df = df.assign(class_level=pd.to_numeric(
+            df['class_level_str'].astype(str).str.extract(r'(\d+)')[0], errors='coerce'
+        ))
+    
+    return df
+
+
+def prepare_students(df: pd.DataFrame) -> Dict:
+    """
+    Normalise a student frame for import
+    
+    Args:
+        df: Frame with student_no, name and optionally class_level and either
+            course_code (one row per enrollment) or course_codes (comma-separated)
+    
+    Returns:
+        Dictionary with "students" (one row per student_no), "enrollments"
+        (student_no, course_code edge list) and "errors" (row messages)
+    """
+    frame = pd.DataFrame({
+        "row": df.index.to_series().add(2).astype(int).values,
+        "student_no": _clean_text(df["student_no"]).values,
+        "name": _clean_text(df["name"]).values,
+    })
+    
+    if "class_level" in df.columns:
+        frame["class_level"] = pd.to_numeric(df["class_level"], errors="coerce").astype("Int64").values
+    else:
+        frame["class_level"] = pd.array([pd.NA] * len(frame), dtype="Int64")
+    
+    long_format = "course_code" in df.columns
+    if long_format:
+        frame["course_code"] = _clean_text(df["course_code"]).values
+    elif "course_codes" in df.columns:
+        frame["course_code"] = _clean_text(df["course_codes"]).values
+    else:
+        frame["course_code"] = ""
+    
+    invalid = (frame["student_no"] == "") | (frame["name"] == "")
+    errors = [f"Row {row}: missing student number or name" for row in frame.loc[invalid, "row"]]
+    frame = frame[~invalid]
+    
+    students = frame.drop_duplicates("student_no", keep="last")[["row", "student_no", "name", "class_level"]]
+    
+    enrollments = frame[["student_no", "course_code"]]
+    if not long_format:
+        enrollments = enrollments.assign(course_code=enrollments["course_code"].str.split(",")).explode("course_code")
+        enrollments["course_code"] = enrollments["course_code"].fillna("").str.strip()
+    enrollments = enrollments[enrollments["course_code"] != ""].drop_duplicates()
+    
+    return {"students": students.reset_index(drop=True),
+            "enrollments": enrollments.reset_index(drop=True),
+            "errors": errors}
+
+
+def load_student_ids(cursor, student_nos: List[str]) -> Dict[str, int]:
+    """Resolve student numbers to IDs through the shared lookup cache"""
+    return lookup_cache.student_ids(cursor, student_nos)
+
+
+def load_course_ids(cursor, department_id: Optional[int] = None) -> Dict[str, int]:
+    """Load course code -> ID, first course wins when codes repeat across departments"""
+    return lookup_cache.course_ids(cursor, department_id)
+
+
+def _new_result(**counters) -> Dict:
+    result = dict(counters)
+    result["errors"] = []
+    return result
+
+
+def _content_hash(students: pd.DataFrame, edges: pd.DataFrame) -> pd.Series:
+    """64-bit hash of each student's name, class level and set of course codes"""
+    level = students["class_level"].astype("string").fillna("")
+    base = pd.util.hash_pandas_object(students["name"] + "\x1f" + level, index=False)
+    
+    # Summing per-course hashes makes the course part independent of row order
+    course_hash = pd.Series(pd.util.hash_pandas_object(edges["course_code"], index=False).values,
+                            index=edges["student_no"].values)
+    courses = course_hash.groupby(level=0).sum()
+    
+    combined = pd.DataFrame({
+        "base": base.values,
+        "courses": students["student_no"].map(courses).fillna(0).astype("uint64").values
+    })
+    return pd.Series(pd.util.hash_pandas_object(combined, index=False).values.view("int64"), index=students.index)
+
+
+def _edge_frame(rows, columns) -> pd.DataFrame:
+    return pd.DataFrame(list(rows), columns=columns).astype("int64") if rows else pd.DataFrame(
+        {column: pd.Series(dtype="int64") for column in columns})
+
+
+def plan_student_import(chunks: Iterable[pd.DataFrame], department_id: int,
+                        course_department_id: Optional[int] = None,
+                        progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Compare a student file with the database without writing anything
+    
+    Every student gets a content hash over name, class level and resolved
+    course codes. Students whose hash matches the one stored at their last
+    import are unchanged and skipped; for changed students only the
+    enrollments that differ are added or removed.
+    
+    Args:
+        chunks: Frames with student_no, name and optionally class_level and course codes
+        department_id: Department for newly created students
+        course_department_id: Only resolve course codes of this department (None = any)
+        progress_callback: Called with the number of rows read after every chunk
+    
+    Returns:
+        Plan dictionary for apply_student_import; "added", "changed",
+        "unchanged" and "removed" hold student frames, "add_edges" and
+        "remove_edges" the enrollment deltas and "unresolved_codes" the
+        skipped enrollment count per unknown course code
+    """
+    student_parts, edge_parts, errors = [], [], []
+    rows_done = 0
+    for chunk in chunks:
+        prepared = prepare_students(chunk)
+        student_parts.append(prepared["students"])
+        edge_parts.append(prepared["enrollments"])
+        errors.extend(prepared["errors"])
+        rows_done += len(chunk)
+        if progress_callback:
+            progress_callback(rows_done)
+    
+    if student_parts:
+        students = pd.concat(student_parts, ignore_index=True).drop_duplicates("student_no", keep="last")
+        enrollments = pd.concat(edge_parts, ignore_index=True).drop_duplicates()
+    else:
+        students = prepare_students(pd.DataFrame(columns=["student_no", "name"]))["students"]
+        enrollments = pd.DataFrame(columns=["student_no", "course_code"])
+    students = students.reset_index(drop=True)
+    
+    with db_manager.transaction() as cursor:
+        course_ids = load_course_ids(cursor, course_department_id)
+        
+        enrollments = enrollments.assign(course_id=enrollments["course_code"].map(course_ids))
+        unresolved = enrollments.loc[enrollments["course_id"].isna(), "course_code"].value_counts()
+        skipped = int(unresolved.sum())
+        edges = enrollments.dropna(subset=["course_id"]).astype({"course_id": "int64"})
+        
+        students["import_hash"] = _content_hash(students, edges)
+        
+        cursor.execute("""
+            SELECT s.student_no, s.id, s.import_hash
+            FROM students s
+            JOIN json_each(?) j ON s.student_no = j.value
+        """, (json.dumps(students["student_no"].tolist()),))
+        existing = pd.DataFrame(cursor.fetchall(), columns=["student_no", "id", "stored_hash"])
+        students = students.merge(existing, on="student_no", how="left")
+        
+        is_new = students["id"].isna()
+        is_unchanged = ~is_new & (students["stored_hash"] == students["import_hash"])
+        changed = students[~is_new & ~is_unchanged].astype({"id": "int64"})
+        
+        # Enrollment deltas of changed students, limited to courses this import can resolve
+        cursor.execute("""
+            SELECT sc.student_id, sc.course_id
+            FROM student_courses sc
+            JOIN json_each(?) j ON sc.student_id = j.value
+        """, (json.dumps(changed["id"].tolist()),))
+        current = _edge_frame(cursor.fetchall(), ["student_id", "course_id"])
+        current = current[current["course_id"].isin(list(course_ids.values()))]
+        
+        wanted = edges.merge(changed[["student_no", "id"]], on="student_no").rename(columns={"id": "student_id"})
+        delta = wanted[["student_id", "course_id"]].merge(current, how="outer", indicator=True)
+        
+        changed_add = delta.loc[delta["_merge"] == "left_only", ["student_id", "course_id"]]
+        changed_add = changed_add.assign(
+            student_no=changed_add["student_id"].map(dict(zip(changed["id"], changed["student_no"])))
+        )
+        add_edges = pd.concat([
+            edges.loc[edges["student_no"].isin(students.loc[is_new, "student_no"]), ["student_no", "course_id"]],
+            changed_add[["student_no", "course_id"]]
+        ], ignore_index=True)
+        remove_edges = delta.loc[delta["_merge"] == "right_only", ["student_id", "course_id"]].astype("int64")
+        
+        cursor.execute("""
+            SELECT student_no, name, class_level
+            FROM students
+            WHERE department_id = ?
+            AND student_no NOT IN (SELECT value FROM json_each(?))
+            ORDER BY student_no
+        """, (department_id, json.dumps(students["student_no"].tolist())))
+        removed = pd.DataFrame(cursor.fetchall(), columns=["student_no", "name", "class_level"])
+    
+    columns = ["row", "student_no", "name", "class_level", "import_hash"]
+    return {
+        "department_id": department_id,
+        "added": students.loc[is_new, columns].reset_index(drop=True),
+        "changed": changed[columns + ["id"]].reset_index(drop=True),
+        "unchanged": students.loc[is_unchanged, columns].reset_index(drop=True),
+        "removed": removed,
+        "add_edges": add_edges.reset_index(drop=True),
+        "remove_edges": remove_edges.reset_index(drop=True),
+        "skipped_enrollments": skipped,
+        "unresolved_codes": {code: int(count) for code, count in unresolved.items()},
+        "errors": errors
+    }
+
+
+def plan_has_changes(plan: Dict) -> bool:
+    """Whether applying the plan would write anything"""
+    return any(len(plan[key]) for key in ("added", "changed", "add_edges", "remove_edges"))
+
+
+def apply_student_import(plan: Dict, progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Write only the deltas of a student import plan in one transaction
+    
+    Args:
+        plan: Result of plan_student_import
+        progress_callback: Called with the number of students written after
+                           each step; an exception from it rolls everything back
+    
+    Returns:
+        Dictionary with imported, added, changed, unchanged, removed,
+        enrollments_added, enrollments_removed, skipped_enrollments,
+        unresolved_codes (course code -> skipped enrollments) and errors
+    """
+    added, changed = plan["added"], plan["changed"]
+    result = {
+        "imported": len(added) + len(changed) + len(plan["unchanged"]),
+        "added": len(added),
+        "changed": len(changed),
+        "unchanged": len(plan["unchanged"]),
+        "removed": len(plan["removed"]),
+        "enrollments_added": 0,
+        "enrollments_removed": len(plan["remove_edges"]),
+        "skipped_enrollments": plan["skipped_enrollments"],
+        "unresolved_codes": plan["unresolved_codes"],
+        "errors": plan["errors"]
+    }
+    
+    if not plan_has_changes(plan):
+        return result
+    
+    def levels(frame):
+        return [None if pd.isna(level) else int(level) for level in frame["class_level"]]
+    
+    with db_manager.transaction() as cursor:
+        cursor.executemany(
+            "UPDATE students SET name = ?, class_level = ?, import_hash = ? WHERE id = ?",
+            zip(changed["name"], levels(changed), changed["import_hash"].astype("int64").tolist(),
+                changed["id"].astype("int64").tolist())
+        )
+        if progress_callback:
+            progress_callback(len(changed))
+        
+        display_ids = db_manager.allocate_display_ids(cursor, "students", len(added))
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name, class_level, import_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, zip(display_ids, [plan["department_id"]] * len(added), added["student_no"], added["name"],
+                 levels(added), added["import_hash"].astype("int64").tolist()))
+        if progress_callback:
+            progress_callback(len(changed) + len(added))
+        
+        add_edges = plan["add_edges"]
+        student_ids = load_student_ids(cursor, add_edges["student_no"].drop_duplicates().tolist())
+        inserts = pd.DataFrame({
+            "student_id": add_edges["student_no"].map(student_ids),
+            "course_id": add_edges["course_id"]
+        }).dropna().astype("int64")
+        cursor.executemany(
+            "INSERT OR IGNORE INTO student_courses (student_id, course_id) VALUES (?, ?)",
+            inserts.itertuples(index=False, name=None)
+        )
+        cursor.executemany(
+            "DELETE FROM student_courses WHERE student_id = ? AND course_id = ?",
+            plan["remove_edges"].itertuples(index=False, name=None)
+        )
+        result["enrollments_added"] = len(inserts)
+        
+        affected_courses = set(inserts["course_id"].tolist()) | set(plan["remove_edges"]["course_id"].tolist())
+        if affected_courses:
+            rebuild_slot_index(course_ids=sorted(affected_courses), cursor=cursor)
+        
+        if progress_callback:
+            progress_callback(len(changed) + len(added))
+    
+    return result
+
+
+def import_student_chunks(chunks: Iterable[pd.DataFrame], department_id: int,
+                          course_department_id: Optional[int] = None,
+                          progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Plan and apply a student import in one call
+    
+    Args:
+        chunks: Frames with student_no, name and optionally class_level and course codes
+        department_id: Department for newly created students
+        course_department_id: Only resolve course codes of this department (None = any)
+        progress_callback: Called with the number of rows read after every chunk
+    
+    Returns:
+        Same dictionary as apply_student_import
+    """
+    plan = plan_student_import(chunks, department_id, course_department_id, progress_callback)
+    return apply_student_import(plan)
+
+
+def import_students(df: pd.DataFrame, department_id: int, course_department_id: Optional[int] = None) -> Dict:
+    """
+    Import students and their enrollments, writing only what changed
+    
+    Args:
+        df: Frame with student_no, name and optionally class_level and course_codes
+        department_id: Department for newly created students
+        course_department_id: Only resolve course codes of this department (None = any)
+    
+    Returns:
+        Same dictionary as apply_student_import
+    """
+    return import_student_chunks([df], department_id, course_department_id)
+
+
+CLASS_MARKERS = ['Sınıf', 'SINIF', 'sınıf', 'Class', 'CLASS', 'class']
+ELECTIVE_MARKERS = ['SEÇMELİ', 'SEÇİMLİK', 'SEÇ', 'ELECTIVE', 'Elective', 'elective']
+HEADER_MARKERS = ['DERS KODU', 'Ders Kodu', 'COURSE CODE', 'Course Code']
+MANDATORY_MARKERS = ['ZORUNLU', 'Zorunlu', 'MANDATORY', 'Mandatory', 'mandatory']
+
+
+def _contains_any(series: pd.Series, keywords: List[str]) -> pd.Series:
+    return series.str.contains("|".join(re.escape(keyword) for keyword in keywords), regex=True)
+
+
+def _resolve_sections(df: pd.DataFrame, class_level: int, course_type: str):
+    """Resolve section rows, returning the courses and the state after the last row"""
+    code = _clean_text(df["code"])
+    name = _clean_text(df["name"]) if "name" in df.columns else pd.Series("", index=df.index)
+    
+    is_class = _contains_any(code, CLASS_MARKERS)
+    is_elective = ~is_class & _contains_any(code, ELECTIVE_MARKERS)
+    is_header = ~is_class & ~is_elective & _contains_any(code, HEADER_MARKERS)
+    is_mandatory = ~is_class & ~is_elective & ~is_header & _contains_any(code, MANDATORY_MARKERS)
+    is_marker = is_class | is_elective | is_header | is_mandatory
+    
+    level = pd.to_numeric(code.where(is_class).str.extract(r"(\d+)", expand=False), errors="coerce")
+    
+    # A new class level starts a section without a type, which counts as mandatory
+    section_type = pd.Series(pd.NA, index=df.index, dtype="object")
+    section_type[level.notna()] = "mandatory"
+    section_type[is_elective] = "elective"
+    section_type[is_mandatory] = "mandatory"
+    
+    level = level.ffill().fillna(class_level).astype(int)
+    section_type = section_type.ffill().fillna(course_type)
+    
+    keep = ~is_marker & (code != "") & (name != "")
+    
+    result = df[keep].copy()
+    result["code"] = code[keep]
+    result["name"] = name[keep]
+    result["class_level"] = level[keep]
+    result["type"] = section_type[keep]
+    
+    if len(df):
+        class_level, course_type = int(level.iloc[-1]), section_type.iloc[-1]
+    
+    if result.empty:
+        result = pd.DataFrame(columns=['code', 'name', 'instructor', 'class_level', 'type'])
+    return result, class_level, course_type
+
+
+def resolve_course_sections(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn a catalogue with section header rows into one row per course
+    
+    Class level rows ("2. Sınıf") and type rows ("SEÇMELİ", "ZORUNLU") set
+    the level and type of the courses below them. Markers are detected for
+    the whole column at once and carried down with a forward fill.
+    
+    Args:
+        df: Frame with code and name columns (other columns are kept)
+    
+    Returns:
+        Frame of course rows with class_level and type filled in
+    """
+    return _resolve_sections(df, 1, "mandatory")[0].reset_index(drop=True)
+
+
+def iter_course_sections(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Resolve section rows chunk by chunk, carrying the open section across chunks"""
+    class_level, course_type = 1, "mandatory"
+    for chunk in chunks:
+        courses, class_level, course_type = _resolve_sections(chunk, class_level, course_type)
+        yield courses
+
+
+def prepare_courses(df: pd.DataFrame) -> Dict:
+    """
+    Normalise a course frame for import
+    
+    Args:
+        df: Frame with code, name and optionally instructor, class_level and type
+    
+    Returns:
+        Dictionary with "courses" (one row per code) and "errors" (row messages)
+    """
+    frame = pd.DataFrame({
+        "row": df.index.to_series().add(2).astype(int).values,
+        "code": _clean_text(df["code"]).values,
+        "name": _clean_text(df["name"]).values,
+    })
+    
+    if "instructor" in df.columns:
+        frame["instructor"] = _clean_text(df["instructor"]).values
+    else:
+        frame["instructor"] = ""
+    
+    if "class_level" in df.columns:
+        frame["class_level"] = pd.to_numeric(df["class_level"], errors="coerce").astype("Int64").values
+    else:
+        frame["class_level"] = pd.array([pd.NA] * len(frame), dtype="Int64")
+    
+    if "type" in df.columns:
+        course_type = _clean_text(df["type"]).str.lower()
+        frame["type"] = course_type.where(course_type.isin(["mandatory", "elective"]), "").values
+    else:
+        frame["type"] = ""
+    
+    invalid = (frame["code"] == "") | (frame["name"] == "")
+    errors = [f"Row {row}: missing course code or name" for row in frame.loc[invalid, "row"]]
+    
+    courses = frame[~invalid].drop_duplicates("code", keep="last")
+    return {"courses": courses.reset_index(drop=True), "errors": errors}
+
+
+def _write_courses(cursor, df: pd.DataFrame, department_id: int,
+                   existing: Dict[str, int], result: Dict):
+    """Upsert one frame of courses; existing maps code -> display_id and is kept current"""
+    prepared = prepare_courses(df)
+    courses = prepared["courses"]
+    
+    result["imported"] += len(courses)
+    result["errors"].extend(prepared["errors"])
+    
+    if courses.empty:
+        return
+    
+    class_levels = [None if pd.isna(level) else int(level) for level in courses["class_level"]]
+    
+    is_new = ~courses["code"].isin(existing.keys()).values
+    new_ids = iter(db_manager.allocate_display_ids(cursor, "courses", int(is_new.sum())))
+    display_ids = [next(new_ids) if new else existing[code] for code, new in zip(courses["code"], is_new)]
+    
+    cursor.executemany("""
+        INSERT INTO courses (display_id, department_id, code, name, instructor, class_level, type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(department_id, code) DO UPDATE SET
+            name = excluded.name,
+            instructor = excluded.instructor,
+            class_level = excluded.class_level,
+            type = excluded.type
+    """, [
+        (display_id, department_id, code, name, instructor or None, level, course_type or None)
+        for display_id, code, name, instructor, level, course_type in zip(
+            display_ids, courses["code"], courses["name"], courses["instructor"], class_levels, courses["type"]
+        )
+    ])
+    
+    existing.update(zip(courses["code"], display_ids))
+    result["inserted"] += int(is_new.sum())
+    result["updated"] += len(courses) - int(is_new.sum())
+
+
+def import_course_chunks(chunks: Iterable[pd.DataFrame], department_id: int,
+                         progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Import a stream of course frames into a department in one transaction
+    
+    Every chunk is written with one batched upsert on (department_id, code).
+    An exception from progress_callback rolls the whole import back.
+    
+    Args:
+        chunks: Frames with code, name and optionally instructor, class_level and type
+        department_id: Department that owns the courses
+        progress_callback: Called with the number of rows written after every chunk
+    
+    Returns:
+        Dictionary with imported, inserted, updated and errors
+    """
+    result = _new_result(imported=0, inserted=0, updated=0)
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("SELECT code, display_id FROM courses WHERE department_id = ?", (department_id,))
+        existing = dict(cursor.fetchall())
+        rows_done = 0
+        for chunk in chunks:
+            _write_courses(cursor, chunk, department_id, existing, result)
+            rows_done += len(chunk)
+            if progress_callback:
+                progress_callback(rows_done)
+    
+    return result
+
+
+def import_courses(df: pd.DataFrame, department_id: int) -> Dict:
+    """
+    Import a course catalogue into a department with one batched upsert
+    
+    Args:
+        df: Frame with code, name and optionally instructor, class_level and type
+        department_id: Department that owns the courses
+    
+    Returns:
+        Dictionary with imported, inserted, updated and errors
+    """
+    return import_course_chunks([df], department_id)
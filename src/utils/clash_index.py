@@ -0,0 +1,93 @@
+"""
+Exam Slot Index - Materialised slot -> student table for clash lookups
+"""
+
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+from src.database.db_manager import db_manager
+
+
+def rebuild_slot_index(department_id: Optional[int] = None, course_ids: Optional[Iterable[int]] = None,
+                       cursor: Optional[sqlite3.Cursor] = None) -> int:
+    """
+    Rebuild the exam_slot_students index from exams and enrollments
+    
+    Pass the cursor of the transaction that changed exams or enrollments so
+    the index is committed together with them.
+    
+    Args:
+        department_id: Only rebuild exams of this department (None = all)
+        course_ids: Only rebuild exams of these courses (None = all)
+        cursor: Cursor of an open transaction (None = run in a new one)
+        
+    Returns:
+        Number of index rows written
+    """
+    conditions = []
+    params = []
+    
+    if department_id is not None:
+        conditions.append("e.department_id = ?")
+        params.append(department_id)
+    
+    if course_ids is not None:
+        course_ids = list(course_ids)
+        if not course_ids:
+            return 0
+        conditions.append(f"e.course_id IN ({', '.join('?' * len(course_ids))})")
+        params.extend(course_ids)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    if cursor is None:
+        with db_manager.transaction() as cursor:
+            return _rebuild(cursor, where, params)
+    return _rebuild(cursor, where, params)
+
+
+def _rebuild(cursor: sqlite3.Cursor, where: str, params: List) -> int:
+    """Replace the index rows of the exams matching where"""
+    cursor.execute(f"""
+        DELETE FROM exam_slot_students
+        WHERE exam_id IN (SELECT e.id FROM exams e {where})
+    """, params)
+    
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO exam_slot_students (exam_id, student_id, date, start_time)
+        SELECT e.id, sc.student_id, e.date, e.start_time
+        FROM exams e
+        JOIN student_courses sc ON sc.course_id = e.course_id
+        {where}
+    """, params)
+    
+    return cursor.rowcount
+
+
+def get_exam_clashes(exam_id: int) -> List[Dict]:
+    """
+    Find students of an exam who have another exam in the same slot
+    
+    Args:
+        exam_id: Exam ID
+        
+    Returns:
+        List of dicts with student_no, name and the clashing courses
+    """
+    query = """
+        SELECT s.student_no, s.name,
+               GROUP_CONCAT(c.code || ' - ' || c.name, ', ') as courses
+        FROM exam_slot_students mine
+        JOIN exam_slot_students other
+             ON other.date = mine.date
+            AND other.start_time = mine.start_time
+            AND other.student_id = mine.student_id
+            AND other.exam_id != mine.exam_id
+        JOIN exams e ON other.exam_id = e.id
+        JOIN courses c ON e.course_id = c.id
+        JOIN students s ON mine.student_id = s.id
+        WHERE mine.exam_id = ?
+        GROUP BY s.id, s.student_no, s.name
+        ORDER BY s.student_no
+    """
+    return [dict(row) for row in db_manager.execute_query(query, (exam_id,))]
+
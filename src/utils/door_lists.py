@@ -0,0 +1,322 @@
+"""
+Door Lists - Alphabetical surname ranges per classroom for the doors of every exam
+"""
+
+import io
+import itertools
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from src.database.db_manager import db_manager
+from src.utils.seat_masks import effective_capacity
+from src.utils.turkish_translations import get_excel_label
+
+TURKISH_ALPHABET = "ABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZ"
+
+
+class _AlphabetOrder(dict):
+    """Translation table to Turkish alphabet order; other letters (Q, W, X, É...) sort after Z"""
+    
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        if not char.isalpha():
+            raise KeyError(code)
+        return chr(0x100 + len(TURKISH_ALPHABET)) + char
+
+
+_ALPHABET_ORDER = _AlphabetOrder({ord(letter): chr(0x100 + i) for i, letter in enumerate(TURKISH_ALPHABET)})
+
+UNASSIGNED = "-"
+DOOR_LIST_COLUMNS = ["Surnames", "Classroom", "Students"]
+
+
+def turkish_upper(text: str) -> str:
+    """Upper-case text with the Turkish dotted and dotless i"""
+    return text.replace("i", "İ").replace("ı", "I").upper()
+
+
+def surname_of(name: str) -> str:
+    """Upper-cased surname, taken as the last word of an "Ad Soyad" name"""
+    words = name.split()
+    return turkish_upper(words[-1]) if words else ""
+
+
+def sort_key(surname: str, name: str) -> Tuple[str, str]:
+    """Key ordering students by surname, then full name, in the Turkish alphabet"""
+    return surname.translate(_ALPHABET_ORDER), turkish_upper(name).translate(_ALPHABET_ORDER)
+
+
+def _common_prefix(first: str, second: str) -> int:
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+def split_ranges(students: Iterable[Tuple[str, Optional[str]]]) -> List[Dict]:
+    """
+    Collapse an alphabetical student list into surname ranges per classroom
+    
+    Consecutive students in the same classroom form one range. Range bounds
+    are cut to the shortest surname prefix that still tells neighbouring
+    ranges apart, e.g. "A" - "KA" and "KO" - "Z".
+    
+    Args:
+        students: (upper-cased surname, classroom name or None) in alphabetical order
+    
+    Returns:
+        List of dicts with from, to, classroom and students
+    """
+    runs = [(classroom, [surname for surname, _ in group])
+            for classroom, group in itertools.groupby(students, key=lambda student: student[1])]
+    
+    ranges = []
+    for i, (classroom, surnames) in enumerate(runs):
+        start = _common_prefix(runs[i - 1][1][-1], surnames[0]) + 1 if i > 0 else 1
+        end = _common_prefix(surnames[-1], runs[i + 1][1][0]) + 1 if i < len(runs) - 1 else 1
+        ranges.append({
+            "from": surnames[0][:start],
+            "to": surnames[-1][:end],
+            "classroom": classroom,
+            "students": len(surnames),
+        })
+    return ranges
+
+
+def split_rooms(students: Iterable[Tuple[str, Optional[str], str]]) -> List[Dict]:
+    """
+    One door entry per classroom of a seated exam
+    
+    Seats are shuffled, so a classroom's students do not form one surname
+    range of the exam; each classroom gets its own alphabetical block with
+    its first and last surname and every name instead.
+    
+    Args:
+        students: (upper-cased surname, classroom name or None, full name) in alphabetical order
+    
+    Returns:
+        List of dicts with from, to, classroom, students and names, by
+        classroom name; students without a seat come last with classroom None
+    """
+    rooms: Dict[Optional[str], List[Tuple[str, str]]] = {}
+    for surname, classroom, name in students:
+        rooms.setdefault(classroom, []).append((surname, name))
+    
+    return [{
+        "from": members[0][0],
+        "to": members[-1][0],
+        "classroom": classroom,
+        "students": len(members),
+        "names": [name for _, name in members],
+    } for classroom, members in sorted(rooms.items(), key=lambda room: (room[0] is None, room[0] or ""))]
+
+
+def _assign_by_enrollment(surnames: List[str], rooms: List[Dict]) -> Iterator[Tuple[str, Optional[str]]]:
+    """Fill the exam's classrooms in alphabetical order, largest usable capacity first"""
+    rooms = sorted(rooms, key=lambda room: (-effective_capacity(room), room["name"]))
+    seats = itertools.chain.from_iterable(
+        itertools.repeat(room["name"], effective_capacity(room)) for room in rooms
+    )
+    for surname in surnames:
+        yield surname, next(seats, None)
+
+
+def exam_date_range(department_id: Optional[int] = None) -> Optional[Tuple[str, str]]:
+    """
+    First and last scheduled exam date
+    
+    Args:
+        department_id: Only exams of this department (None = all)
+    
+    Returns:
+        (first date, last date) or None when nothing is scheduled
+    """
+    where, params = ("WHERE department_id = ?", (department_id,)) if department_id is not None else ("", ())
+    row = db_manager.execute_query(f"SELECT MIN(date) as first, MAX(date) as last FROM exams {where}", params)[0]
+    return (row["first"], row["last"]) if row["first"] else None
+
+
+def iter_door_lists(department_id: Optional[int] = None, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream the door list of every exam in a period from one query
+    
+    Exams with a seating plan get one block per classroom with the names of
+    the students seated there (see split_rooms). Exams without seating are
+    split into surname ranges from enrollment by filling their classrooms
+    alphabetically (see split_ranges).
+    
+    Args:
+        department_id: Only exams of this department (None = all)
+        start_date: First exam date, YYYY-MM-DD (None = no lower bound)
+        end_date: Last exam date, YYYY-MM-DD (None = no upper bound)
+    
+    Yields:
+        Dicts with id, date, start_time, course_code, course_name, source
+        ("seating" or "enrollment") and ranges (see split_rooms and split_ranges),
+        in exam order
+    """
+    conditions = []
+    params = []
+    
+    if department_id is not None:
+        conditions.append("e.department_id = ?")
+        params.append(department_id)
+    if start_date:
+        conditions.append("e.date >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append("e.date <= ?")
+        params.append(end_date)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Classroom rows (kind 0) come before the exam's student rows (kind 1)
+    query = f"""
+        WITH period_exams AS (
+            SELECT e.id, e.date, e.start_time, e.course_id, c.code as course_code, c.name as course_name
+            FROM exams e
+            JOIN courses c ON e.course_id = c.id
+            {where}
+        )
+        SELECT pe.id, pe.date, pe.start_time, pe.course_code, pe.course_name, 0 as kind,
+               cl.name as classroom, NULL as student_name,
+               cl.rows, cl.cols, cl.seats_per_desk, cl.seat_pattern, cl.seat_mask
+        FROM period_exams pe
+        JOIN exam_classrooms ec ON ec.exam_id = pe.id
+        JOIN classrooms cl ON cl.id = ec.classroom_id
+        UNION ALL
+        SELECT pe.id, pe.date, pe.start_time, pe.course_code, pe.course_name, 1,
+               scl.name, s.name, NULL, NULL, NULL, NULL, NULL
+        FROM period_exams pe
+        JOIN student_courses sc ON sc.course_id = pe.course_id
+        JOIN students s ON s.id = sc.student_id
+        LEFT JOIN exam_seating es ON es.exam_id = pe.id AND es.student_id = s.id
+        LEFT JOIN classrooms scl ON scl.id = es.classroom_id
+        ORDER BY 2, 3, 4, 1, 6
+    """
+    rows = db_manager.iter_query(query, tuple(params), batch_size=5000)
+    
+    for _, exam_rows in itertools.groupby(rows, key=lambda row: row["id"]):
+        first = next(exam_rows)
+        rooms = []
+        students = []
+        for row in itertools.chain([first], exam_rows):
+            if row["kind"] == 0:
+                rooms.append({"name": row["classroom"], "rows": row["rows"], "cols": row["cols"],
+                              "seats_per_desk": row["seats_per_desk"], "seat_pattern": row["seat_pattern"],
+                              "seat_mask": row["seat_mask"]})
+            else:
+                surname = surname_of(row["student_name"])
+                students.append((sort_key(surname, row["student_name"]), surname, row["classroom"],
+                                 row["student_name"]))
+        
+        students.sort(key=lambda student: student[0])
+        seated = any(classroom for _, _, classroom, _ in students)
+        if seated:
+            ranges = split_rooms((surname, classroom, name) for _, surname, classroom, name in students)
+        else:
+            ranges = split_ranges(_assign_by_enrollment([surname for _, surname, _, _ in students], rooms))
+        
+        yield {
+            "id": first["id"],
+            "date": first["date"],
+            "start_time": first["start_time"],
+            "course_code": first["course_code"],
+            "course_name": first["course_name"],
+            "source": "seating" if seated else "enrollment",
+            "ranges": ranges,
+        }
+
+
+def render_door_lists_pdf(exams: List[Dict], output: Union[str, BinaryIO], title: str) -> None:
+    """
+    Render door lists compactly, several exams per A4 page
+    
+    Args:
+        exams: Door lists as yielded by iter_door_lists
+        output: Path or writable binary stream for the PDF
+        title: Document title
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, KeepTogether
+    from xml.sax.saxutils import escape
+    from src.utils.pdf_theme import APP_FOOTER, page_decorator, paragraph_style, table_style
+    
+    doc = SimpleDocTemplate(output, pagesize=A4, topMargin=0.6 * inch, bottomMargin=0.6 * inch)
+    elements = [Paragraph(title, paragraph_style('PlanTitle'))]
+    
+    for exam in exams:
+        heading = (f"{exam['date']} {exam['start_time']} - {exam['course_code']} {exam['course_name']}"
+                   f" <font size=8 color=grey>(from {exam['source']})</font>")
+        data = [DOOR_LIST_COLUMNS]
+        for door_range in exam["ranges"]:
+            data.append([f"{door_range['from']} - {door_range['to']}",
+                         door_range["classroom"] or UNASSIGNED, door_range["students"]])
+        table = Table(data, colWidths=[2.5 * inch, 2.5 * inch, 1 * inch], repeatRows=1)
+        table.setStyle(table_style(header_font_size=9, header_padding=4))
+        block = [Paragraph(heading, paragraph_style('Heading4')), table]
+        for door_range in exam["ranges"]:
+            if door_range.get("names"):
+                block.append(Paragraph(f"<b>{escape(door_range['classroom'] or UNASSIGNED)}:</b> "
+                                       f"{escape(', '.join(door_range['names']))}", paragraph_style('Normal')))
+        elements.append(KeepTogether(block))
+        elements.append(Spacer(1, 0.15 * inch))
+    
+    footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')} | {APP_FOOTER}"
+    decorate = page_decorator(footer_text)
+    doc.build(elements, onFirstPage=decorate, onLaterPages=decorate)
+
+
+def door_list_rows(exams: Iterable[Dict]) -> Iterator[tuple]:
+    """One Excel row per surname range or seated classroom"""
+    for exam in exams:
+        for door_range in exam["ranges"]:
+            yield (exam["date"], exam["start_time"], exam["course_code"], exam["course_name"],
+                   door_range["from"], door_range["to"], door_range["classroom"] or UNASSIGNED,
+                   door_range["students"], ", ".join(door_range.get("names", [])))
+
+
+def export_door_lists(output: Union[str, BinaryIO], department_id: Optional[int] = None,
+                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Export the door lists of every exam in a period as one PDF and one Excel file in a ZIP
+    
+    Args:
+        output: Path or writable binary stream for the ZIP archive
+        department_id: Only exams of this department (None = all)
+        start_date: First exam date, YYYY-MM-DD (None = no lower bound)
+        end_date: Last exam date, YYYY-MM-DD (None = no upper bound)
+        progress_callback: Called with the number of exams read after every exam;
+                           an exception from it stops the export
+    
+    Returns:
+        Dictionary with exams and ranges (counts)
+    """
+    from src.utils.excel_export import write_styled_workbook
+    
+    exams = []
+    for done, exam in enumerate(iter_door_lists(department_id, start_date, end_date), start=1):
+        exams.append(exam)
+        if progress_callback:
+            progress_callback(done)
+    
+    if not exams:
+        raise ValueError("No exams scheduled in the selected period")
+    
+    period = f"{exams[0]['date']} - {exams[-1]['date']}"
+    pdf, xlsx = io.BytesIO(), io.BytesIO()
+    render_door_lists_pdf(exams, pdf, f"Door Lists {period}")
+    headers = [get_excel_label("date"), get_excel_label("time"), get_excel_label("course_code"),
+               get_excel_label("course_name"), get_excel_label("surname_from"), get_excel_label("surname_to"),
+               get_excel_label("classroom"), get_excel_label("students"), get_excel_label("student_names")]
+    ranges = write_styled_workbook(xlsx, headers, door_list_rows(exams), sheet_name="Kapı Listeleri")
+    
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("door_lists.pdf", pdf.getvalue())
+        archive.writestr("door_lists.xlsx", xlsx.getvalue())
+    
+    return {"exams": len(exams), "ranges": ranges}
@@ -0,0 +1,124 @@
+"""
+Enrollments - Set-based bulk edits of student_courses
+"""
+
+import json
+from typing import Iterable, Optional
+from src.database.db_manager import db_manager
+from src.utils.clash_index import rebuild_slot_index
+
+
+def _ids(values: Iterable[int]) -> str:
+    return json.dumps(sorted({int(value) for value in values}))
+
+
+def _finish(cursor, changed_rows) -> int:
+    """
+    Mark edited students as changed for the next re-import
+    
+    Args:
+        changed_rows: student_id rows returned by the edit statement
+    
+    Returns:
+        Number of changed enrollments
+    """
+    if changed_rows:
+        cursor.execute("""
+            UPDATE students SET import_hash = NULL
+            WHERE id IN (SELECT value FROM json_each(?))
+        """, (_ids(row[0] for row in changed_rows),))
+    return len(changed_rows)
+
+
+def add_enrollments(student_ids: Iterable[int], course_ids: Iterable[int]) -> int:
+    """
+    Enroll every given student in every given course
+    
+    Args:
+        student_ids: Student IDs
+        course_ids: Course IDs
+    
+    Returns:
+        Number of enrollments created (existing ones are kept)
+    """
+    students, courses = _ids(student_ids), _ids(course_ids)
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            INSERT OR IGNORE INTO student_courses (student_id, course_id)
+            SELECT s.value, c.value
+            FROM json_each(?) s
+            CROSS JOIN json_each(?) c
+            RETURNING student_id
+        """, (students, courses))
+        added = _finish(cursor, cursor.fetchall())
+        if added:
+            rebuild_slot_index(course_ids=json.loads(courses), cursor=cursor)
+    
+    return added
+
+
+def remove_enrollments(student_ids: Iterable[int], course_ids: Iterable[int]) -> int:
+    """
+    Drop the given students from the given courses
+    
+    Args:
+        student_ids: Student IDs
+        course_ids: Course IDs
+    
+    Returns:
+        Number of enrollments removed
+    """
+    students, courses = _ids(student_ids), _ids(course_ids)
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            DELETE FROM student_courses
+            WHERE student_id IN (SELECT value FROM json_each(?))
+            AND course_id IN (SELECT value FROM json_each(?))
+            RETURNING student_id
+        """, (students, courses))
+        removed = _finish(cursor, cursor.fetchall())
+        if removed:
+            rebuild_slot_index(course_ids=json.loads(courses), cursor=cursor)
+    
+    return removed
+
+
+def move_enrollments(from_course_id: int, to_course_id: int,
+                     student_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Move a cohort from one course to another
+    
+    Students already enrolled in the target course simply lose the source
+    enrollment, so the move never creates duplicates.
+    
+    Args:
+        from_course_id: Course the students leave
+        to_course_id: Course the students join
+        student_ids: Students to move (None = everyone in the source course)
+    
+    Returns:
+        Number of students moved
+    """
+    if from_course_id == to_course_id:
+        return 0
+    
+    cohort = ""
+    params = (to_course_id, from_course_id)
+    if student_ids is not None:
+        cohort = "AND student_id IN (SELECT value FROM json_each(?))"
+        params += (_ids(student_ids),)
+    
+    with db_manager.transaction() as cursor:
+        # REPLACE drops the existing target row when a student is already enrolled there
+        cursor.execute(f"""
+            UPDATE OR REPLACE student_courses SET course_id = ?
+            WHERE course_id = ? {cohort}
+            RETURNING student_id
+        """, params)
+        moved = _finish(cursor, cursor.fetchall())
+        if moved:
+            rebuild_slot_index(course_ids=[from_course_id, to_course_id], cursor=cursor)
+    
+    return moved
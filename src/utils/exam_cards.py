@@ -0,0 +1,262 @@
+"""
+Exam Cards - One-page personal exam timetables for every student of a department
+"""
+
+import io
+import itertools
+import multiprocessing
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from src.database.db_manager import db_manager
+
+CARDS_PER_FILE = 1000
+
+CARD_EXAM_COLUMNS = ["Date", "Time", "Course", "Course Name", "Classroom", "Seat"]
+
+
+def _department_filter(department_id: Optional[int]) -> Tuple[str, tuple]:
+    if department_id is None:
+        return "", ()
+    return "WHERE s.department_id = ?", (department_id,)
+
+
+def count_card_students(department_id: Optional[int] = None) -> int:
+    """
+    Count students that get an exam card (students with at least one scheduled exam)
+    
+    Args:
+        department_id: Only students of this department (None = all)
+    
+    Returns:
+        Number of students
+    """
+    where, params = _department_filter(department_id)
+    query = f"""
+        SELECT COUNT(DISTINCT s.id) as count
+        FROM students s
+        JOIN student_courses sc ON sc.student_id = s.id
+        JOIN exams e ON e.course_id = sc.course_id
+        {where}
+    """
+    return db_manager.execute_query(query, params)[0]["count"]
+
+
+def iter_exam_cards(department_id: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    Stream exam cards from one bulk query
+    
+    Args:
+        department_id: Only students of this department (None = all)
+    
+    Yields:
+        (student_no, name, department name, class level, exams) ordered by
+        student number. exams is a list of (date, time, course code, course
+        name, classroom, seat) tuples in exam order; students that are not
+        seated yet get the exam's classrooms and no seat.
+    """
+    where, params = _department_filter(department_id)
+    query = f"""
+        WITH exam_rooms AS (
+            SELECT ec.exam_id, GROUP_CONCAT(cl.name, ', ') as rooms
+            FROM exam_classrooms ec
+            JOIN classrooms cl ON cl.id = ec.classroom_id
+            GROUP BY ec.exam_id
+        )
+        SELECT s.id, s.student_no, s.name, s.class_level, d.name as department_name,
+               e.date, e.start_time, c.code, c.name as course_name,
+               COALESCE(cl.name, er.rooms, '') as classroom,
+               es.row, es.col, es.seat_position
+        FROM students s
+        JOIN departments d ON d.id = s.department_id
+        JOIN student_courses sc ON sc.student_id = s.id
+        JOIN exams e ON e.course_id = sc.course_id
+        JOIN courses c ON c.id = e.course_id
+        LEFT JOIN exam_seating es ON es.exam_id = e.id AND es.student_id = s.id
+        LEFT JOIN classrooms cl ON cl.id = es.classroom_id
+        LEFT JOIN exam_rooms er ON er.exam_id = e.id
+        {where}
+        ORDER BY s.student_no, s.id, e.date, e.start_time
+    """
+    rows = db_manager.iter_query(query, params, batch_size=5000)
+    
+    for _, student_rows in itertools.groupby(rows, key=lambda row: row["id"]):
+        first = next(student_rows)
+        exams = []
+        for row in itertools.chain([first], student_rows):
+            seat = ""
+            if row["row"] is not None:
+                seat = f"Row {row['row'] + 1}, Col {row['col'] + 1}"
+                if row["seat_position"] > 1:
+                    seat += f" ({row['seat_position']})"
+            exams.append((row["date"], row["start_time"], row["code"], row["course_name"],
+                          row["classroom"], seat))
+        yield (first["student_no"], first["name"], first["department_name"], first["class_level"], exams)
+
+
+def _fit(canv, text: str, font: str, size: float, width: float) -> str:
+    """Cut text with an ellipsis so it fits into width"""
+    text = str(text)
+    if canv.stringWidth(text, font, size) <= width:
+        return text
+    while text and canv.stringWidth(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def render_exam_cards(cards: List[Tuple], output: Union[str, BinaryIO], generated_at: str) -> None:
+    """
+    Render exam cards into one PDF, one page per student
+    
+    The page frame (title, labels and table header) is drawn once as a form
+    and reused on every page; only the student's own data is drawn per page.
+    
+    Args:
+        cards: Cards as yielded by iter_exam_cards
+        output: Path or writable binary stream for the PDF
+        generated_at: Timestamp printed in the footer
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    
+    width, height = A4
+    margin = 40
+    row_height = 20
+    table_top = height - 190
+    max_rows = int((table_top - margin - 40) // row_height) - 1
+    col_widths = [70, 45, 65, 170, 95, 70]
+    col_x = [margin + sum(col_widths[:i]) for i in range(len(col_widths))]
+    header_color = colors.HexColor('#2C3E50')
+    
+    canv = canvas.Canvas(output, pagesize=A4)
+    
+    canv.beginForm("ExamCardFrame")
+    canv.setFillColor(header_color)
+    canv.rect(0, height - 80, width, 80, stroke=0, fill=1)
+    canv.setFillColor(colors.white)
+    canv.setFont("Helvetica-Bold", 18)
+    canv.drawCentredString(width / 2, height - 45, "Exam Card")
+    canv.setFont("Helvetica", 10)
+    canv.drawCentredString(width / 2, height - 65, "Kocaeli University Exam Scheduler")
+    canv.setFillColor(colors.black)
+    canv.setFont("Helvetica-Bold", 10)
+    for i, label in enumerate(["Student No:", "Name:", "Department:", "Class:"]):
+        canv.drawString(margin, height - 110 - i * 16, label)
+    canv.setFillColor(header_color)
+    canv.rect(margin, table_top - row_height, sum(col_widths), row_height, stroke=0, fill=1)
+    canv.setFillColor(colors.white)
+    for x, label in zip(col_x, CARD_EXAM_COLUMNS):
+        canv.drawString(x + 4, table_top - row_height + 6, label)
+    canv.setFont("Helvetica", 8)
+    canv.setFillColor(colors.grey)
+    canv.drawString(margin, margin - 15, f"Generated on {generated_at} | Kocaeli University Exam Scheduler")
+    canv.endForm()
+    
+    for student_no, name, department_name, class_level, exams in cards:
+        canv.doForm("ExamCardFrame")
+        canv.setFillColor(colors.black)
+        
+        # One text object per page is much cheaper than a drawString per cell
+        text = canv.beginText()
+        text.setFont("Helvetica", 10)
+        values = [student_no, name, department_name, class_level or "-"]
+        for i, value in enumerate(values):
+            text.setTextOrigin(margin + 80, height - 110 - i * 16)
+            text.textOut(_fit(canv, value, "Helvetica", 10, 400))
+        
+        text.setFont("Helvetica", 9)
+        y = table_top - row_height
+        lines = []
+        for exam in exams[:max_rows]:
+            y -= row_height
+            lines.append((margin, y, margin + sum(col_widths), y))
+            for x, col_width, value in zip(col_x, col_widths, exam):
+                text.setTextOrigin(x + 4, y + 6)
+                text.textOut(_fit(canv, value, "Helvetica", 9, col_width - 8))
+        
+        if len(exams) > max_rows:
+            text.setFont("Helvetica-Oblique", 9)
+            text.setTextOrigin(margin, y - 16)
+            text.textOut(f"+ {len(exams) - max_rows} more exams")
+        
+        canv.drawText(text)
+        canv.setStrokeColor(colors.lightgrey)
+        canv.lines(lines)
+        canv.showPage()
+    
+    canv.save()
+
+
+def _render_card_chunk(cards: List[Tuple], generated_at: str) -> bytes:
+    """Render one chunk of exam cards in memory (runs in a worker process)"""
+    from reportlab import rl_config
+    
+    # Plain zlib streams skip ReportLab's slow pure-Python ASCII85 encoder; the
+    # setting only affects this worker process
+    rl_config.useA85 = 0
+    output = io.BytesIO()
+    render_exam_cards(cards, output, generated_at)
+    return output.getvalue()
+
+
+def export_exam_cards(output: Union[str, BinaryIO], department_id: Optional[int] = None,
+                      progress_callback: Optional[Callable[[int, int], None]] = None,
+                      max_workers: Optional[int] = None, cards_per_file: int = CARDS_PER_FILE) -> Dict:
+    """
+    Export an exam card for every student into a ZIP of PDF files
+    
+    Cards are read with one streaming query and rendered in chunks of
+    cards_per_file students by a process pool. Only a few chunks are in
+    flight at a time, so memory stays flat however many students there are.
+    
+    Args:
+        output: Path or writable binary stream for the ZIP archive
+        department_id: Only students of this department (None = all)
+        progress_callback: Called with (cards done, total) after every chunk;
+                           an exception from it stops the export
+        max_workers: Number of worker processes (None = CPU count)
+        cards_per_file: Students per PDF file
+    
+    Returns:
+        Dictionary with students (card count) and files (PDF count)
+    """
+    total = count_card_students(department_id)
+    if not total:
+        raise ValueError("No students with scheduled exams found")
+    
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+    chunk_count = -(-total // cards_per_file)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, chunk_count))
+    result = {"students": 0, "files": 0}
+    
+    cards = iter_exam_cards(department_id)
+    chunks = iter(lambda: list(itertools.islice(cards, cards_per_file)), [])
+    
+    def write_chunk(future, size):
+        result["files"] += 1
+        result["students"] += size
+        archive.writestr(f"exam_cards_{result['files']:04d}.pdf", future.result())
+        if progress_callback:
+            progress_callback(result["students"], total)
+    
+    # Spawn keeps the workers independent of the GUI process's threads
+    context = multiprocessing.get_context("spawn")
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append((pool.submit(_render_card_chunk, chunk, generated_at), len(chunk)))
+                if len(pending) >= workers * 2:
+                    write_chunk(*pending.popleft())
+            while pending:
+                write_chunk(*pending.popleft())
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    
+    return result
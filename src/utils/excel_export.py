@@ -1,11 +1,19 @@
+"""
+Excel Export - Styled, streaming Excel exports with Turkish labels
+"""
 
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+import itertools
+import re
+from typing import Callable, Iterable, Iterator, List, Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 from src.utils.turkish_translations import get_excel_label, get_exam_type_turkish
 from src.database.db_manager import db_manager
+from src.utils.seating import load_exam_seating
+from src.utils.export_cache import cached_export, SEATING_TABLES, SCHEDULE_TABLES, STUDENT_TABLES
 
 GREEN_DARK = "27AE60"
 GREEN_LIGHT = "E8F8F5"
@@ -13,6 +21,26 @@ TEXT_WHITE = "FFFFFF"
 TEXT_DARK = "2C3E50"
 BORDER_COLOR = "27AE60"
 
+WIDTH_SAMPLE_ROWS = 1000
+PROGRESS_STEP = 1000
+MAX_COLUMN_WIDTH = 50
+
+MAX_SHEET_TITLE = 31
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+# Students per course counted once in a grouped pass instead of a correlated subquery per exam
+ENROLLMENT_COUNTS_CTE = """
+    WITH enrollment_counts AS (
+        SELECT course_id, COUNT(*) as students
+        FROM student_courses
+        GROUP BY course_id
+    )
+"""
+
+HEADER_STYLE = "export_header"
+ROW_STYLE = "export_row"
+ALT_ROW_STYLE = "export_row_alt"
+
 def get_thin_border():
     thin_border = Border(
         left=Side(style="thin", color=BORDER_COLOR),
@@ -22,122 +50,349 @@ def get_thin_border():
     )
     return thin_border
 
-def format_excmanual_with_styling(fwith_path: str, sheet_name: str = "Sheet1"):
-    wb = load_workbook(fwith_path)
-    ws = wb[sheet_name]
+def register_export_styles(wb: Workbook):
+    """Add the header and zebra row named styles to a workbook once"""
+    if HEADER_STYLE in wb.named_styles:
+        return
+    
+    border = get_thin_border()
+    
+    header = NamedStyle(name=HEADER_STYLE)
+    header.fill = PatternFill(start_color=GREEN_DARK, end_color=GREEN_DARK, fill_type="solid")
+    header.font = Font(bold=True, color=TEXT_WHITE, size=11)
+    header.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    header.border = border
+    wb.add_named_style(header)
+    
+    for name, color in ((ROW_STYLE, TEXT_WHITE), (ALT_ROW_STYLE, GREEN_LIGHT)):
+        row_style = NamedStyle(name=name)
+        row_style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        row_style.font = Font(color=TEXT_DARK, size=10)
+        row_style.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        row_style.border = border
+        wb.add_named_style(row_style)
+
+def write_styled_sheet(wb: Workbook, sheet_name: str, headers: List[str], rows: Iterable[tuple],
+                       progress_callback: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Stream rows into a new write-only sheet with the export styling
+    
+    Column widths must be set before the first row is written, so they are
+    measured on the header and the first WIDTH_SAMPLE_ROWS rows, which are
+    held back until then; later rows go straight to disk.
+    
+    Args:
+        wb: Write-only workbook with the export styles registered
+        sheet_name: Title of the new sheet
+        headers: Column labels
+        rows: Iterable of value tuples, one per data row
+        progress_callback: Called with the rows written so far every PROGRESS_STEP
+                           rows; an exception from it stops the export
+    
+    Returns:
+        Number of data rows written
+    """
+    ws = wb.create_sheet(title=sheet_name)
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, WIDTH_SAMPLE_ROWS))
+    
+    widths = [len(str(header)) for header in headers]
+    for values in sample:
+        for idx, value in enumerate(values):
+            if value:
+                widths[idx] = max(widths[idx], len(str(value)))
+    for idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, MAX_COLUMN_WIDTH)
+    ws.row_dimensions[1].height = 30
+    
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = HEADER_STYLE
+        header_cells.append(cell)
+    ws.append(header_cells)
+    
+    # One styled cell per column and stripe, reused for every row
+    stripes = {}
+    for style in (ALT_ROW_STYLE, ROW_STYLE):
+        stripes[style] = [WriteOnlyCell(ws) for _ in headers]
+        for cell in stripes[style]:
+            cell.style = style
+    
+    count = 0
+    for count, values in enumerate(itertools.chain(sample, rows), start=1):
+        # Data row n sits on sheet row n + 1; even sheet rows get the light stripe
+        cells = stripes[ALT_ROW_STYLE if count % 2 == 1 else ROW_STYLE]
+        for cell, value in zip(cells, values):
+            cell.value = value
+        ws.append(cells)
+        if progress_callback and count % PROGRESS_STEP == 0:
+            progress_callback(count)
+    
+    return count
+
+def write_styled_workbook(output_path: str, headers: List[str], rows: Iterable[tuple],
+                          sheet_name: str = "Sheet1",
+                          progress_callback: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Write one styled sheet to a new workbook in a single streaming pass
+    
+    Args:
+        output_path: Target .xlsx path
+        headers: Column labels
+        rows: Iterable of value tuples
+        sheet_name: Title of the sheet
+        progress_callback: Passed on to write_styled_sheet
+    
+    Returns:
+        Number of data rows written
+    """
+    wb = Workbook(write_only=True)
+    register_export_styles(wb)
+    count = write_styled_sheet(wb, sheet_name, headers, rows, progress_callback)
+    wb.save(output_path)
+    return count
+
+def _require_rows(rows: Iterable, message: str) -> Iterator:
+    """Return an iterator over rows, raising ValueError when there are none"""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        raise ValueError(message)
+    return itertools.chain([first], rows)
+
+@cached_export("exam_schedule_xlsx", SCHEDULE_TABLES)
+def export_exam_schedule_to_excmanual(department_id: int = None, output_path: str = None,
+                                      progress_callback: Optional[Callable[[int], None]] = None) -> str:
+    """
+    Export exam schedule to Excel with Turkish labels and professional formatting
+    
+    Args:
+        department_id: Optional department ID. If None, exports all departments
+        output_path: Optional output file path
+        progress_callback: Called with the rows written so far, see write_styled_sheet
+        
+    Returns:
+        Generated filename
+    """
+    dept_filter = "WHERE e.department_id = ?" if department_id else ""
+    params = (department_id,) if department_id else ()
+    
+    exams_query = f"""
+        {ENROLLMENT_COUNTS_CTE}
+        SELECT e.id, e.date, e.start_time, c.code as course_code, c.name as course_name,
+               e.duration, e.exam_type, d.name as department_name,
+               COALESCE(en.students, 0) as students,
+               GROUP_CONCAT(cl.name, ", ") as classrooms
+        FROM exams e
+        JOIN courses c ON e.course_id = c.id
+        JOIN departments d ON e.department_id = d.id
+        LEFT JOIN enrollment_counts en ON en.course_id = e.course_id
+        LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
+        LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
+        {dept_filter}
+        GROUP BY e.id
+        ORDER BY e.date, e.start_time
+    """
+    exams = _require_rows(db_manager.iter_query(exams_query, params), "No exams scheduled")
     
-    header_fill = PatternFill(start_color=GREEN_DARK, end_color=GREEN_DARK, fill_type="solid")
-    header_font = Font(bold=True, color=TEXT_WHITE, size=11)
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    headers = [get_excel_label("date"), get_excel_label("time"),
+               get_excel_label("course_code"), get_excel_label("course_name")]
+    if not department_id:
+        headers.append(get_excel_label("department"))
+    headers += [get_excel_label("exam_type"), get_excel_label("duration"),
+                get_excel_label("students"), get_excel_label("classrooms")]
     
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cmanuall.border = get_thin_border()
+    def rows():
+        for exam in exams:
+            row = (exam["date"], exam["start_time"], exam["course_code"], exam["course_name"])
+            if not department_id:
+                row += (exam["department_name"],)
+            yield row + (get_exam_type_turkish(exam["exam_type"]), exam["duration"],
+                         exam["students"], exam["classrooms"] or "-")
     
-    row_fill_normal = PatternFill(start_color=TEXT_WHITE, end_color=TEXT_WHITE, fill_type="solid")
-    row_fill_alt = PatternFill(start_color=GREEN_LIGHT, end_color=GREEN_LIGHT, fill_type="solid")
-    data_font = Font(color=TEXT_DARK, size=10)
-    data_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    if output_path is None:
+        filename = f"exam_schedule_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    else:
+        filename = output_path
     
-    for idx, row in enumerate(ws.iter_rows(min_row=2, max_row=ws.max_row), start=2):
-        fill = row_fill_alt if (idx % 2 == 0) else row_fill_normal
+    write_styled_workbook(filename, headers, rows(), progress_callback=progress_callback)
+    
+    return filename
+
+def _sheet_title(name: str, used: set) -> str:
+    """Excel-safe, unique sheet title of at most MAX_SHEET_TITLE characters"""
+    base = INVALID_SHEET_CHARS.sub("_", name).strip("'")[:MAX_SHEET_TITLE] or "Sheet"
+    title = base
+    suffix = 2
+    while title.lower() in used:
+        title = f"{base[:MAX_SHEET_TITLE - len(str(suffix)) - 1]}_{suffix}"
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+@cached_export("combined_schedule_xlsx", SCHEDULE_TABLES)
+def export_combined_schedule_to_excmanual(output_path: str = None,
+                                          progress_callback: Optional[Callable[[int], None]] = None) -> str:
+    """
+    Export every department's exam schedule into one workbook, one sheet per department
+    
+    All exams are read with a single query ordered by department, and each
+    department's rows are streamed into its own write-only sheet.
+    
+    Args:
+        output_path: Optional output file path
+        progress_callback: Called with the rows written so far across all sheets
+                           every PROGRESS_STEP rows of a sheet
         
-        for cell in row:
-            cell.fill = fill
-            cell.font = data_font
-            cell.alignment = data_alignment
-            cell.border = get_thin_border()
-    
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
+    Returns:
+        Generated filename
+    """
+    exams_query = f"""
+        {ENROLLMENT_COUNTS_CTE}
+        SELECT e.id, e.department_id, d.code as department_code, d.name as department_name,
+               e.date, e.start_time, c.code as course_code, c.name as course_name,
+               e.duration, e.exam_type, COALESCE(en.students, 0) as students,
+               GROUP_CONCAT(cl.name, ", ") as classrooms
+        FROM exams e
+        JOIN courses c ON e.course_id = c.id
+        JOIN departments d ON e.department_id = d.id
+        LEFT JOIN enrollment_counts en ON en.course_id = e.course_id
+        LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
+        LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
+        GROUP BY e.id
+        ORDER BY d.name, e.department_id, e.date, e.start_time
+    """
+    exams = _require_rows(db_manager.iter_query(exams_query, batch_size=5000), "No exams scheduled")
+    
+    headers = [get_excel_label("date"), get_excel_label("time"), get_excel_label("course_code"),
+               get_excel_label("course_name"), get_excel_label("exam_type"), get_excel_label("duration"),
+               get_excel_label("students"), get_excel_label("classrooms")]
+    
+    if output_path is None:
+        filename = f"exam_schedule_all_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    else:
+        filename = output_path
+    
+    wb = Workbook(write_only=True)
+    register_export_styles(wb)
+    used_titles = set()
+    written = 0
+    
+    for _, department_exams in itertools.groupby(exams, key=lambda exam: exam["department_id"]):
+        first = next(department_exams)
+        rows = ((exam["date"], exam["start_time"], exam["course_code"], exam["course_name"],
+                 get_exam_type_turkish(exam["exam_type"]), exam["duration"],
+                 exam["students"], exam["classrooms"] or "-")
+                for exam in itertools.chain([first], department_exams))
         
-        for cell in column:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
+        def sheet_progress(count, offset=written):
+            progress_callback(offset + count)
         
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
+        title = _sheet_title(first["department_code"] or first["department_name"], used_titles)
+        written += write_styled_sheet(wb, title, headers, rows, sheet_progress if progress_callback else None)
     
-    ws.row_dimensions[1].height = 30
+    wb.save(filename)
     
-    wb.save(fwith_path)
-
-def export_exam_schedule_to_excmanual(department_id: int = None, output_path: str = None) -> str:
-    if department_id:
-        exams_query = """
-            SELECT e.id, e.date, e.start_time, c.code as course_code, c.name as course_name,
-                   e.duration, e.exam_type, d.name as department_name,
-                   (SELECT COUNT(*) FROM student_courses sc WHERE sc.course_id = e.course_id) as students,
-                   GROUP_CONCAT(cl.name, ", ") as classrooms
-            FROM exams e
-            JOIN courses c ON e.course_id = c.id
-            JOIN departments d ON e.department_id = d.id
-            LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
-            LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
-            WHERE e.department_id = ?
-            GROUP BY e.id
-            ORDER BY e.date, e.start_time
-            SELECT e.id, e.date, e.start_time, c.code as course_code, c.name as course_name,
-                   e.duration, e.exam_type, d.name as department_name,
-                   (SELECT COUNT(*) FROM student_courses sc WHERE sc.course_id = e.course_id) as students,
-                   GROUP_CONCAT(cl.name, ", ") as classrooms
-            FROM exams e
-            JOIN courses c ON e.course_id = c.id
-            JOIN departments d ON e.department_id = d.id
-            LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
-            LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
-            GROUP BY e.id
-            ORDER BY e.date, e.start_time
+    return filename
+
+@cached_export("seating_plan_xlsx", SEATING_TABLES)
+def export_seating_plan_to_excmanual(exam_id: int, output_path: str = None,
+                                     progress_callback: Optional[Callable[[int], None]] = None) -> str:
+    """
     Export seating plan to Excel with Turkish labels and professional formatting
     
     Args:
         exam_id: Exam ID
         output_path: Optional output file path
+        progress_callback: Called with the rows written so far, see write_styled_sheet
         
     Returns:
         Generated filename
+    """
+    exam_query = """
         SELECT e.id, e.date, e.start_time, c.code as course_code, c.name as course_name,
                e.exam_type
         FROM exams e
         JOIN courses c ON e.course_id = c.id
         WHERE e.id = ?
-        SELECT cl.name as classroom, s.student_no, s.name as student_name,
-               es.row, es.col, es.seat_position
-        FROM exam_seating es
-        JOIN students s ON es.student_id = s.id
-        JOIN classrooms cl ON es.classroom_id = cl.id
-        WHERE es.exam_id = ?
-        ORDER BY cl.name, es.row, es.col, es.seat_position
+    """
+    exam_result = db_manager.execute_query(exam_query, (exam_id,))
+    
+    if not exam_result:
+        raise ValueError("Exam not found")
+    
+    exam = exam_result[0]
+    
+    def rows():
+        for classroom in load_exam_seating(exam_id):
+            for seat in classroom["seats"]:
+                seat_label = f"{seat['col'] + 1}"
+                if seat["seat_position"] > 1:
+                    seat_label += f" ({seat['seat_position']})"
+                
+                yield (classroom["name"], seat["student_no"], seat["name"], seat["row"] + 1, seat_label)
+    
+    seats = _require_rows(rows(), "No seating plan generated for this exam")
+    
+    if output_path is None:
+        filename = f"seating_plan_{exam['course_code']}_{exam['date'].replace('-', '')}.xlsx"
+    else:
+        filename = output_path
+    
+    headers = [get_excel_label("classroom"), get_excel_label("student_no"),
+               get_excel_label("student_name"), get_excel_label("row"), get_excel_label("seat")]
+    write_styled_workbook(filename, headers, seats, progress_callback=progress_callback)
+    
+    return filename
+
+@cached_export("students_xlsx", STUDENT_TABLES)
+def export_students_to_excmanual(classroom_id: int = None, output_path: str = None,
+                                 progress_callback: Optional[Callable[[int], None]] = None) -> str:
+    """
     Export students list to Excel with Turkish labels
     
+    Rows are streamed from the cursor into the workbook, so memory stays
+    flat for very large student lists.
+    
     Args:
         classroom_id: Optional classroom ID to filter
         output_path: Optional output file path
+        progress_callback: Called with the rows written so far, see write_styled_sheet
         
     Returns:
-        Generated fwithname
-            SELECT DISTINCT s.student_no, s.name, d.name as department_name,
-                   GROUP_CONCAT(c.code, ", ") as courses
-            FROM students s
-            JOIN departments d ON s.department_id = d.id
-            LEFT JOIN student_courses sc ON s.id = sc.student_id
-            LEFT JOIN courses c ON sc.course_id = c.id
-            WHERE s.department_id IN (
-                SELECT department_id FROM classrooms WHERE id = ?
-            )
-            GROUP BY s.id
-            ORDER BY s.student_no
-            SELECT s.student_no, s.name, d.name as department_name,
-                   GROUP_CONCAT(c.code, ", ") as courses
-            FROM students s
-            JOIN departments d ON s.department_id = d.id
-            LEFT JOIN student_courses sc ON s.id = sc.student_id
-            LEFT JOIN courses c ON sc.course_id = c.id
-            GROUP BY s.id
-            ORDER BY s.student_no
\ No newline at end of file
+        Generated filename
+    """
+    if classroom_id:
+        dept_filter = "WHERE s.department_id IN (SELECT department_id FROM classrooms WHERE id = ?)"
+        params = (classroom_id,)
+    else:
+        dept_filter = ""
+        params = ()
+    
+    students_query = f"""
+        SELECT s.student_no, s.name, d.name as department_name,
+               GROUP_CONCAT(c.code, ", ") as courses
+        FROM students s
+        JOIN departments d ON s.department_id = d.id
+        LEFT JOIN student_courses sc ON s.id = sc.student_id
+        LEFT JOIN courses c ON sc.course_id = c.id
+        {dept_filter}
+        GROUP BY s.id
+        ORDER BY s.student_no
+    """
+    students = _require_rows(db_manager.iter_query(students_query, params), "No students found")
+    
+    if output_path is None:
+        filename = f"students_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    else:
+        filename = output_path
+    
+    headers = [get_excel_label("student_no"), get_excel_label("student_name"),
+               get_excel_label("department"), get_excel_label("courses")]
+    write_styled_workbook(filename, headers, (
+        (student["student_no"], student["name"], student["department_name"], student["courses"] or "-")
+        for student in students
+    ), progress_callback=progress_callback)
+    
+    return filename
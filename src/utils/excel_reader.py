@@ -0,0 +1,237 @@
+"""
+Excel Reader - Stream large workbooks, CSV and Parquet files as DataFrame chunks
+"""
+
+import codecs
+import csv
+import os
+from typing import Iterable, Iterator, List, Optional
+import pandas as pd
+from openpyxl import load_workbook
+from config import IMPORT_CHUNK_SIZE
+
+HEADER_SCAN_ROWS = 20
+CSV_ENCODINGS = ["utf-8-sig", "cp1254"]
+CSV_DELIMITERS = ",;\t"
+
+
+class ExcelChunkReader:
+    """Read the first sheet of a workbook in fixed-size chunks"""
+    
+    def __init__(self, file_path: str, header_keywords: Iterable[str], chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Args:
+            file_path: Path to an .xlsx or .xls workbook
+            header_keywords: Column names that identify the header row
+            chunk_size: Number of data rows per chunk
+        """
+        self.file_path = file_path
+        self.header_keywords = {str(keyword).strip() for keyword in header_keywords}
+        self.chunk_size = chunk_size
+        self.columns: Optional[List[str]] = None
+        self.header_row: Optional[int] = None
+        self.total_rows = 0
+        self.rows_read = 0
+        
+        if os.path.splitext(file_path)[1].lower() != ".xls":
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                self.total_rows = workbook.worksheets[0].max_row or 0
+            finally:
+                workbook.close()
+    
+    def _is_header(self, values) -> bool:
+        return any(value is not None and str(value).strip() in self.header_keywords for value in values)
+    
+    def _iter_rows(self) -> Iterator[tuple]:
+        if os.path.splitext(self.file_path)[1].lower() == ".xls":
+            # Legacy workbooks cannot be streamed; read them whole and replay the rows
+            frame = pd.read_excel(self.file_path, header=None)
+            self.total_rows = len(frame)
+            for values in frame.itertuples(index=False, name=None):
+                yield tuple(None if pd.isna(value) else value for value in values)
+            return
+        
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    
+    def _make_chunk(self, rows: List[tuple]) -> pd.DataFrame:
+        width = len(self.columns)
+        chunk = pd.DataFrame(
+            [tuple(values[:width]) + (None,) * (width - len(values)) for _, values in rows],
+            columns=self.columns,
+            # Index so that index + 2 is the sheet row, as with pd.read_excel
+            index=[sheet_row - 2 for sheet_row, _ in rows]
+        )
+        return chunk.dropna(how="all")
+    
+    def _set_header(self, sheet_row: int, values: tuple):
+        self.header_row = sheet_row
+        self.columns = [
+            str(value).strip() if value is not None else f"Unnamed: {idx}"
+            for idx, value in enumerate(values)
+        ]
+    
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        """
+        Yield DataFrame chunks below the detected header row
+        
+        The header is the first row (within HEADER_SCAN_ROWS) holding one of
+        the header keywords, falling back to the first non-empty row.
+        """
+        pending: List[tuple] = []
+        buffer: List[tuple] = []
+        
+        for sheet_row, values in enumerate(self._iter_rows(), start=1):
+            self.rows_read = sheet_row
+            if self.columns is None:
+                if all(value is None for value in values):
+                    continue
+                pending.append((sheet_row, values))
+                if self._is_header(values):
+                    self._set_header(sheet_row, values)
+                    pending = []
+                elif len(pending) >= HEADER_SCAN_ROWS:
+                    header_row, header_values = pending[0]
+                    self._set_header(header_row, header_values)
+                    buffer.extend(pending[1:])
+                    pending = []
+                continue
+            
+            buffer.append((sheet_row, values))
+            
+            if len(buffer) >= self.chunk_size:
+                yield self._make_chunk(buffer)
+                buffer = []
+        
+        if self.columns is None and pending:
+            header_row, header_values = pending[0]
+            self._set_header(header_row, header_values)
+            buffer.extend(pending[1:])
+        
+        if buffer:
+            yield self._make_chunk(buffer)
+
+
+class CsvChunkReader:
+    """Read a delimited text file in fixed-size chunks with the pandas C parser"""
+    
+    def __init__(self, file_path: str, header_keywords: Iterable[str], chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Args:
+            file_path: Path to a .csv file (comma, semicolon or tab separated)
+            header_keywords: Column names that identify the header row
+            chunk_size: Number of data rows per chunk
+        """
+        self.file_path = file_path
+        self.header_keywords = {str(keyword).strip() for keyword in header_keywords}
+        self.chunk_size = chunk_size
+        self.columns: Optional[List[str]] = None
+        self.header_row: Optional[int] = None
+        self.rows_read = 0
+        
+        self.encoding, sample = self._detect_encoding()
+        self.sample_lines = sample.splitlines()[:HEADER_SCAN_ROWS]
+        self.delimiter = max(CSV_DELIMITERS, key=lambda delimiter: sum(line.count(delimiter) for line in self.sample_lines))
+        
+        with open(file_path, "rb") as f:
+            self.total_rows = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+    
+    def _detect_encoding(self):
+        with open(self.file_path, "rb") as f:
+            raw = f.read(64 * 1024)
+        for encoding in CSV_ENCODINGS:
+            try:
+                # The sample may end inside a multibyte character, so decode it as an unfinished stream
+                text = codecs.getincrementaldecoder(encoding)().decode(raw, final=False)
+                return encoding, text.rsplit("\n", 1)[0]
+            except UnicodeDecodeError:
+                continue
+        return "latin-1", raw.decode("latin-1")
+    
+    def _find_header(self) -> int:
+        """Return the 0-based line of the header row"""
+        first_non_empty = None
+        for line, values in enumerate(csv.reader(self.sample_lines, delimiter=self.delimiter)):
+            if any(value.strip() in self.header_keywords for value in values):
+                return line
+            if first_non_empty is None and any(value.strip() for value in values):
+                first_non_empty = line
+        return first_non_empty or 0
+    
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        """Yield DataFrame chunks below the detected header row"""
+        header_line = self._find_header()
+        self.header_row = header_line + 1
+        
+        reader = pd.read_csv(
+            self.file_path, skiprows=header_line, header=0, dtype=str, chunksize=self.chunk_size,
+            sep=self.delimiter, encoding=self.encoding, engine="c", skip_blank_lines=False
+        )
+        
+        with reader:
+            for chunk in reader:
+                chunk.columns = [str(col).strip() for col in chunk.columns]
+                self.columns = list(chunk.columns)
+                # Index so that index + 2 is the file line, as with the Excel reader
+                chunk.index = chunk.index + header_line
+                self.rows_read = int(chunk.index[-1]) + 2
+                yield chunk.dropna(how="all")
+
+
+class ParquetChunkReader:
+    """Read a Parquet file batch by batch (requires pyarrow)"""
+    
+    def __init__(self, file_path: str, header_keywords: Iterable[str] = (), chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Args:
+            file_path: Path to a .parquet file
+            header_keywords: Unused; Parquet files carry their own column names
+            chunk_size: Number of rows per chunk
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet import requires the 'pyarrow' package (pip install pyarrow)")
+        
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.parquet_file = pq.ParquetFile(file_path)
+        self.columns: Optional[List[str]] = list(self.parquet_file.schema_arrow.names)
+        self.header_row = 1
+        self.total_rows = self.parquet_file.metadata.num_rows
+        self.rows_read = 0
+    
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        """Yield DataFrame chunks of the file's row groups"""
+        for batch in self.parquet_file.iter_batches(batch_size=self.chunk_size):
+            chunk = batch.to_pandas()
+            chunk.columns = [str(col).strip() for col in chunk.columns]
+            chunk.index = chunk.index + self.rows_read
+            self.rows_read += len(chunk)
+            yield chunk.dropna(how="all")
+
+
+def open_chunk_reader(file_path: str, header_keywords: Iterable[str], chunk_size: int = IMPORT_CHUNK_SIZE):
+    """
+    Pick the chunk reader for a file by its extension
+    
+    Args:
+        file_path: Path to an .xlsx, .xls, .csv or .parquet file
+        header_keywords: Column names that identify the header row
+        chunk_size: Number of data rows per chunk
+    
+    Returns:
+        Iterable reader with total_rows and rows_read attributes
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        return CsvChunkReader(file_path, header_keywords, chunk_size)
+    if extension == ".parquet":
+        return ParquetChunkReader(file_path, header_keywords, chunk_size)
+    if extension in (".xlsx", ".xls"):
+        return ExcelChunkReader(file_path, header_keywords, chunk_size)
+    raise ValueError(f"Unsupported file type: {extension}")
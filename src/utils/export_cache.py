@@ -0,0 +1,163 @@
+"""
+Export Cache - Reuse export files while the data they were built from is unchanged
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Iterable, Optional
+from config import EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_MB
+from src.database.db_manager import db_manager
+
+# Tables each kind of export reads from
+SEATING_TABLES = ('exams', 'courses', 'exam_classrooms', 'classrooms', 'exam_seating', 'students', 'departments')
+SCHEDULE_TABLES = ('exams', 'courses', 'departments', 'exam_classrooms', 'classrooms', 'student_courses')
+STUDENT_TABLES = ('students', 'departments', 'student_courses', 'courses', 'classrooms')
+
+
+class ExportCache:
+    """
+    Disk cache of export files keyed by export type, parameters and data versions
+    
+    The data version stamp combines the per-table change counters kept by
+    triggers in data_versions, so any write to a table an export reads from
+    gives it a new key. Entries are evicted least recently used first once
+    the cache grows beyond max_bytes.
+    """
+    
+    def __init__(self, directory: str = EXPORT_CACHE_DIR, max_bytes: int = EXPORT_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+    
+    def stamp(self, tables: Iterable[str]) -> Dict[str, int]:
+        """
+        Current data versions of the given tables and of the database itself
+        
+        Args:
+            tables: Table names counted in data_versions
+        
+        Returns:
+            Dictionary of version name -> version
+        """
+        names = sorted(set(tables) | {"database"})
+        rows = db_manager.execute_query(
+            "SELECT name, version FROM data_versions WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(names),)
+        )
+        versions = {row["name"]: row["version"] for row in rows}
+        return {name: versions.get(name, 0) for name in names}
+    
+    def key(self, export_type: str, params: Dict, stamp: Dict[str, int]) -> str:
+        """Cache key of an export built with these parameters from this data"""
+        payload = json.dumps([export_type, params, stamp], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+    
+    def get(self, key: str, extension: str) -> Optional[str]:
+        """
+        Path of a cached file, marking it as recently used
+        
+        Returns:
+            Path inside the cache, or None on a miss
+        """
+        path = self._path(key, extension)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+    
+    def put(self, key: str, extension: str, source_path: str):
+        """Copy a finished export into the cache and evict old entries"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, extension)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, path)
+        self.evict()
+    
+    def evict(self):
+        """Remove least recently used files until the cache fits into max_bytes"""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.directory)
+                           if entry.is_file() and not entry.name.endswith(".tmp")]
+            except OSError:
+                return
+            
+            files = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries)
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+    
+    def clear(self):
+        """Remove every cached file"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+export_cache = ExportCache()
+
+
+def cached_export(export_type: str, tables: Iterable[str], output_arg: str = "output_path"):
+    """
+    Serve an export function's file from the export cache when its data is unchanged
+    
+    Only calls that write to a file path are cached; calls without a path or
+    with a stream go straight to the export function.
+    
+    Args:
+        export_type: Name of the export, part of the cache key
+        tables: Tables the export reads from
+        output_arg: Name of the function's output path argument
+    """
+    tables = tuple(tables)
+    
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            output_path = bound.arguments.get(output_arg)
+            if not isinstance(output_path, (str, os.PathLike)):
+                return func(*args, **kwargs)
+            
+            # Callbacks such as progress_callback do not change the file
+            params = {name: value for name, value in bound.arguments.items()
+                      if name != output_arg and not name.endswith("_callback")}
+            extension = os.path.splitext(output_path)[1]
+            stamp = export_cache.stamp(tables)
+            key = export_cache.key(export_type, params, stamp)
+            
+            cached_path = export_cache.get(key, extension)
+            if cached_path is not None:
+                shutil.copyfile(cached_path, output_path)
+                return output_path
+            
+            result = func(*args, **kwargs)
+            # Data written while the export ran may or may not be in the file,
+            # so it is only cached when no version moved in the meantime
+            if export_cache.stamp(tables) == stamp:
+                try:
+                    export_cache.put(key, extension, output_path)
+                except OSError:
+                    pass
+            return result
+        
+        return wrapper
+    
+    return decorator
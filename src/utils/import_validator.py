@@ -0,0 +1,159 @@
+"""
+Import Validator - Dry-run checks for student import files
+"""
+
+import os
+from typing import List, Optional
+import pandas as pd
+from src.database.db_manager import db_manager
+from src.utils.lookup_cache import lookup_cache
+from config import MAX_CLASS_LEVEL
+
+REQUIRED_STUDENT_COLUMNS = ['student_no', 'name']
+
+REPORT_COLUMNS = ["row", "student_no", "severity", "message"]
+
+
+def _text(series: pd.Series) -> pd.Series:
+    return series.where(series.notna(), "").astype(str).str.strip().replace({"nan": "", "None": ""})
+
+
+def _issues(frame: pd.DataFrame, mask: pd.Series, severity: str, message) -> pd.DataFrame:
+    """Build report rows for the masked part of a frame; message may be a string or a Series"""
+    selected = frame[mask]
+    if isinstance(message, pd.Series):
+        message = message[mask]
+    return pd.DataFrame({
+        "row": selected["row"],
+        "student_no": selected["student_no"],
+        "severity": severity,
+        "message": message
+    })
+
+
+class StudentImportValidator:
+    """
+    Collect student import rows chunk by chunk and check them all at once
+    
+    Errors are rows or enrollments the import will skip; warnings are rows
+    that will be imported with a changed value.
+    """
+    
+    def __init__(self, department_id: int, course_department_id: Optional[int] = None):
+        """
+        Args:
+            department_id: Department the students are imported into
+            course_department_id: Department course codes must belong to (None = any)
+        """
+        self.department_id = department_id
+        self.course_department_id = course_department_id
+        self.missing_columns: List[str] = []
+        self.long_format = False
+        self._rows: List[pd.DataFrame] = []
+    
+    def add_chunk(self, df: pd.DataFrame):
+        """
+        Keep the columns needed for validation from a mapped chunk
+        
+        Args:
+            df: Chunk after map_student_columns, indexed so that index + 2 is the sheet row
+        """
+        self.missing_columns = [col for col in REQUIRED_STUDENT_COLUMNS if col not in df.columns]
+        if self.missing_columns:
+            return
+        
+        self.long_format = 'course_code' in df.columns
+        frame = pd.DataFrame({
+            "row": df.index.to_series().add(2).astype(int).values,
+            "student_no": _text(df["student_no"]).values,
+            "name": _text(df["name"]).values,
+            "class_level_raw": _text(df["class_level_str"] if "class_level_str" in df.columns
+                                     else df.get("class_level", pd.Series("", index=df.index))).values,
+            "class_level": pd.to_numeric(df["class_level"], errors="coerce").values
+                           if "class_level" in df.columns else float("nan"),
+            "courses": _text(df["course_code"] if self.long_format
+                             else df.get("course_codes", pd.Series("", index=df.index))).values,
+        })
+        self._rows.append(frame)
+    
+    def report(self) -> pd.DataFrame:
+        """
+        Run every check over the collected rows
+        
+        Returns:
+            DataFrame with row, student_no, severity and message, sorted by row
+        """
+        if self.missing_columns:
+            return pd.DataFrame([{
+                "row": None, "student_no": "", "severity": "error",
+                "message": f"Missing required columns: {', '.join(self.missing_columns)}"
+            }], columns=REPORT_COLUMNS)
+        
+        if not self._rows:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        
+        rows = pd.concat(self._rows, ignore_index=True)
+        issues = []
+        
+        blank = (rows["student_no"] == "") | (rows["name"] == "")
+        issues.append(_issues(rows, blank, "error", "Missing student number or name"))
+        rows = rows[~blank]
+        
+        # In long format a student repeats once per course, so only conflicting names count
+        if self.long_format:
+            names = rows.groupby("student_no")["name"].transform("nunique")
+            issues.append(_issues(rows, names > 1, "warning",
+                                  "Student number used with different names; the last name is kept"))
+            duplicate_pairs = rows.duplicated(["student_no", "courses"], keep="first") & (rows["courses"] != "")
+            issues.append(_issues(rows, duplicate_pairs, "warning", "Duplicate enrollment row"))
+        else:
+            duplicates = rows["student_no"].duplicated(keep="last")
+            issues.append(_issues(rows, duplicates, "warning",
+                                  "Duplicate student number; a later row replaces this one"))
+        
+        has_level = rows["class_level_raw"] != ""
+        level = rows["class_level"]
+        bad_level = has_level & (level.isna() | (level < 1) | (level > MAX_CLASS_LEVEL) | (level % 1 != 0))
+        issues.append(_issues(rows, bad_level, "warning",
+                              "Invalid class level '" + rows["class_level_raw"] + "'; stored empty"))
+        
+        edges = rows[["row", "student_no", "courses"]].assign(course_code=rows["courses"].str.split(","))
+        edges = edges.explode("course_code")
+        edges["course_code"] = edges["course_code"].fillna("").str.strip()
+        edges = edges[edges["course_code"] != ""]
+        
+        with db_manager.transaction() as cursor:
+            courses = lookup_cache.courses(cursor)
+        known = edges["course_code"].isin(courses["code"])
+        issues.append(_issues(edges, ~known, "error", "Unknown course code '" + edges["course_code"] + "'"))
+        
+        scope = self.course_department_id if self.course_department_id is not None else self.department_id
+        in_scope = edges["course_code"].isin(courses.loc[courses["department_id"] == scope, "code"])
+        other_department = known & ~in_scope
+        severity = "error" if self.course_department_id is not None else "warning"
+        issues.append(_issues(edges, other_department, severity,
+                              "Course '" + edges["course_code"] + "' belongs to another department"))
+        
+        report = pd.concat(issues, ignore_index=True)
+        return report.sort_values(["row", "severity"], kind="stable").reset_index(drop=True)
+
+
+def write_error_report(report: pd.DataFrame, output_path: str) -> str:
+    """
+    Save a validation report as CSV or Excel, depending on the extension
+    
+    Args:
+        report: Result of StudentImportValidator.report
+        output_path: Target .csv or .xlsx path
+    
+    Returns:
+        Path of the written file
+    """
+    labelled = report.rename(columns={
+        "row": "Row", "student_no": "Student No", "severity": "Severity", "message": "Message"
+    })
+    if os.path.splitext(output_path)[1].lower() == ".csv":
+        labelled.to_csv(output_path, index=False, encoding="utf-8-sig")
+    else:
+        labelled.to_excel(output_path, index=False, sheet_name="Import Errors")
+    return output_path
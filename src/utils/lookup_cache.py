@@ -0,0 +1,128 @@
+"""
+Lookup Cache - Course code and student number resolution shared across imports
+"""
+
+import json
+import threading
+from typing import Dict, List, Optional
+import pandas as pd
+from src.database.db_manager import db_manager
+
+
+class LookupCache:
+    """
+    Cache code -> ID maps until the table they come from changes
+    
+    Every entry remembers the data version it was built from (the
+    'courses' and 'students' versions are bumped by triggers, the
+    'database' stamp is random per database file), so a lookup costs one
+    version read instead of reloading the table.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, tuple] = {}
+    
+    def _read_version(self, cursor, name: str) -> tuple:
+        """Version of a table together with the random stamp of the database file"""
+        cursor.execute("SELECT name, version FROM data_versions WHERE name IN ('database', ?)", (name,))
+        versions = dict(cursor.fetchall())
+        # A replaced database file (e.g. a restored backup) can repeat the table counters
+        return versions.get("database", 0), versions.get(name, 0)
+    
+    def _lookup(self, cursor, version_name: str, key: tuple):
+        """Return (cache key, version, cached value or None)"""
+        version = self._read_version(cursor, version_name)
+        cache_key = (db_manager.db_path, version_name) + key
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        return cache_key, version, entry[1] if entry is not None and entry[0] == version else None
+    
+    def _get(self, cursor, version_name: str, key: tuple, load):
+        cache_key, version, value = self._lookup(cursor, version_name, key)
+        if value is not None:
+            return value
+        
+        value = load()
+        # Uncommitted writes may still roll back, which would reuse their version number
+        if not cursor.connection.in_transaction:
+            with self._lock:
+                self._entries[cache_key] = (version, value)
+        return value
+    
+    def courses(self, cursor) -> pd.DataFrame:
+        """
+        All courses as a frame of id, code and department_id
+        
+        Args:
+            cursor: Cursor of the current transaction
+        
+        Returns:
+            Cached frame; callers must not modify it
+        """
+        def load():
+            cursor.execute("SELECT id, code, department_id FROM courses ORDER BY id")
+            return pd.DataFrame([tuple(row) for row in cursor.fetchall()],
+                                columns=["id", "code", "department_id"])
+        
+        return self._get(cursor, "courses", (), load)
+    
+    def course_ids(self, cursor, department_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Course code -> ID, the lowest ID wins when codes repeat across departments
+        
+        Args:
+            cursor: Cursor of the current transaction
+            department_id: Only resolve courses of this department (None = any)
+        
+        Returns:
+            Cached dictionary; callers must not modify it
+        """
+        def load():
+            courses = self.courses(cursor)
+            if department_id is not None:
+                courses = courses[courses["department_id"] == department_id]
+            first = courses.drop_duplicates("code", keep="first")
+            return dict(zip(first["code"], first["id"].astype(int)))
+        
+        return self._get(cursor, "courses", (department_id,), load)
+    
+    def student_ids(self, cursor, student_nos: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Student number -> ID
+        
+        Args:
+            cursor: Cursor of the current transaction
+            student_nos: Numbers to resolve (None = all students)
+        
+        Returns:
+            Dictionary of the numbers that exist
+        """
+        def load():
+            cursor.execute("SELECT student_no, id FROM students")
+            return dict(cursor.fetchall())
+        
+        if student_nos is not None and cursor.connection.in_transaction:
+            # Students written by this transaction are not cached yet; resolve just these
+            _, _, ids = self._lookup(cursor, "students", ())
+            if ids is None:
+                cursor.execute("""
+                    SELECT s.student_no, s.id
+                    FROM students s
+                    JOIN json_each(?) j ON s.student_no = j.value
+                """, (json.dumps(student_nos),))
+                return dict(cursor.fetchall())
+        else:
+            ids = self._get(cursor, "students", (), load)
+        
+        if student_nos is None:
+            return dict(ids)
+        return {student_no: ids[student_no] for student_no in student_nos if student_no in ids}
+    
+    def clear(self):
+        """Drop every cached map"""
+        with self._lock:
+            self._entries.clear()
+
+
+lookup_cache = LookupCache()
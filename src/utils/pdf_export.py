@@ -4,15 +4,37 @@ PDF Export Utilities
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, PageBreak, KeepTogether
 from reportlab.lib.units import inch
+from reportlab.platypus.flowables import Flowable
 from reportlab.pdfgen import canvas
 from reportlab.graphics.shapes import Drawing, Rect, String
 from reportlab.graphics import renderPDF
 from datetime import datetime
+from typing import Callable, Optional
+import zlib
 from src.database.db_manager import db_manager
-from src.utils.seating import SeatingPlanGenerator
+from src.utils.seating import load_exam_seating
+from src.utils.seat_masks import get_seat_mask, pack_seat_mask
+from src.utils.export_cache import cached_export, SEATING_TABLES
+from src.utils.pdf_theme import APP_FOOTER, page_decorator, paragraph_style, table_style
+
+LAYOUT_RENDERERS = ("canvas", "drawing")
+
+LAYOUT_MARGIN = 20
+LAYOUT_FONT = "Times-Roman"
+
+DESK_STROKE = colors.HexColor('#2C3E50')
+DESK_FILL = colors.HexColor('#ECF0F1')
+SEAT_TAKEN = colors.HexColor('#3498DB')
+SEAT_STROKE = colors.HexColor('#BDC3C7')
+SEAT_BLOCKED = colors.HexColor('#D5DBDB')
+SEAT_EMPTY = colors.HexColor('#F8F9FA')
+EMPTY_TEXT = colors.HexColor('#95A5A6')
+
+
+def _short_name(name: str) -> str:
+    return name[:15] + '...' if len(name) > 15 else name
 
 
 def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch, height: float = 5*inch) -> Drawing:
@@ -40,7 +62,9 @@ def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch,
     if rows == 0 or cols == 0:
         return d
     
-    margin = 20
+    seat_mask = get_seat_mask(classroom_data)
+    
+    margin = LAYOUT_MARGIN
     available_width = width - 2 * margin
     available_height = height - 2 * margin
     
@@ -53,9 +77,9 @@ def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch,
             y = height - margin - (row + 1) * cell_height
             
             desk_rect = Rect(x + 2, y + 2, cell_width - 4, cell_height - 4)
-            desk_rect.strokeColor = colors.HexColor('#2C3E50')
+            desk_rect.strokeColor = DESK_STROKE
             desk_rect.strokeWidth = 1
-            desk_rect.fillColor = colors.HexColor('#ECF0F1')
+            desk_rect.fillColor = DESK_FILL
             d.add(desk_rect)
             
             seat_height = (cell_height - 4) / seats_per_desk
@@ -66,9 +90,9 @@ def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch,
                 if key in grid:
                     student = grid[key]
                     seat_rect = Rect(x + 4, seat_y + 2, cell_width - 8, seat_height - 4)
-                    seat_rect.strokeColor = colors.HexColor('#3498DB')
+                    seat_rect.strokeColor = SEAT_TAKEN
                     seat_rect.strokeWidth = 1.5
-                    seat_rect.fillColor = colors.HexColor('#3498DB')
+                    seat_rect.fillColor = SEAT_TAKEN
                     d.add(seat_rect)
                     
                     student_text = String(
@@ -84,17 +108,23 @@ def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch,
                     name_text = String(
                         x + cell_width / 2,
                         seat_y + seat_height / 2 - 4,
-                        student['name'][:15] + '...' if len(student['name']) > 15 else student['name'],
+                        _short_name(student['name']),
                         fontSize=6,
                         fillColor=colors.white,
                         textAnchor='middle'
                     )
                     d.add(name_text)
+                elif not seat_mask[row, col, seat_pos - 1]:
+                    seat_rect = Rect(x + 4, seat_y + 2, cell_width - 8, seat_height - 4)
+                    seat_rect.strokeColor = SEAT_STROKE
+                    seat_rect.strokeWidth = 1
+                    seat_rect.fillColor = SEAT_BLOCKED
+                    d.add(seat_rect)
                 else:
                     seat_rect = Rect(x + 4, seat_y + 2, cell_width - 8, seat_height - 4)
-                    seat_rect.strokeColor = colors.HexColor('#BDC3C7')
+                    seat_rect.strokeColor = SEAT_STROKE
                     seat_rect.strokeWidth = 1
-                    seat_rect.fillColor = colors.HexColor('#F8F9FA')
+                    seat_rect.fillColor = SEAT_EMPTY
                     d.add(seat_rect)
                     
                     empty_text = String(
@@ -102,7 +132,7 @@ def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch,
                         seat_y + seat_height / 2,
                         'Empty',
                         fontSize=7,
-                        fillColor=colors.HexColor('#95A5A6'),
+                        fillColor=EMPTY_TEXT,
                         textAnchor='middle'
                     )
                     d.add(empty_text)
@@ -110,17 +140,129 @@ def create_classroom_layout_drawing(classroom_data: dict, width: float = 7*inch,
     return d
 
 
-def export_seating_plan_pdf(exam_id: int, output_path: str = None) -> str:
+class ClassroomLayoutFlowable(Flowable):
+    """
+    Classroom seating layout drawn straight onto the canvas
+    
+    Desks and empty seats depend only on the classroom shape, so they are drawn
+    once into a PDF form XObject that every page showing the same classroom
+    reuses. Only the occupied seats and their labels are drawn per exam.
+    """
+    
+    def __init__(self, classroom_data: dict, width: float = 7*inch, height: float = 5*inch):
+        super().__init__()
+        self.classroom = classroom_data or {}
+        self.width = width
+        self.height = height
+        
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+        
+    def _geometry(self):
+        """Cell width, cell height and seat height of the grid"""
+        cell_width = (self.width - 2 * LAYOUT_MARGIN) / self.classroom['cols']
+        cell_height = (self.height - 2 * LAYOUT_MARGIN) / self.classroom['rows']
+        return cell_width, cell_height, (cell_height - 4) / self.classroom['seats_per_desk']
+        
+    def _cell_origin(self, row: int, col: int):
+        """Bottom-left corner of a desk cell"""
+        cell_width, cell_height, _ = self._geometry()
+        return LAYOUT_MARGIN + col * cell_width, self.height - LAYOUT_MARGIN - (row + 1) * cell_height
+        
+    def _seat_origin(self, row: int, col: int, seat_pos: int):
+        """Left edge of a desk cell and the bottom of a seat on it"""
+        x, y = self._cell_origin(row, col)
+        return x, y + 2 + (seat_pos - 1) * self._geometry()[2]
+        
+    def _form_name(self, seat_mask) -> str:
+        shape = (self.classroom['rows'], self.classroom['cols'], self.classroom['seats_per_desk'])
+        checksum = zlib.crc32(pack_seat_mask(seat_mask))
+        return f"DeskGrid_{'x'.join(map(str, shape))}_{checksum:08x}_{self.width:.0f}x{self.height:.0f}"
+        
+    def _draw_desk_grid(self, seat_mask):
+        """Draw desks and every seat as empty or blocked"""
+        canv = self.canv
+        rows, cols, seats_per_desk = seat_mask.shape
+        cell_width, cell_height, seat_height = self._geometry()
+        
+        canv.setStrokeColor(DESK_STROKE)
+        canv.setFillColor(DESK_FILL)
+        canv.setLineWidth(1)
+        for row in range(rows):
+            for col in range(cols):
+                x, y = self._cell_origin(row, col)
+                canv.rect(x + 2, y + 2, cell_width - 4, cell_height - 4, stroke=1, fill=1)
+                
+        canv.setStrokeColor(SEAT_STROKE)
+        for usable, fill in ((False, SEAT_BLOCKED), (True, SEAT_EMPTY)):
+            canv.setFillColor(fill)
+            for row, col, seat_idx in zip(*(seat_mask == usable).nonzero()):
+                x, seat_y = self._seat_origin(row, col, seat_idx + 1)
+                canv.rect(x + 4, seat_y + 2, cell_width - 8, seat_height - 4, stroke=1, fill=1)
+                
+        canv.setFillColor(EMPTY_TEXT)
+        canv.setFont(LAYOUT_FONT, 7)
+        for row, col, seat_idx in zip(*seat_mask.nonzero()):
+            x, seat_y = self._seat_origin(row, col, seat_idx + 1)
+            canv.drawCentredString(x + cell_width / 2, seat_y + seat_height / 2, 'Empty')
+            
+    def draw(self):
+        classroom = self.classroom
+        if not classroom or not classroom.get('rows') or not classroom.get('cols'):
+            return
+            
+        canv = self.canv
+        seat_mask = get_seat_mask(classroom)
+        form_name = self._form_name(seat_mask)
+        if not canv.hasForm(form_name):
+            canv.beginForm(form_name, 0, 0, self.width, self.height)
+            self._draw_desk_grid(seat_mask)
+            canv.endForm()
+        canv.doForm(form_name)
+        
+        grid = classroom.get('seating_grid', {})
+        if not grid:
+            return
+            
+        # Occupied seats cover the empty seat drawn underneath by the form
+        cell_width, _, seat_height = self._geometry()
+        canv.setStrokeColor(SEAT_TAKEN)
+        canv.setFillColor(SEAT_TAKEN)
+        canv.setLineWidth(1.5)
+        for (row, col, seat_pos) in grid:
+            x, seat_y = self._seat_origin(row, col, seat_pos)
+            canv.rect(x + 4, seat_y + 2, cell_width - 8, seat_height - 4, stroke=1, fill=1)
+            
+        canv.setFillColor(colors.white)
+        for (row, col, seat_pos), student in grid.items():
+            x, seat_y = self._seat_origin(row, col, seat_pos)
+            center_x = x + cell_width / 2
+            canv.setFont(LAYOUT_FONT, 8)
+            canv.drawCentredString(center_x, seat_y + seat_height / 2 + 8, student['student_no'])
+            canv.setFont(LAYOUT_FONT, 6)
+            canv.drawCentredString(center_x, seat_y + seat_height / 2 - 4, _short_name(student['name']))
+
+
+@cached_export("seating_plan_pdf", SEATING_TABLES)
+def export_seating_plan_pdf(exam_id: int, output_path: str = None, layout_renderer: str = "canvas",
+                            progress_callback: Optional[Callable[[int], None]] = None) -> str:
     """
     Export seating plan to PDF with visual classroom layouts
     
     Args:
         exam_id: Exam ID
         output_path: Optional output file path. If None, generates default filename
+        layout_renderer: "canvas" draws layouts directly with a reused desk grid form,
+                         "drawing" builds them from graphics shapes
+        progress_callback: Called with the page number as each page starts;
+                           an exception from it stops the export
         
     Returns:
         Generated filename
     """
+    if layout_renderer not in LAYOUT_RENDERERS:
+        raise ValueError(f"Unknown layout renderer: {layout_renderer}")
+    
     exam_query = """
         SELECT e.*, c.code as course_code, c.name as course_name
         FROM exams e
@@ -134,14 +276,7 @@ def export_seating_plan_pdf(exam_id: int, output_path: str = None) -> str:
     
     exam = exam_result[0]
     
-    classrooms_query = """
-        SELECT cl.id, cl.name
-        FROM classrooms cl
-        JOIN exam_classrooms ec ON cl.id = ec.classroom_id
-        WHERE ec.exam_id = ?
-        ORDER BY cl.name
-    """
-    classrooms = list(db_manager.execute_query(classrooms_query, (exam_id,)))
+    classrooms = load_exam_seating(exam_id)
     
     if not classrooms:
         raise ValueError("No classrooms assigned to this exam")
@@ -154,104 +289,58 @@ def export_seating_plan_pdf(exam_id: int, output_path: str = None) -> str:
     doc = SimpleDocTemplate(filename, pagesize=landscape(A4))
     elements = []
     
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=20,
-        alignment=1 
-    )
-    
-    title = Paragraph(f"Seating Plan - {exam['course_code']} {exam['course_name']}", title_style)
+    title = Paragraph(f"Seating Plan - {exam['course_code']} {exam['course_name']}", paragraph_style('PlanTitle'))
     elements.append(title)
     
-    info_style = ParagraphStyle(
-        'InfoStyle',
-        parent=styles['Normal'],
-        fontSize=12,
-        alignment=1
-    )
     info_text = f"Date: {exam['date']} | Time: {exam['start_time']} | Duration: {exam['duration']} minutes"
-    info = Paragraph(info_text, info_style)
+    info = Paragraph(info_text, paragraph_style('PlanInfo'))
     elements.append(info)
     elements.append(Spacer(1, 0.3 * inch))
     
-    generator = SeatingPlanGenerator(exam_id)
-    
     for idx, classroom in enumerate(classrooms):
-        classroom_title_style = ParagraphStyle(
-            'ClassroomTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#2C3E50'),
-            spaceAfter=15,
-            alignment=1
-        )
-        
-        classroom_title = Paragraph(f"Classroom: {classroom['name']}", classroom_title_style)
+        classroom_title = Paragraph(f"Classroom: {classroom['name']}", paragraph_style('ClassroomTitle'))
         elements.append(classroom_title)
         
-        classroom_data = generator.get_seating_by_classroom(classroom['id'])
+        if layout_renderer == "canvas":
+            elements.append(ClassroomLayoutFlowable(classroom))
+        else:
+            elements.append(create_classroom_layout_drawing(classroom))
+        elements.append(Spacer(1, 0.2 * inch))
         
-        if classroom_data:
-            layout_drawing = create_classroom_layout_drawing(classroom_data)
-            elements.append(layout_drawing)
-            elements.append(Spacer(1, 0.2 * inch))
-            
-            seating_query = """
-                SELECT s.student_no, s.name, es.row, es.col, es.seat_position
-                FROM exam_seating es
-                JOIN students s ON es.student_id = s.id
-                WHERE es.exam_id = ? AND es.classroom_id = ?
-                ORDER BY es.row, es.col, es.seat_position
-            """
-            seating = list(db_manager.execute_query(seating_query, (exam_id, classroom['id'])))
+        seating = classroom['seats']
+        
+        if seating:
+            table_data = [['Student No', 'Name', 'Row', 'Seat']]
             
-            if seating:
-                table_data = [['Student No', 'Name', 'Row', 'Seat']]
+            for seat in seating:
+                seat_label = f"Col {seat['col'] + 1}"
+                if seat['seat_position'] > 1:
+                    seat_label += f" ({seat['seat_position']})"
                 
-                for seat in seating:
-                    seat_label = f"Col {seat['col'] + 1}"
-                    if seat['seat_position'] > 1:
-                        seat_label += f" ({seat['seat_position']})"
-                    
-                    table_data.append([
-                        seat['student_no'],
-                        seat['name'],
-                        f"Row {seat['row'] + 1}",
-                        seat_label
-                    ])
-                
-                table = Table(table_data, colWidths=[1.5*inch, 3.5*inch, 1*inch, 1.5*inch])
-                
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 9),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
-                
-                elements.append(table)
+                table_data.append([
+                    seat['student_no'],
+                    seat['name'],
+                    f"Row {seat['row'] + 1}",
+                    seat_label
+                ])
+            
+            table = Table(table_data, colWidths=[1.5*inch, 3.5*inch, 1*inch, 1.5*inch])
+            table.setStyle(table_style())
+            
+            elements.append(table)
         
         if idx < len(classrooms) - 1:
             elements.append(PageBreak())
     
-    elements.append(Spacer(1, 0.3 * inch))
-    footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')} | Kocaeli University Exam Scheduler"
-    footer = Paragraph(footer_text, styles['Normal'])
-    elements.append(footer)
+    # No generation time: the file is served from the export cache while the data is unchanged
+    decorate = page_decorator(APP_FOOTER, f"{exam['course_code']} | {exam['date']} {exam['start_time']}")
+    
+    def on_page(canv, page_doc):
+        decorate(canv, page_doc)
+        if progress_callback:
+            progress_callback(page_doc.page)
     
-    doc.build(elements)
+    doc.build(elements, onFirstPage=on_page, onLaterPages=on_page)
     
     return filename
 
@@ -275,12 +364,17 @@ def export_exam_schedule_pdf(department_id: int) -> str:
     dept = dept_result[0]
     
     exams_query = """
+        WITH enrollment_counts AS (
+            SELECT course_id, COUNT(*) as students
+            FROM student_courses
+            GROUP BY course_id
+        )
         SELECT e.date, e.start_time, c.code as course_code, c.name as course_name,
-               e.duration, 
-               (SELECT COUNT(*) FROM student_courses sc WHERE sc.course_id = e.course_id) as students,
+               e.duration, COALESCE(en.students, 0) as students,
                GROUP_CONCAT(cl.name, ', ') as classrooms
         FROM exams e
         JOIN courses c ON e.course_id = c.id
+        LEFT JOIN enrollment_counts en ON en.course_id = e.course_id
         LEFT JOIN exam_classrooms ec ON e.id = ec.exam_id
         LEFT JOIN classrooms cl ON ec.classroom_id = cl.id
         WHERE e.department_id = ?
@@ -297,18 +391,7 @@ def export_exam_schedule_pdf(department_id: int) -> str:
     doc = SimpleDocTemplate(filename, pagesize=landscape(A4))
     elements = []
     
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=30,
-        alignment=1
-    )
-    
-    title = Paragraph(f"Exam Schedule - {dept['name']}", title_style)
+    title = Paragraph(f"Exam Schedule - {dept['name']}", paragraph_style('ScheduleTitle'))
     elements.append(title)
     elements.append(Spacer(1, 0.3 * inch))
     
@@ -327,28 +410,13 @@ def export_exam_schedule_pdf(department_id: int) -> str:
     
     table = Table(table_data, colWidths=[1*inch, 0.8*inch, 1*inch, 2.5*inch, 0.8*inch, 0.8*inch, 2*inch])
     
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
+    table.setStyle(table_style(header_font_size=11, header_padding=12))
     
     elements.append(table)
     
-    elements.append(Spacer(1, 0.5 * inch))
-    footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')} | Kocaeli University Exam Scheduler"
-    footer = Paragraph(footer_text, styles['Normal'])
-    elements.append(footer)
-    
-    doc.build(elements)
+    footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')} | {APP_FOOTER}"
+    decorate = page_decorator(footer_text)
+    doc.build(elements, onFirstPage=decorate, onLaterPages=decorate)
     
     return filename
 
@@ -0,0 +1,125 @@
+"""
+PDF Theme - Shared ReportLab styles built once on first use, and running page decorations
+"""
+
+import functools
+import zlib
+from typing import Callable
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.platypus import TableStyle
+
+HEADER_COLOR = colors.HexColor('#2C3E50')
+PAGE_TEXT_COLOR = colors.grey
+PAGE_MARGIN = 30
+
+APP_FOOTER = "Kocaeli University Exam Scheduler"
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet() -> StyleSheet1:
+    """
+    ReportLab's sample stylesheet extended with the exporters' paragraph styles
+    
+    Built on the first call and shared afterwards. Styles must not be
+    modified by callers; derive a new ParagraphStyle instead.
+    
+    Returns:
+        Stylesheet with the sample styles plus PlanTitle, ScheduleTitle,
+        PlanInfo and ClassroomTitle
+    """
+    styles = getSampleStyleSheet()
+    
+    styles.add(ParagraphStyle(
+        'PlanTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=HEADER_COLOR,
+        spaceAfter=20,
+        alignment=1
+    ))
+    styles.add(ParagraphStyle(
+        'ScheduleTitle',
+        parent=styles['PlanTitle'],
+        spaceAfter=30
+    ))
+    styles.add(ParagraphStyle(
+        'PlanInfo',
+        parent=styles['Normal'],
+        fontSize=12,
+        alignment=1
+    ))
+    styles.add(ParagraphStyle(
+        'ClassroomTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=HEADER_COLOR,
+        spaceAfter=15,
+        alignment=1
+    ))
+    
+    return styles
+
+
+def paragraph_style(name: str) -> ParagraphStyle:
+    """Shared paragraph style by name, such as PlanTitle or Normal"""
+    return stylesheet()[name]
+
+
+@functools.lru_cache(maxsize=None)
+def table_style(header_font_size: int = 10, header_padding: int = 10) -> TableStyle:
+    """
+    Shared style of the exporters' data tables: dark header row, grid, striped body
+    
+    Args:
+        header_font_size: Font size of the header row
+        header_padding: Bottom padding of the header row
+    
+    Returns:
+        TableStyle built once per argument combination
+    """
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), HEADER_COLOR),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), header_padding),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+    ])
+
+
+def page_decorator(footer: str, header: str = "") -> Callable:
+    """
+    Page callback drawing a running header and footer on every page
+    
+    The header and footer are drawn into a form on the document's first
+    page, and every later page only places that form.
+    
+    Args:
+        footer: Text at the bottom left of every page
+        header: Text at the top right of every page (empty = none)
+    
+    Returns:
+        Callback for onFirstPage/onLaterPages taking (canvas, doc)
+    """
+    text_id = zlib.crc32(f"{header}\0{footer}".encode("utf-8"))
+    
+    def decorate(canv, doc):
+        width, height = canv._pagesize
+        form_name = f"PageFrame_{text_id:08x}_{int(width)}x{int(height)}"
+        if not canv.hasForm(form_name):
+            canv.beginForm(form_name)
+            canv.setFont("Helvetica", 8)
+            canv.setFillColor(PAGE_TEXT_COLOR)
+            canv.drawString(PAGE_MARGIN, PAGE_MARGIN - 12, footer)
+            if header:
+                canv.drawRightString(width - PAGE_MARGIN, height - PAGE_MARGIN + 6, header)
+            canv.endForm()
+        canv.doForm(form_name)
+    
+    return decorate
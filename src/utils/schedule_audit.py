@@ -0,0 +1,196 @@
+"""
+Schedule Audit - Check a whole saved schedule for clashes and capacity problems
+"""
+
+from typing import Dict, List, Optional
+import json
+import numpy as np
+from src.database.db_manager import db_manager
+from src.utils.seat_masks import effective_capacity
+
+HEAVY_DAY_THRESHOLD = 3
+
+
+def _duplicate_keys(keys: np.ndarray, min_count: int = 2) -> np.ndarray:
+    """Return the keys that occur at least min_count times"""
+    if keys.size == 0:
+        return keys
+    unique_keys, counts = np.unique(keys, return_counts=True)
+    return unique_keys[counts >= min_count]
+
+
+def _group_members(keys: np.ndarray, members: np.ndarray, wanted: np.ndarray) -> Dict[int, List[int]]:
+    """Collect the members of every wanted key"""
+    mask = np.isin(keys, wanted)
+    groups: Dict[int, List[int]] = {}
+    for key, member in zip(keys[mask].tolist(), members[mask].tolist()):
+        groups.setdefault(key, []).append(member)
+    return groups
+
+
+def audit_schedule(department_id: Optional[int] = None,
+                   heavy_day_threshold: int = HEAVY_DAY_THRESHOLD) -> Dict:
+    """
+    Audit a saved exam schedule in one pass
+    
+    Enrollment is loaded once as compact (exam, student) index arrays, and
+    every check is a vectorised group count over packed integer keys.
+    Classrooms are checked against the bookings of every department.
+    
+    Args:
+        department_id: Only audit exams of this department (None = all)
+        heavy_day_threshold: Exams per day that count as a heavy day
+    
+    Returns:
+        Dictionary with student_clashes, room_conflicts, capacity_shortfalls,
+        heavy_days and exam_count
+    """
+    dept_filter = "WHERE e.department_id = ?" if department_id is not None else ""
+    params = (department_id,) if department_id is not None else ()
+    
+    exams = list(db_manager.execute_query(f"""
+        SELECT e.id, e.date, e.start_time, c.code as course_code, c.name as course_name
+        FROM exams e
+        JOIN courses c ON e.course_id = c.id
+        {dept_filter}
+        ORDER BY e.date, e.start_time
+    """, params))
+    
+    report = {
+        "student_clashes": [],
+        "room_conflicts": [],
+        "capacity_shortfalls": [],
+        "heavy_days": [],
+        "exam_count": len(exams)
+    }
+    
+    if not exams:
+        return report
+    
+    exam_index = {exam["id"]: idx for idx, exam in enumerate(exams)}
+    
+    slots = sorted({(exam["date"], exam["start_time"]) for exam in exams})
+    slot_index = {slot: idx for idx, slot in enumerate(slots)}
+    days = sorted({exam["date"] for exam in exams})
+    day_index = {day: idx for idx, day in enumerate(days)}
+    
+    exam_slot = np.array([slot_index[(exam["date"], exam["start_time"])] for exam in exams], dtype=np.int64)
+    exam_day = np.array([day_index[exam["date"]] for exam in exams], dtype=np.int64)
+    
+    enrollment = db_manager.execute_query(f"""
+        SELECT e.id as exam_id, sc.student_id
+        FROM exams e
+        JOIN student_courses sc ON sc.course_id = e.course_id
+        {dept_filter}
+    """, params)
+    
+    edge_exam = np.fromiter((exam_index[row[0]] for row in enrollment), dtype=np.int64, count=len(enrollment))
+    edge_student = np.fromiter((row[1] for row in enrollment), dtype=np.int64, count=len(enrollment))
+    
+    room_filter = ""
+    if department_id is not None:
+        # Classrooms are shared, so every booking in the audited slots is checked
+        room_filter = """
+        WHERE EXISTS (
+            SELECT 1 FROM exams d
+            WHERE d.department_id = ? AND d.date = e.date AND d.start_time = e.start_time
+        )"""
+    
+    bookings = db_manager.execute_query(f"""
+        SELECT ec.exam_id, e.date, e.start_time, c.code as course_code,
+               cl.id as classroom_id, cl.name, cl.rows, cl.cols,
+               cl.seats_per_desk, cl.seat_pattern, cl.seat_mask
+        FROM exam_classrooms ec
+        JOIN exams e ON ec.exam_id = e.id
+        JOIN courses c ON e.course_id = c.id
+        JOIN classrooms cl ON ec.classroom_id = cl.id
+        {room_filter}
+    """, params)
+    
+    booking_slot = np.array([slot_index[(room["date"], room["start_time"])] for room in bookings], dtype=np.int64)
+    booking_room = np.array([room["classroom_id"] for room in bookings], dtype=np.int64)
+    booking_audited = np.array([room["exam_id"] in exam_index for room in bookings], dtype=bool)
+    
+    rooms = [room for room in bookings if room["exam_id"] in exam_index]
+    room_exam = np.array([exam_index[room["exam_id"]] for room in rooms], dtype=np.int64)
+    room_capacity = np.array([effective_capacity(room) for room in rooms], dtype=np.int64)
+    
+    students = {}
+    if edge_student.size:
+        student_stride = int(edge_student.max()) + 1
+        
+        slot_keys = exam_slot[edge_exam] * student_stride + edge_student
+        clash_keys = _duplicate_keys(slot_keys)
+        
+        day_keys = exam_day[edge_exam] * student_stride + edge_student
+        heavy_keys = _duplicate_keys(day_keys, heavy_day_threshold)
+        
+        flagged = np.union1d(clash_keys % student_stride, heavy_keys % student_stride)
+        if flagged.size:
+            student_rows = db_manager.execute_query(
+                "SELECT id, student_no, name FROM students WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(flagged.tolist()),)
+            )
+            students = {row["id"]: row for row in student_rows}
+        
+        for key, members in _group_members(slot_keys, edge_exam, clash_keys).items():
+            slot = slots[key // student_stride]
+            student = students.get(key % student_stride)
+            if student is None:
+                continue
+            report["student_clashes"].append({
+                "date": slot[0],
+                "start_time": slot[1],
+                "student_no": student["student_no"],
+                "name": student["name"],
+                "courses": [exams[idx]["course_code"] for idx in members]
+            })
+        
+        for key, members in _group_members(day_keys, edge_exam, heavy_keys).items():
+            student = students.get(key % student_stride)
+            if student is None:
+                continue
+            report["heavy_days"].append({
+                "date": days[key // student_stride],
+                "student_no": student["student_no"],
+                "name": student["name"],
+                "exam_count": len(members),
+                "courses": [exams[idx]["course_code"] for idx in members]
+            })
+    
+    if booking_room.size:
+        room_stride = int(booking_room.max()) + 1
+        room_keys = booking_slot * room_stride + booking_room
+        members_of = np.arange(len(bookings), dtype=np.int64)
+        
+        for key, members in _group_members(room_keys, members_of, _duplicate_keys(room_keys)).items():
+            # Skip double-bookings between other departments' exams
+            if not booking_audited[members].any():
+                continue
+            slot = slots[key // room_stride]
+            report["room_conflicts"].append({
+                "date": slot[0],
+                "start_time": slot[1],
+                "classroom": bookings[members[0]]["name"],
+                "courses": [bookings[idx]["course_code"] for idx in members]
+            })
+    
+    enrolled = np.bincount(edge_exam, minlength=len(exams))
+    capacity = np.bincount(room_exam, weights=room_capacity, minlength=len(exams)).astype(np.int64)
+    
+    for idx in np.flatnonzero(enrolled > capacity).tolist():
+        exam = exams[idx]
+        report["capacity_shortfalls"].append({
+            "date": exam["date"],
+            "start_time": exam["start_time"],
+            "course_code": exam["course_code"],
+            "course_name": exam["course_name"],
+            "students": int(enrolled[idx]),
+            "capacity": int(capacity[idx])
+        })
+    
+    report["student_clashes"].sort(key=lambda item: (item["date"], item["start_time"], item["student_no"]))
+    report["room_conflicts"].sort(key=lambda item: (item["date"], item["start_time"], item["classroom"]))
+    report["heavy_days"].sort(key=lambda item: (item["date"], item["student_no"]))
+    
+    return report
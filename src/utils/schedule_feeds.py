@@ -0,0 +1,212 @@
+"""
+Schedule Feeds - Stream the exam schedule as iCalendar or newline-delimited JSON
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO, Union
+from src.database.db_manager import db_manager
+
+FEED_FORMATS = {
+    "ics": "iCalendar (*.ics)",
+    "ndjson": "Newline-delimited JSON (*.ndjson)",
+}
+
+ICS_LINE_LIMIT = 75
+ICS_PRODUCT_ID = "-//Kocaeli University//Exam Scheduler//EN"
+FEED_PROGRESS_STEP = 100
+
+
+def iter_schedule(department_id: Optional[int] = None, classroom_id: Optional[int] = None,
+                  student_id: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Stream scheduled exams from the cursor in date order
+    
+    Args:
+        department_id: Only exams of this department
+        classroom_id: Only exams held in this classroom
+        student_id: Only exams of this student's courses, with the student's seat
+    
+    Yields:
+        One dictionary per exam
+    """
+    conditions = []
+    params = []
+    seat_columns = ""
+    student_joins = ""
+    
+    if student_id is not None:
+        seat_columns = """,
+               scl.name as seat_classroom, es.row as seat_row, es.col as seat_col,
+               es.seat_position"""
+        student_joins = """
+        JOIN student_courses sc ON sc.course_id = e.course_id AND sc.student_id = ?
+        LEFT JOIN exam_seating es ON es.exam_id = e.id AND es.student_id = sc.student_id
+        LEFT JOIN classrooms scl ON scl.id = es.classroom_id"""
+        params.append(student_id)
+    if department_id is not None:
+        conditions.append("e.department_id = ?")
+        params.append(department_id)
+    if classroom_id is not None:
+        conditions.append("e.id IN (SELECT exam_id FROM exam_classrooms WHERE classroom_id = ?)")
+        params.append(classroom_id)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT e.id, e.date, e.start_time, e.duration, e.exam_type,
+               c.code as course_code, c.name as course_name,
+               d.code as department_code, d.name as department_name,
+               GROUP_CONCAT(cl.name, ', ') as classrooms{seat_columns}
+        FROM exams e
+        JOIN courses c ON e.course_id = c.id
+        JOIN departments d ON e.department_id = d.id{student_joins}
+        LEFT JOIN exam_classrooms ec ON ec.exam_id = e.id
+        LEFT JOIN classrooms cl ON cl.id = ec.classroom_id
+        {where}
+        GROUP BY e.id
+        ORDER BY e.date, e.start_time, c.code
+    """
+    
+    for record in db_manager.iter_query(query, tuple(params)):
+        exam = dict(record)
+        if student_id is not None:
+            classroom = exam.pop("seat_classroom")
+            row, col, position = exam.pop("seat_row"), exam.pop("seat_col"), exam.pop("seat_position")
+            exam["seat"] = None if row is None else {
+                "classroom": classroom, "row": row + 1, "col": col + 1, "position": position
+            }
+        yield exam
+
+
+def _escape_ics(text) -> str:
+    """Escape a value for an iCalendar TEXT property"""
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold_ics(line: str) -> str:
+    """Fold a content line into chunks of at most 75 octets"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= ICS_LINE_LIMIT:
+        return line + "\r\n"
+    
+    parts = []
+    limit = ICS_LINE_LIMIT
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = ICS_LINE_LIMIT - 1
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics(exams: Iterable[Dict], calendar_name: str) -> Iterator[str]:
+    """
+    Turn exams into iCalendar lines
+    
+    Args:
+        exams: Exams as yielded by iter_schedule
+        calendar_name: Calendar title shown by calendar clients
+    
+    Yields:
+        Folded content lines ending in CRLF
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield f"PRODID:{ICS_PRODUCT_ID}\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield _fold_ics(f"X-WR-CALNAME:{_escape_ics(calendar_name)}")
+    
+    for exam in exams:
+        start = datetime.strptime(f"{exam['date']} {exam['start_time']}", "%Y-%m-%d %H:%M")
+        end = start + timedelta(minutes=exam["duration"])
+        location = exam["classrooms"] or ""
+        description = [f"Department: {exam['department_name']}"]
+        if exam["exam_type"]:
+            description.append(f"Type: {exam['exam_type']}")
+        if exam.get("seat"):
+            seat = exam["seat"]
+            location = seat["classroom"]
+            seat_label = f"Seat: Row {seat['row']}, Col {seat['col']}"
+            if seat["position"] > 1:
+                seat_label += f" ({seat['position']})"
+            description.append(seat_label)
+        
+        yield "BEGIN:VEVENT\r\n"
+        yield f"UID:exam-{exam['id']}@exam-scheduler\r\n"
+        yield f"DTSTAMP:{stamp}\r\n"
+        yield f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}\r\n"
+        yield f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}\r\n"
+        yield _fold_ics(f"SUMMARY:{_escape_ics(exam['course_code'] + ' ' + exam['course_name'])}")
+        if location:
+            yield _fold_ics(f"LOCATION:{_escape_ics(location)}")
+        yield _fold_ics(f"DESCRIPTION:{_escape_ics(chr(10).join(description))}")
+        yield "END:VEVENT\r\n"
+    
+    yield "END:VCALENDAR\r\n"
+
+
+def iter_ndjson(exams: Iterable[Dict]) -> Iterator[str]:
+    """Turn exams into one JSON object per line"""
+    for exam in exams:
+        yield json.dumps(exam, ensure_ascii=False) + "\n"
+
+
+def write_feed(lines: Iterable[str], output: Union[str, TextIO]) -> int:
+    """
+    Write feed lines as they are produced
+    
+    Args:
+        lines: Lines from iter_ics or iter_ndjson
+        output: File path or writable text stream
+    
+    Returns:
+        Number of lines written
+    """
+    if not isinstance(output, str):
+        count = 0
+        for count, line in enumerate(lines, start=1):
+            output.write(line)
+        return count
+    
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        return write_feed(lines, f)
+
+
+def export_schedule_feed(output: Union[str, TextIO], feed_format: str = "ics",
+                         department_id: Optional[int] = None, classroom_id: Optional[int] = None,
+                         student_id: Optional[int] = None, calendar_name: str = "Exam Schedule",
+                         progress_callback: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Stream the exam schedule of a department, room or student into a feed
+    
+    Args:
+        output: File path or writable text stream
+        feed_format: "ics" or "ndjson"
+        department_id: Only exams of this department (None = all)
+        classroom_id: Only exams held in this classroom
+        student_id: Only this student's exams, located at the student's seat
+        calendar_name: Calendar title for iCalendar feeds
+        progress_callback: Called with the number of exams written every
+                           FEED_PROGRESS_STEP exams; an exception from it stops the export
+    
+    Returns:
+        Number of lines written
+    """
+    if feed_format not in FEED_FORMATS:
+        raise ValueError(f"Unknown feed format: {feed_format}")
+    
+    def exams():
+        for done, exam in enumerate(iter_schedule(department_id, classroom_id, student_id), start=1):
+            yield exam
+            if progress_callback and done % FEED_PROGRESS_STEP == 0:
+                progress_callback(done)
+    
+    if feed_format == "ics":
+        return write_feed(iter_ics(exams(), calendar_name), output)
+    return write_feed(iter_ndjson(exams()), output)
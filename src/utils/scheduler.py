@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Set
 import random
 from src.database.db_manager import db_manager
+from src.utils.seat_masks import effective_capacity
+from src.utils.clash_index import rebuild_slot_index
 
 class ExamScheduler:
     """Algorithm for scheduling exams with conflict prevention"""
@@ -25,6 +27,7 @@ class ExamScheduler:
         
         query = "SELECT * FROM classrooms WHERE department_id = ? ORDER BY capacity DESC"
         self.classrooms = list(db_manager.execute_query(query, (self.department_id,)))
+        self.classrooms.sort(key=effective_capacity, reverse=True)
         
         query = """
             SELECT s.id as student_id, c.id as course_id
@@ -189,7 +192,7 @@ class ExamScheduler:
                 break
             
             assigned.append(classroom["id"])
-            remaining -= classroom["capacity"]
+            remaining -= effective_capacity(classroom)
         
         return assigned
     
@@ -204,36 +207,33 @@ class ExamScheduler:
         Returns:
             Number of exams saved
         """
-        db_manager.execute_update("DELETE FROM exams WHERE department_id = ?", 
-                                 (self.department_id,))
-        
-        saved_count = 0
-        
-        for exam in scheduled_exams:
-            display_id = db_manager.get_next_display_id("exams")
-            
-            query = """
-                INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration, exam_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            exam_id = db_manager.execute_update(query, (
-                display_id,
-                exam["course_id"],
-                self.department_id,
-                exam["date"],
-                exam["start_time"],
-                exam["duration"],
-                exam_type
-            ))
-            
-            for classroom_id in exam["classrooms"]:
-                query = """
+        # Exams, their rooms and the slot index are committed together
+        with db_manager.transaction() as cursor:
+            cursor.execute("DELETE FROM exams WHERE department_id = ?", (self.department_id,))
+            
+            display_ids = db_manager.allocate_display_ids(cursor, "exams", len(scheduled_exams))
+            
+            for display_id, exam in zip(display_ids, scheduled_exams):
+                cursor.execute("""
+                    INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration, exam_type)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    display_id,
+                    exam["course_id"],
+                    self.department_id,
+                    exam["date"],
+                    exam["start_time"],
+                    exam["duration"],
+                    exam_type
+                ))
+                exam_id = cursor.lastrowid
+                
+                cursor.executemany("""
                     INSERT INTO exam_classrooms (exam_id, classroom_id)
                     VALUES (?, ?)
-                """
-                db_manager.execute_update(query, (exam_id, classroom_id))
+                """, [(exam_id, classroom_id) for classroom_id in exam["classrooms"]])
             
-            saved_count += 1
+            rebuild_slot_index(self.department_id, cursor=cursor)
         
-        return saved_count
+        return len(scheduled_exams)
 
@@ -0,0 +1,106 @@
+"""
+Seat Mask Patterns - Which seats of a classroom may be used during an exam
+"""
+
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+SEAT_PATTERNS = {
+    "all": "Every seat",
+    "skip_seat": "Every other seat",
+    "checkerboard": "Checkerboard",
+    "skip_row": "Every other row",
+}
+
+DEFAULT_PATTERN = "all"
+
+
+def build_seat_mask(rows: int, cols: int, seats_per_desk: int, pattern: str = DEFAULT_PATTERN) -> np.ndarray:
+    """
+    Build a boolean mask of usable seats for a named pattern
+
+    Args:
+        rows: Number of desk rows
+        cols: Number of desk columns
+        seats_per_desk: Seats on each desk
+        pattern: One of SEAT_PATTERNS
+
+    Returns:
+        Boolean array of shape (rows, cols, seats_per_desk)
+    """
+    row_idx, col_idx, seat_idx = np.indices((rows, cols, seats_per_desk))
+
+    # Position of the seat along its row, counting across desks
+    position = col_idx * seats_per_desk + seat_idx
+
+    if pattern == "skip_seat":
+        return position % 2 == 0
+    if pattern == "checkerboard":
+        return (row_idx + position) % 2 == 0
+    if pattern == "skip_row":
+        return row_idx % 2 == 0
+
+    return np.ones((rows, cols, seats_per_desk), dtype=bool)
+
+
+def pack_seat_mask(mask: np.ndarray) -> bytes:
+    """Pack a seat mask into a bitmap for storage"""
+    return np.packbits(mask.ravel()).tobytes()
+
+
+def unpack_seat_mask(bitmap: bytes, rows: int, cols: int, seats_per_desk: int) -> np.ndarray:
+    """Unpack a stored bitmap into a seat mask"""
+    size = rows * cols * seats_per_desk
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), count=size)
+    return bits.astype(bool).reshape(rows, cols, seats_per_desk)
+
+
+@lru_cache(maxsize=1024)
+def _cached_mask(rows: int, cols: int, seats_per_desk: int, pattern: str,
+                 bitmap: Optional[bytes]) -> Tuple[np.ndarray, int]:
+    """Build (or unpack) a mask once per classroom shape and keep its seat count"""
+    if bitmap is not None and len(bitmap) * 8 >= rows * cols * seats_per_desk:
+        mask = unpack_seat_mask(bitmap, rows, cols, seats_per_desk)
+    else:
+        mask = build_seat_mask(rows, cols, seats_per_desk, pattern)
+    mask.setflags(write=False)
+    return mask, int(np.count_nonzero(mask))
+
+
+def _classroom_key(classroom) -> Tuple:
+    keys = classroom.keys()
+    pattern = classroom["seat_pattern"] if "seat_pattern" in keys and classroom["seat_pattern"] else DEFAULT_PATTERN
+    bitmap = classroom["seat_mask"] if "seat_mask" in keys and classroom["seat_mask"] else None
+    return (classroom["rows"], classroom["cols"], classroom["seats_per_desk"], pattern,
+            bytes(bitmap) if bitmap is not None else None)
+
+
+def get_seat_mask(classroom) -> np.ndarray:
+    """
+    Get the read-only seat mask of a classroom
+
+    Args:
+        classroom: Classroom row or dict with rows, cols, seats_per_desk and
+                   optionally seat_pattern / seat_mask
+
+    Returns:
+        Boolean array of shape (rows, cols, seats_per_desk)
+    """
+    return _cached_mask(*_classroom_key(classroom))[0]
+
+
+def effective_capacity(classroom) -> int:
+    """Number of seats usable under the classroom's seat pattern"""
+    return _cached_mask(*_classroom_key(classroom))[1]
+
+
+def iter_usable_seats(classroom) -> Iterator[Tuple[int, int, int]]:
+    """
+    Iterate usable seats front to back
+
+    Yields:
+        (row, col, seat_position) with seat_position starting at 1
+    """
+    for row, col, seat_idx in np.argwhere(get_seat_mask(classroom)):
+        yield int(row), int(col), int(seat_idx) + 1
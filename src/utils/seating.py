@@ -2,10 +2,61 @@
 Seating Plan Generator
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Iterable
 from src.database.db_manager import db_manager
+from src.utils.seat_masks import iter_usable_seats, effective_capacity
+import heapq
 import random
 
+
+class FreeSeatIndex:
+    """Free seats of an exam's classrooms, kept as one min-heap per classroom
+    so the front-most free seat can be taken or returned in O(log n)"""
+    
+    def __init__(self, classrooms: Iterable, occupied: Iterable[Tuple[int, int, int, int]] = ()):
+        """
+        Args:
+            classrooms: Classroom rows in placement order
+            occupied: (classroom_id, row, col, seat_position) tuples already taken
+        """
+        taken = set(occupied)
+        self.classroom_order = []
+        self.free = {}
+        
+        for classroom in classrooms:
+            classroom_id = classroom["id"]
+            seats = [
+                (row, col, seat_pos)
+                for row, col, seat_pos in iter_usable_seats(classroom)
+                if (classroom_id, row, col, seat_pos) not in taken
+            ]
+            heapq.heapify(seats)
+            self.classroom_order.append(classroom_id)
+            self.free[classroom_id] = seats
+    
+    def take(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Take the nearest free seat, filling classrooms in placement order
+        
+        Returns:
+            (classroom_id, row, col, seat_position) or None if every seat is taken
+        """
+        for classroom_id in self.classroom_order:
+            seats = self.free[classroom_id]
+            if seats:
+                row, col, seat_pos = heapq.heappop(seats)
+                return classroom_id, row, col, seat_pos
+        return None
+    
+    def release(self, classroom_id: int, row: int, col: int, seat_position: int):
+        """Return a seat to the index"""
+        if classroom_id in self.free:
+            heapq.heappush(self.free[classroom_id], (row, col, seat_position))
+    
+    def free_count(self) -> int:
+        """Number of free seats across all classrooms"""
+        return sum(len(seats) for seats in self.free.values())
+
 class SeatingPlanGenerator:
     """Generate seating arrangements for exams"""
     
@@ -44,14 +95,7 @@ class SeatingPlanGenerator:
         if not students:
             return False
         
-        classrooms_query = """
-            SELECT cl.*
-            FROM classrooms cl
-            JOIN exam_classrooms ec ON cl.id = ec.classroom_id
-            WHERE ec.exam_id = ?
-            ORDER BY cl.capacity DESC
-        """
-        classrooms = list(db_manager.execute_query(classrooms_query, (self.exam_id,)))
+        classrooms = self._load_classrooms()
         
         if not classrooms:
             return False
@@ -60,40 +104,200 @@ class SeatingPlanGenerator:
         
         random.shuffle(students)
         
+        seat_rows = []
         student_idx = 0
         
         for classroom in classrooms:
             if student_idx >= len(students):
                 break
             
-            total_seats = classroom["rows"] * classroom["cols"] * classroom["seats_per_desk"]
+            for row, col, seat_pos in iter_usable_seats(classroom):
+                if student_idx >= len(students):
+                    break
+                
+                seat_rows.append((
+                    self.exam_id,
+                    students[student_idx]["id"],
+                    classroom["id"],
+                    row,
+                    col,
+                    seat_pos
+                ))
+                student_idx += 1
+        
+        query = """
+            INSERT INTO exam_seating 
+            (exam_id, student_id, classroom_id, row, col, seat_position)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        db_manager.execute_many(query, seat_rows)
+        
+        return True
+    
+    def _load_classrooms(self) -> List:
+        """Load the exam's classrooms in placement order"""
+        classrooms_query = """
+            SELECT cl.*
+            FROM classrooms cl
+            JOIN exam_classrooms ec ON cl.id = ec.classroom_id
+            WHERE ec.exam_id = ?
+            ORDER BY cl.capacity DESC
+        """
+        classrooms = list(db_manager.execute_query(classrooms_query, (self.exam_id,)))
+        classrooms.sort(key=effective_capacity, reverse=True)
+        return classrooms
+    
+    def _load_seats(self) -> Dict[int, Tuple[int, int, int, int]]:
+        """Load current seats as student_id -> (classroom_id, row, col, seat_position)"""
+        query = """
+            SELECT student_id, classroom_id, row, col, seat_position
+            FROM exam_seating
+            WHERE exam_id = ?
+        """
+        return {
+            seat["student_id"]: (seat["classroom_id"], seat["row"], seat["col"], seat["seat_position"])
+            for seat in db_manager.execute_query(query, (self.exam_id,))
+        }
+    
+    def build_free_seat_index(self, seats: Optional[Dict] = None) -> FreeSeatIndex:
+        """
+        Build the free-seat index from the current seating
+        
+        Args:
+            seats: Optional preloaded result of _load_seats
+            
+        Returns:
+            FreeSeatIndex for this exam
+        """
+        if seats is None:
+            seats = self._load_seats()
+        return FreeSeatIndex(self._load_classrooms(), seats.values())
+    
+    def add_student(self, student_id: int, index: Optional[FreeSeatIndex] = None) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Seat a late-enrolled student in the nearest free seat without
+        touching anyone else's seat
+        
+        Args:
+            student_id: Student ID
+            index: Optional free-seat index to reuse across several calls
+            
+        Returns:
+            (classroom_id, row, col, seat_position) or None if no seat is free
+        """
+        existing = db_manager.execute_query(
+            "SELECT classroom_id, row, col, seat_position FROM exam_seating WHERE exam_id = ? AND student_id = ?",
+            (self.exam_id, student_id)
+        )
+        if existing:
+            seat = existing[0]
+            return seat["classroom_id"], seat["row"], seat["col"], seat["seat_position"]
+        
+        if index is None:
+            index = self.build_free_seat_index()
+        
+        seat = index.take()
+        if seat is None:
+            return None
+        
+        query = """
+            INSERT INTO exam_seating 
+            (exam_id, student_id, classroom_id, row, col, seat_position)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        db_manager.execute_update(query, (self.exam_id, student_id) + seat)
+        return seat
+    
+    def remove_student(self, student_id: int, index: Optional[FreeSeatIndex] = None) -> bool:
+        """
+        Free the seat of a dropped student
+        
+        Args:
+            student_id: Student ID
+            index: Optional free-seat index that receives the freed seat
             
-            for row in range(classroom["rows"]):
-                for col in range(classroom["cols"]):
-                    for seat_pos in range(1, classroom["seats_per_desk"] + 1):
-                        if student_idx >= len(students):
-                            break
-                        
-                        student = students[student_idx]
-                        
-                        query = """
-                            INSERT INTO exam_seating 
-                            (exam_id, student_id, classroom_id, row, col, seat_position)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        """
-                        db_manager.execute_update(query, (
-                            self.exam_id,
-                            student["id"],
-                            classroom["id"],
-                            row,
-                            col,
-                            seat_pos
-                        ))
-                        
-                        student_idx += 1
+        Returns:
+            True if a seat was freed, False if the student was not seated
+        """
+        existing = db_manager.execute_query(
+            "SELECT classroom_id, row, col, seat_position FROM exam_seating WHERE exam_id = ? AND student_id = ?",
+            (self.exam_id, student_id)
+        )
+        if not existing:
+            return False
+        
+        seat = existing[0]
+        db_manager.execute_update(
+            "DELETE FROM exam_seating WHERE exam_id = ? AND student_id = ?",
+            (self.exam_id, student_id)
+        )
+        
+        if index is not None:
+            index.release(seat["classroom_id"], seat["row"], seat["col"], seat["seat_position"])
         
         return True
     
+    def sync_with_enrollment(self) -> Dict:
+        """
+        Bring an existing seating plan in line with current enrollment.
+        Dropped students free their seats, newcomers take the nearest free
+        seats, and everyone else keeps their published seat.
+        
+        Returns:
+            Dictionary with added, removed and unplaced student ID lists
+        """
+        result = {"added": [], "removed": [], "unplaced": []}
+        
+        exam_result = db_manager.execute_query("SELECT course_id FROM exams WHERE id = ?", (self.exam_id,))
+        if not exam_result:
+            return result
+        
+        enrolled_query = "SELECT student_id FROM student_courses WHERE course_id = ?"
+        enrolled = {row["student_id"] for row in db_manager.execute_query(enrolled_query, (exam_result[0]["course_id"],))}
+        
+        seats = self._load_seats()
+        index = self.build_free_seat_index(seats)
+        
+        dropped = sorted(set(seats) - enrolled)
+        for student_id in dropped:
+            index.release(*seats[student_id])
+        result["removed"] = dropped
+        
+        new_rows = []
+        for student_id in sorted(enrolled - set(seats)):
+            seat = index.take()
+            if seat is None:
+                result["unplaced"].append(student_id)
+                continue
+            new_rows.append((self.exam_id, student_id) + seat)
+            result["added"].append(student_id)
+        
+        # Freed seats and their new occupants are committed together
+        with db_manager.transaction() as cursor:
+            if dropped:
+                cursor.executemany(
+                    "DELETE FROM exam_seating WHERE exam_id = ? AND student_id = ?",
+                    [(self.exam_id, student_id) for student_id in dropped]
+                )
+            
+            if new_rows:
+                cursor.executemany("""
+                    INSERT INTO exam_seating 
+                    (exam_id, student_id, classroom_id, row, col, seat_position)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, new_rows)
+        
+        return result
+    
+    def load_seating_by_classroom(self) -> List[Dict]:
+        """
+        Load the seating of every classroom of this exam in one query
+        
+        Returns:
+            List of classroom dictionaries, see load_exam_seating
+        """
+        return load_exam_seating(self.exam_id)
+    
     def get_seating_by_classroom(self, classroom_id: int) -> Dict:
         """
         Get seating arrangement for a specific classroom
@@ -104,33 +308,97 @@ class SeatingPlanGenerator:
         Returns:
             Dictionary with classroom info and seating grid
         """
-        classroom_query = "SELECT * FROM classrooms WHERE id = ?"
-        classroom_result = db_manager.execute_query(classroom_query, (classroom_id,))
+        classrooms = load_exam_seating(self.exam_id, classroom_id)
+        if classrooms:
+            return classrooms[0]
+        
+        classroom_result = db_manager.execute_query("SELECT * FROM classrooms WHERE id = ?", (classroom_id,))
         
         if not classroom_result:
             return None
         
         classroom = dict(classroom_result[0])
+        classroom["seating_grid"] = {}
+        classroom["seats"] = []
+        classroom["total_students"] = 0
         
-        seating_query = """
-            SELECT es.*, s.student_no, s.name
-            FROM exam_seating es
-            JOIN students s ON es.student_id = s.id
-            WHERE es.exam_id = ? AND es.classroom_id = ?
-            ORDER BY es.row, es.col, es.seat_position
-        """
-        seating = list(db_manager.execute_query(seating_query, (self.exam_id, classroom_id)))
-        
-        grid = {}
-        for seat in seating:
-            key = (seat["row"], seat["col"], seat["seat_position"])
-            grid[key] = {
-                "student_no": seat["student_no"],
-                "name": seat["name"]
+        return classroom
+
+
+def load_exam_seating(exam_id: int, classroom_id: Optional[int] = None) -> List[Dict]:
+    """
+    Load all classrooms and seats of an exam with a single joined query
+    
+    Args:
+        exam_id: Exam ID
+        classroom_id: Only this classroom of the exam (None = all)
+        
+    Returns:
+        List of classroom dictionaries ordered by classroom name. Each has the
+        classroom columns plus "seats" (ordered by row, col, seat position),
+        "seating_grid" keyed by (row, col, seat_position) and "total_students"
+    """
+    params = (exam_id,)
+    classroom_filter = ""
+    if classroom_id is not None:
+        classroom_filter = "AND ec.classroom_id = ?"
+        params += (classroom_id,)
+    
+    query = f"""
+        SELECT cl.id as classroom_id, cl.code as classroom_code, cl.name as classroom_name,
+               cl.department_id as classroom_department_id, cl.capacity,
+               cl.rows, cl.cols, cl.seats_per_desk, cl.seat_pattern, cl.seat_mask,
+               es.row, es.col, es.seat_position,
+               s.id as student_id, s.student_no, s.name,
+               d.name as department_name, d.code as department_code
+        FROM exam_classrooms ec
+        JOIN classrooms cl ON ec.classroom_id = cl.id
+        LEFT JOIN exam_seating es ON es.exam_id = ec.exam_id AND es.classroom_id = cl.id
+        LEFT JOIN students s ON es.student_id = s.id
+        LEFT JOIN departments d ON s.department_id = d.id
+        WHERE ec.exam_id = ? {classroom_filter}
+        ORDER BY cl.name, cl.id, es.row, es.col, es.seat_position
+    """
+    
+    classrooms = {}
+    
+    for record in db_manager.execute_query(query, params):
+        classroom_id = record["classroom_id"]
+        classroom = classrooms.get(classroom_id)
+        
+        if classroom is None:
+            classroom = {
+                "id": classroom_id,
+                "code": record["classroom_code"],
+                "name": record["classroom_name"],
+                "department_id": record["classroom_department_id"],
+                "capacity": record["capacity"],
+                "rows": record["rows"],
+                "cols": record["cols"],
+                "seats_per_desk": record["seats_per_desk"],
+                "seat_pattern": record["seat_pattern"],
+                "seat_mask": record["seat_mask"],
+                "seats": [],
+                "seating_grid": {},
+                "total_students": 0
             }
+            classrooms[classroom_id] = classroom
         
-        classroom["seating_grid"] = grid
-        classroom["total_students"] = len(seating)
+        if record["student_id"] is None:
+            continue
         
-        return classroom
-
+        seat = {
+            "student_id": record["student_id"],
+            "student_no": record["student_no"],
+            "name": record["name"],
+            "department_name": record["department_name"],
+            "department_code": record["department_code"],
+            "row": record["row"],
+            "col": record["col"],
+            "seat_position": record["seat_position"]
+        }
+        classroom["seats"].append(seat)
+        classroom["seating_grid"][(seat["row"], seat["col"], seat["seat_position"])] = seat
+        classroom["total_students"] += 1
+    
+    return list(classrooms.values())
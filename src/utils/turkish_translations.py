@@ -0,0 +1,39 @@
+"""
+Turkish Labels for Exported Documents
+"""
+
+EXCEL_LABELS = {
+    "date": "Tarih",
+    "time": "Saat",
+    "course_code": "Ders Kodu",
+    "course_name": "Ders Adı",
+    "exam_type": "Sınav Türü",
+    "duration": "Süre (dk)",
+    "students": "Öğrenci Sayısı",
+    "classrooms": "Derslikler",
+    "classroom": "Derslik",
+    "department": "Bölüm",
+    "student_no": "Öğrenci No",
+    "student_name": "Ad Soyad",
+    "row": "Sıra",
+    "col": "Sütun",
+    "seat": "Koltuk",
+    "courses": "Dersler",
+    "surname_from": "Soyadı (Başlangıç)",
+    "surname_to": "Soyadı (Bitiş)",
+    "student_names": "Öğrenciler",
+}
+
+EXAM_TYPES = {
+    "final": "Final Sınavı",
+    "midterm": "Ara Sınav",
+    "resit": "Bütünleme Sınavı",
+}
+
+def get_excel_label(key: str) -> str:
+    """Get the Turkish column label for an export field"""
+    return EXCEL_LABELS.get(key, key)
+
+def get_exam_type_turkish(exam_type: str) -> str:
+    """Get the Turkish name of an exam type"""
+    return EXAM_TYPES.get(exam_type or "final", EXAM_TYPES["final"])
@@ -0,0 +1,123 @@
+"""
+Test Script for bulk enrollment editing
+Checks that enrollment edits are set-based and keep scheduling data fresh:
+1. Selected students are added to or removed from several courses at once
+2. A cohort moves between courses without duplicate enrollments
+3. The exam slot index and the enrollment version follow every change
+"""
+
+import os
+import sys
+import tempfile
+
+from src.database.db_manager import db_manager
+from src.utils.enrollments import add_enrollments, remove_enrollments, move_enrollments
+
+def setup_test_database():
+    """Point db_manager at a fresh temporary database with three courses and four students"""
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_bulk_enrollments.db")
+    db_manager.initialize_database()
+    
+    with db_manager.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (?, 1, ?, ?)
+        """, [(1, 'ENR101', 'One'), (2, 'ENR102', 'Two'), (3, 'ENR103', 'Three')])
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name, import_hash)
+            VALUES (?, 1, ?, ?, 42)
+        """, [(i + 10, f"E{i:04d}", f"Student {i}") for i in range(4)])
+        cursor.execute("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            SELECT 20, id, 1, '2026-01-05', '09:00', 60 FROM courses WHERE code = 'ENR102'
+        """)
+    
+    courses = {row["code"]: row["id"] for row in db_manager.execute_query("SELECT id, code FROM courses")}
+    students = [row["id"] for row in db_manager.execute_query("SELECT id FROM students ORDER BY student_no")]
+    return courses, students
+
+def enrolled(course_id):
+    rows = db_manager.execute_query("SELECT student_id FROM student_courses WHERE course_id = ?", (course_id,))
+    return {row["student_id"] for row in rows}
+
+def slot_students():
+    return {row["student_id"] for row in db_manager.execute_query("SELECT student_id FROM exam_slot_students")}
+
+def test_add_and_remove():
+    """Students are added to and removed from several courses in one call"""
+    print("\nTesting bulk add and remove...")
+    courses, students = setup_test_database()
+    version = db_manager.get_version("student_courses")
+    
+    added = add_enrollments(students[:3], [courses["ENR101"], courses["ENR102"]])
+    assert added == 6
+    assert add_enrollments(students[:3], [courses["ENR101"]]) == 0
+    assert enrolled(courses["ENR102"]) == set(students[:3])
+    assert slot_students() == set(students[:3])
+    assert db_manager.get_version("student_courses") > version
+    
+    removed = remove_enrollments(students[1:], [courses["ENR101"], courses["ENR102"]])
+    assert removed == 4
+    assert enrolled(courses["ENR102"]) == {students[0]}
+    assert slot_students() == {students[0]}
+    
+    hashes = db_manager.execute_query("SELECT import_hash FROM students ORDER BY student_no")
+    assert [row["import_hash"] for row in hashes] == [None, None, None, 42]
+    print(f"✓ {added} enrollments added, {removed} removed, slot index updated")
+
+def test_move_cohort():
+    """A whole course or a selection moves without creating duplicates"""
+    print("\nTesting cohort move...")
+    courses, students = setup_test_database()
+    add_enrollments(students, [courses["ENR101"]])
+    add_enrollments(students[:1], [courses["ENR102"]])
+    
+    moved = move_enrollments(courses["ENR101"], courses["ENR102"], students[:2])
+    assert moved == 2
+    assert enrolled(courses["ENR101"]) == set(students[2:])
+    assert enrolled(courses["ENR102"]) == set(students[:2])
+    
+    moved = move_enrollments(courses["ENR101"], courses["ENR103"])
+    assert moved == 2
+    assert enrolled(courses["ENR101"]) == set()
+    assert enrolled(courses["ENR103"]) == set(students[2:])
+    assert slot_students() == set(students[:2])
+    
+    count = db_manager.execute_query("SELECT COUNT(*) as count FROM student_courses")[0]["count"]
+    assert count == 4
+    print("✓ Selected students and a whole course moved, no duplicates left")
+
+def main():
+    print("=" * 70)
+    print("BULK ENROLLMENTS - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Add and remove", test_add_and_remove),
+        ("Move cohort", test_move_cohort),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,414 @@
+"""
+Test Script for the bulk import pipeline
+Checks that spreadsheet imports are applied as set-based writes:
+1. New students get display IDs and enrollments in one pass
+2. Re-importing writes only added and changed students and enrollments
+3. Unknown course codes and incomplete rows are reported, not imported
+4. Course catalogues with section header rows are flattened and upserted
+5. Workbooks are streamed in chunks below the detected header row
+6. Cancelling between chunks rolls the whole import back
+7. CSV exports go through the same normalisation and header detection
+8. The dry-run validator reports bad rows with their file row numbers
+9. Code -> ID lookups are cached until the courses or students table changes
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+from openpyxl import Workbook
+from src.database.db_manager import db_manager
+from src.utils.excel_reader import ExcelChunkReader, open_chunk_reader
+from src.utils.background_jobs import CancelToken, JobCancelled
+from src.utils.bulk_import import (import_students, prepare_students, import_courses,
+                                   resolve_course_sections, iter_course_sections,
+                                   import_student_chunks,
+                                   STUDENT_COLUMN_MAP, plan_student_import, apply_student_import,
+                                   plan_has_changes, map_student_columns)
+from src.utils.import_validator import StudentImportValidator, write_error_report
+from src.utils.lookup_cache import lookup_cache
+
+def setup_test_database():
+    """Point db_manager at a fresh temporary database with two courses"""
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_bulk_import.db")
+    db_manager.initialize_database()
+    
+    with db_manager.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (?, 1, ?, ?)
+        """, [(1, 'BLK101', 'Bulk One'), (2, 'BLK102', 'Bulk Two')])
+
+def sample_frame():
+    return pd.DataFrame({
+        "student_no": ["B0001", "B0002", "B0003", " ", "B0002"],
+        "name": ["Ada", "Bora", "Cem", "Nameless", "Bora Updated"],
+        "class_level": [1, 2, None, 1, 2],
+        "course_codes": ["BLK101, BLK102", "BLK101", None, "BLK101", "BLK102,XYZ999"],
+    })
+
+def test_prepare_students():
+    """Rows are cleaned, deduplicated and turned into an edge list"""
+    print("\nTesting frame preparation...")
+    prepared = prepare_students(sample_frame())
+    
+    assert prepared["students"]["student_no"].tolist() == ["B0001", "B0003", "B0002"]
+    assert prepared["errors"] == ["Row 5: missing student number or name"]
+    edges = set(map(tuple, prepared["enrollments"].values.tolist()))
+    assert edges == {("B0001", "BLK101"), ("B0001", "BLK102"), ("B0002", "BLK101"),
+                     ("B0002", "BLK102"), ("B0002", "XYZ999")}
+    print("✓ Blank rows reported, duplicates collapsed, course codes exploded")
+
+def test_long_format_edges():
+    """One-row-per-enrollment files become an edge list without regrouping"""
+    print("\nTesting long format preparation...")
+    df = map_student_columns(pd.DataFrame({
+        "Öğrenci No": ["L0001", "L0001", "L0002", "L0001"],
+        "Ad Soyad": ["Ada", "Ada", "Bora", "Ada"],
+        "Sınıf": ["1. Sınıf", "1. Sınıf", "2. Sınıf", "1. Sınıf"],
+        "Ders": ["BLK101", "BLK102", "BLK101", "BLK101"],
+    }))
+    prepared = prepare_students(df)
+    
+    assert prepared["students"]["student_no"].tolist() == ["L0002", "L0001"]
+    assert prepared["students"]["class_level"].tolist() == [2, 1]
+    assert prepared["enrollments"].values.tolist() == [["L0001", "BLK101"], ["L0001", "BLK102"], ["L0002", "BLK101"]]
+    print("✓ Long rows kept as edges, duplicate enrollment dropped")
+
+def test_import_students():
+    """New students and their enrollments are written in one transaction"""
+    print("\nTesting bulk student import...")
+    setup_test_database()
+    
+    result = import_students(sample_frame(), 1)
+    assert result["added"] == 3
+    assert result["enrollments_added"] == 4
+    assert result["skipped_enrollments"] == 1
+    assert result["unresolved_codes"] == {"XYZ999": 1}
+    
+    students = db_manager.execute_query("SELECT display_id, student_no, name FROM students ORDER BY display_id")
+    assert [row["display_id"] for row in students] == [1, 2, 3]
+    assert {row["student_no"]: row["name"] for row in students}["B0002"] == "Bora Updated"
+    print(f"✓ {result['added']} students and {result['enrollments_added']} enrollments imported")
+
+def test_reimport_updates():
+    """Re-importing skips unchanged students and reuses freed display IDs"""
+    print("\nTesting re-import...")
+    setup_test_database()
+    import_students(sample_frame(), 1)
+    db_manager.execute_update("DELETE FROM students WHERE student_no = 'B0001'")
+    
+    result = import_students(sample_frame(), 1)
+    assert result["added"] == 1
+    assert result["unchanged"] == 2
+    
+    count = db_manager.execute_query("SELECT COUNT(*) as count FROM students")[0]["count"]
+    display_id = db_manager.execute_query("SELECT display_id FROM students WHERE student_no = 'B0001'")[0]["display_id"]
+    assert count == 3
+    assert display_id == 1
+    print("✓ Unchanged students skipped, freed display ID recycled")
+
+def test_change_detection():
+    """Only changed students and enrollments are written on re-import"""
+    print("\nTesting change detection...")
+    setup_test_database()
+    import_students(sample_frame(), 1)
+    version = db_manager.get_version("student_courses")
+    
+    unchanged = plan_student_import([sample_frame()], 1)
+    assert not plan_has_changes(unchanged)
+    assert apply_student_import(unchanged)["unchanged"] == 3
+    assert db_manager.get_version("student_courses") == version
+    
+    edited = sample_frame().iloc[[0, 1, 2, 4]].copy()
+    edited.loc[0, "course_codes"] = "BLK101"
+    plan = plan_student_import([edited], 1)
+    assert plan["changed"]["student_no"].tolist() == ["B0001"]
+    assert len(plan["remove_edges"]) == 1
+    
+    result = apply_student_import(plan)
+    assert result["changed"] == 1
+    assert result["unchanged"] == 2
+    assert result["enrollments_removed"] == 1
+    assert db_manager.get_version("student_courses") > version
+    
+    courses = db_manager.execute_query("""
+        SELECT c.code FROM student_courses sc
+        JOIN students s ON sc.student_id = s.id
+        JOIN courses c ON sc.course_id = c.id
+        WHERE s.student_no = 'B0001'
+    """)
+    assert [row["code"] for row in courses] == ["BLK101"]
+    print("✓ One student changed, one enrollment removed, version bumped once")
+
+def test_resolve_course_sections():
+    """Section rows set class level and type for the courses below them"""
+    print("\nTesting course section headers...")
+    df = pd.DataFrame({
+        "code": ["BLK100", "2. Sınıf", "DERS KODU", "BLK201", "SEÇMELİ DERSLER", "BLK202", "3. Sınıf", "BLK301", None],
+        "name": ["Intro", None, "DERS ADI", "Core", None, "Option", None, "Advanced", "Orphan"],
+    })
+    courses = resolve_course_sections(df)
+    
+    assert courses["code"].tolist() == ["BLK100", "BLK201", "BLK202", "BLK301"]
+    assert courses["class_level"].tolist() == [1, 2, 2, 3]
+    assert courses["type"].tolist() == ["mandatory", "mandatory", "elective", "mandatory"]
+    print("✓ Class level and elective sections carried down to their courses")
+
+def test_import_courses():
+    """Courses are inserted or updated in one batched upsert"""
+    print("\nTesting bulk course import...")
+    setup_test_database()
+    df = pd.DataFrame({
+        "code": ["BLK101", "BLK103"],
+        "name": ["Bulk One Renamed", "Bulk Three"],
+        "type": ["Elective", "unknown"],
+    })
+    
+    result = import_courses(df, 1)
+    assert result["inserted"] == 1
+    assert result["updated"] == 1
+    
+    courses = {row["code"]: row for row in db_manager.execute_query("SELECT * FROM courses")}
+    assert courses["BLK101"]["name"] == "Bulk One Renamed"
+    assert courses["BLK101"]["display_id"] == 1
+    assert courses["BLK101"]["type"] == "elective"
+    assert courses["BLK103"]["type"] is None
+    print("✓ Existing course updated in place, new course inserted")
+
+def test_excel_chunk_reader():
+    """The header row is found below title rows and data arrives in chunks"""
+    print("\nTesting streaming Excel reader...")
+    file_path = os.path.join(tempfile.mkdtemp(), "catalogue.xlsx")
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["1. Sınıf"])
+    sheet.append(["DERS KODU", "DERS ADI"])
+    sheet.append(["BLK101", "Bulk One"])
+    sheet.append(["SEÇMELİ DERSLER"])
+    sheet.append(["BLK102", "Bulk Two"])
+    sheet.append([None, None])
+    sheet.append(["2. Sınıf"])
+    sheet.append(["BLK201", "Bulk Three"])
+    workbook.save(file_path)
+    
+    reader = ExcelChunkReader(file_path, ["DERS KODU"], chunk_size=3)
+    chunks = list(reader)
+    assert reader.header_row == 2
+    assert [len(chunk) for chunk in chunks] == [3, 2]
+    assert (chunks[0].index + 2).tolist() == [3, 4, 5]
+    
+    renamed = (chunk.rename(columns={"DERS KODU": "code", "DERS ADI": "name"}) for chunk in chunks)
+    courses = pd.concat(list(iter_course_sections(renamed)))
+    assert courses["code"].tolist() == ["BLK101", "BLK102", "BLK201"]
+    assert courses["class_level"].tolist() == [1, 1, 2]
+    assert courses["type"].tolist() == ["mandatory", "elective", "mandatory"]
+    print("✓ Header detected after title row, sections carried across chunks")
+
+def test_cancel_rolls_back():
+    """A cancel raised from the progress callback leaves the database untouched"""
+    print("\nTesting cancelled import...")
+    setup_test_database()
+    token = CancelToken()
+    chunks = [sample_frame().iloc[:2], sample_frame().iloc[2:]]
+    
+    def progress(rows_done):
+        token.cancel()
+        token.raise_if_cancelled()
+    
+    try:
+        import_student_chunks(chunks, 1, progress_callback=progress)
+        assert False, "import was not cancelled"
+    except JobCancelled:
+        pass
+    
+    count = db_manager.execute_query("SELECT COUNT(*) as count FROM students")[0]["count"]
+    assert count == 0
+    print("✓ First chunk rolled back after cancel")
+
+def test_csv_import():
+    """A semicolon-separated registrar CSV imports like the Excel export"""
+    print("\nTesting CSV import...")
+    setup_test_database()
+    file_path = os.path.join(tempfile.mkdtemp(), "students.csv")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("Öğrenci Listesi\n")
+        f.write("Öğrenci No;Ad Soyad;Sınıf;Ders\n")
+        f.write("00017;Ada;1. Sınıf;BLK101\n")
+        f.write("00017;Ada;1. Sınıf;BLK102\n")
+        f.write("00018;Bora;2. Sınıf;BLK101\n")
+    
+    reader = open_chunk_reader(file_path, STUDENT_COLUMN_MAP)
+    result = import_student_chunks(map(map_student_columns, reader), 1)
+    assert reader.header_row == 2
+    assert result["added"] == 2
+    assert result["enrollments_added"] == 3
+    
+    student = db_manager.execute_query("SELECT * FROM students WHERE student_no = '00017'")[0]
+    assert student["class_level"] == 1
+    print("✓ Title line skipped, leading zeros kept, enrollments imported")
+
+def test_csv_multibyte_sample_boundary():
+    """A UTF-8 character cut by the encoding sample does not turn the file into latin-1"""
+    print("\nTesting CSV encoding detection at the sample boundary...")
+    file_path = os.path.join(tempfile.mkdtemp(), "students.csv")
+    lines = ["Öğrenci No;Ad Soyad;Sınıf;Ders\n"]
+    lines += [f"{i:05d};Öğrenci Şahin;1. Sınıf;BLK101\n" for i in range(1500)]
+    text = "".join(lines)
+    
+    # Pad so that the 64 KiB sample ends between the two bytes of a "ğ"
+    padding = 64 * 1024 - 1 - len(text.encode("utf-8")) - len("99999;")
+    text += "99999;" + "a" * padding + "ğ;1. Sınıf;BLK101\n"
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    assert text.encode("utf-8")[64 * 1024 - 1:64 * 1024 + 1] == "ğ".encode("utf-8")
+    
+    reader = open_chunk_reader(file_path, STUDENT_COLUMN_MAP)
+    frame = pd.concat(list(reader))
+    assert reader.encoding == "utf-8-sig"
+    assert reader.columns[0] == "Öğrenci No"
+    assert frame["Ad Soyad"].iloc[0] == "Öğrenci Şahin"
+    assert frame["Ad Soyad"].iloc[-1].endswith("ğ")
+    print("✓ UTF-8 detected when the sample ends inside a character")
+
+def test_validate_import():
+    """Validation flags every problem row without writing anything"""
+    print("\nTesting import validation...")
+    setup_test_database()
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (3, 2, 'OTH201', 'Other Department')
+        """)
+    df = pd.DataFrame({
+        "Öğrenci No": ["V0001", "V0001", "V0002", "V0002", "V0003", None],
+        "Ad Soyad": ["Ada", "Ada", "Bora", "Bora B.", "Cem", "Nameless"],
+        "Sınıf": ["1. Sınıf", "1. Sınıf", "9. Sınıf", "9. Sınıf", "Hazırlık", "1. Sınıf"],
+        "Ders": ["BLK101", "BLK101", "XYZ999", "OTH201", "BLK102", "BLK101"],
+    })
+    
+    validator = StudentImportValidator(1)
+    validator.add_chunk(map_student_columns(df.iloc[:3]))
+    validator.add_chunk(map_student_columns(df.iloc[3:]))
+    report = validator.report()
+    issues = set(zip(report["row"], report["message"]))
+    
+    assert (3, "Duplicate enrollment row") in issues
+    assert (4, "Unknown course code 'XYZ999'") in issues
+    assert (5, "Course 'OTH201' belongs to another department") in issues
+    assert (6, "Invalid class level 'Hazırlık'; stored empty") in issues
+    assert (7, "Missing student number or name") in issues
+    assert report["row"].is_monotonic_increasing
+    assert set(report.loc[report["row"] == 5, "message"]) >= {
+        "Student number used with different names; the last name is kept",
+        "Invalid class level '9. Sınıf'; stored empty"}
+    assert db_manager.execute_query("SELECT COUNT(*) as count FROM students")[0]["count"] == 0
+    
+    strict = StudentImportValidator(1, course_department_id=1)
+    strict.add_chunk(map_student_columns(df))
+    assert "error" in set(strict.report().loc[lambda r: r["row"] == 5, "severity"])
+    
+    file_path = write_error_report(report, os.path.join(tempfile.mkdtemp(), "errors.csv"))
+    saved = pd.read_csv(file_path, encoding="utf-8-sig")
+    assert list(saved.columns) == ["Row", "Student No", "Severity", "Message"]
+    assert len(saved) == len(report)
+    print(f"✓ {len(report)} issues reported with row numbers, nothing imported")
+
+def test_missing_columns_report():
+    """A file without the required columns yields a single error"""
+    print("\nTesting missing column validation...")
+    validator = StudentImportValidator(1)
+    validator.add_chunk(pd.DataFrame({"student_no": ["V0001"]}))
+    report = validator.report()
+    assert report["message"].tolist() == ["Missing required columns: name"]
+    print("✓ Missing name column reported")
+
+def test_lookup_cache():
+    """Cached maps are reused until a trigger bumps the table version"""
+    print("\nTesting lookup cache...")
+    setup_test_database()
+    
+    with db_manager.transaction() as cursor:
+        first = lookup_cache.course_ids(cursor)
+        assert lookup_cache.course_ids(cursor) is first
+    assert set(first) == {"BLK101", "BLK102"}
+    
+    try:
+        with db_manager.transaction() as cursor:
+            cursor.execute("INSERT INTO courses (display_id, department_id, code, name) VALUES (5, 1, 'TMP1', 'Tmp')")
+            assert "TMP1" in lookup_cache.course_ids(cursor)
+            raise RuntimeError("rollback")
+    except RuntimeError:
+        pass
+    with db_manager.transaction() as cursor:
+        assert lookup_cache.course_ids(cursor) is first
+    
+    db_manager.execute_update("UPDATE courses SET code = 'BLK199' WHERE code = 'BLK102'")
+    with db_manager.transaction() as cursor:
+        assert set(lookup_cache.course_ids(cursor)) == {"BLK101", "BLK199"}
+    
+    import_students(sample_frame(), 1)
+    with db_manager.transaction() as cursor:
+        assert set(lookup_cache.student_ids(cursor)) == {"B0001", "B0002", "B0003"}
+    db_manager.execute_update("DELETE FROM students WHERE student_no = 'B0003'")
+    with db_manager.transaction() as cursor:
+        assert lookup_cache.student_ids(cursor, ["B0001", "B0003"]).keys() == {"B0001"}
+    
+    # A different database file at the same path, e.g. a restored backup, with the same counters
+    courses_version = db_manager.get_version("courses")
+    os.remove(db_manager.db_path)
+    db_manager.initialize_database()
+    with db_manager.transaction() as cursor:
+        cursor.execute("INSERT INTO courses (display_id, department_id, code, name) VALUES (1, 1, 'NEW101', 'New')")
+        cursor.execute("UPDATE data_versions SET version = ? WHERE name = 'courses'", (courses_version,))
+    with db_manager.transaction() as cursor:
+        assert set(lookup_cache.course_ids(cursor)) == {"NEW101"}
+    print("✓ Maps reused, rolled-back writes ignored, renames, deletes and replaced databases picked up")
+
+def main():
+    print("=" * 70)
+    print("BULK IMPORT - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Prepare students", test_prepare_students),
+        ("Long format edges", test_long_format_edges),
+        ("Import students", test_import_students),
+        ("Re-import updates", test_reimport_updates),
+        ("Change detection", test_change_detection),
+        ("Resolve course sections", test_resolve_course_sections),
+        ("Import courses", test_import_courses),
+        ("Excel chunk reader", test_excel_chunk_reader),
+        ("Cancel rolls back", test_cancel_rolls_back),
+        ("CSV import", test_csv_import),
+        ("CSV sample boundary", test_csv_multibyte_sample_boundary),
+        ("Validate import", test_validate_import),
+        ("Missing columns report", test_missing_columns_report),
+        ("Lookup cache", test_lookup_cache),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
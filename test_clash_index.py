@@ -0,0 +1,152 @@
+"""
+Test Script for the exam slot index
+Checks the slot -> student table behind the clash lookups:
+1. Saving a schedule fills the index with every enrolled student
+2. Students sharing a slot are reported as clashes
+3. Enrollment edits update the index of the affected courses only
+4. The index is rolled back together with the edit that invalidated it
+"""
+
+import os
+import sys
+import tempfile
+
+from src.database.db_manager import db_manager
+from src.utils.clash_index import rebuild_slot_index, get_exam_clashes
+from src.utils.enrollments import add_enrollments
+from src.utils.scheduler import ExamScheduler
+
+def setup_test_database():
+    """Point db_manager at a fresh temporary database with three scheduled courses"""
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_clash_index.db")
+    db_manager.initialize_database()
+    
+    with db_manager.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (?, 1, ?, ?)
+        """, [(1, 'CLA101', 'Morning A'), (2, 'CLA102', 'Morning B'), (3, 'CLA103', 'Afternoon')])
+        courses = [row[0] for row in cursor.execute("SELECT id FROM courses ORDER BY display_id")]
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name)
+            VALUES (?, 1, ?, ?)
+        """, [(i + 1, f"C{i:04d}", f"Clash Student {i}") for i in range(4)])
+        students = [row[0] for row in cursor.execute("SELECT id FROM students ORDER BY display_id")]
+        cursor.execute("""
+            INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+            VALUES (1, 1, 'C-01', 'Clash Room', 12, 3, 2, 2)
+        """)
+        classroom_id = cursor.lastrowid
+        # Students 0 and 1 sit both morning exams; student 2 only the first
+        cursor.executemany("INSERT INTO student_courses (student_id, course_id) VALUES (?, ?)", [
+            (students[0], courses[0]), (students[0], courses[1]),
+            (students[1], courses[0]), (students[1], courses[1]),
+            (students[2], courses[0]), (students[3], courses[2]),
+        ])
+    
+    ExamScheduler(1).save_schedule([
+        {"course_id": courses[0], "date": "2026-01-05", "start_time": "09:00", "duration": 60, "classrooms": [classroom_id]},
+        {"course_id": courses[1], "date": "2026-01-05", "start_time": "09:00", "duration": 60, "classrooms": [classroom_id]},
+        {"course_id": courses[2], "date": "2026-01-05", "start_time": "13:00", "duration": 60, "classrooms": [classroom_id]},
+    ])
+    
+    exams = {row["course_id"]: row["id"] for row in db_manager.execute_query("SELECT id, course_id FROM exams")}
+    return courses, students, [exams[course_id] for course_id in courses]
+
+def index_rows():
+    rows = db_manager.execute_query("SELECT exam_id, student_id, date, start_time FROM exam_slot_students")
+    return {tuple(row) for row in rows}
+
+def test_save_fills_index():
+    """Saving a schedule indexes every enrolled student under the exam's slot"""
+    print("\nTesting slot index after saving a schedule...")
+    courses, students, exams = setup_test_database()
+    
+    rows = index_rows()
+    assert len(rows) == 6
+    assert (exams[1], students[0], "2026-01-05", "09:00") in rows
+    assert (exams[2], students[3], "2026-01-05", "13:00") in rows
+    
+    assert rebuild_slot_index() == 6
+    assert index_rows() == rows
+    print(f"✓ {len(rows)} enrollments indexed by slot")
+
+def test_get_exam_clashes():
+    """Only students with another exam in the same slot are reported"""
+    print("\nTesting exam clash lookup...")
+    courses, students, exams = setup_test_database()
+    
+    clashes = get_exam_clashes(exams[0])
+    assert [clash["student_no"] for clash in clashes] == ["C0000", "C0001"]
+    assert clashes[0]["courses"] == "CLA102 - Morning B"
+    assert get_exam_clashes(exams[2]) == []
+    print(f"✓ {len(clashes)} clashing students found")
+
+def test_enrollment_edit_updates_index():
+    """Adding an enrollment re-indexes only the affected course"""
+    print("\nTesting slot index after an enrollment edit...")
+    courses, students, exams = setup_test_database()
+    
+    assert add_enrollments([students[2]], [courses[1]]) == 1
+    assert (exams[1], students[2], "2026-01-05", "09:00") in index_rows()
+    assert [clash["student_no"] for clash in get_exam_clashes(exams[0])] == ["C0000", "C0001", "C0002"]
+    
+    assert rebuild_slot_index(course_ids=[courses[2]]) == 1
+    assert rebuild_slot_index(course_ids=[]) == 0
+    assert len(index_rows()) == 7
+    print("✓ New enrollment shows up as a clash")
+
+def test_rebuild_rolls_back_with_edit():
+    """A failed edit leaves the index as it was"""
+    print("\nTesting slot index rollback...")
+    courses, students, exams = setup_test_database()
+    before = index_rows()
+    
+    try:
+        with db_manager.transaction() as cursor:
+            cursor.execute("INSERT INTO student_courses (student_id, course_id) VALUES (?, ?)",
+                           (students[3], courses[0]))
+            rebuild_slot_index(course_ids=[courses[0]], cursor=cursor)
+            raise RuntimeError("edit failed")
+    except RuntimeError:
+        pass
+    
+    assert index_rows() == before
+    print("✓ Index rolled back together with the enrollment")
+
+def main():
+    print("=" * 70)
+    print("EXAM SLOT INDEX - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Index filled on save", test_save_fills_index),
+        ("Exam clash lookup", test_get_exam_clashes),
+        ("Index follows enrollment edits", test_enrollment_edit_updates_index),
+        ("Index rolled back with edit", test_rebuild_rolls_back_with_edit),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,459 @@
+"""
+Test Script for the export pipeline
+Checks that exports stream their rows and keep the house styling:
+1. Styled sheets use named styles, zebra rows and measured column widths
+2. Student and schedule exports read the database in one streaming pass
+3. Batch seating exports render in worker processes into one ZIP
+4. Classroom layouts draw their desk grid once as a reusable form
+5. Exam cards come from one bulk query and render in parallel chunks
+6. Unchanged exports are served from the cache until their tables change
+7. Schedule feeds stream iCalendar and NDJSON per department, room or student
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+from openpyxl import load_workbook
+from src.database.db_manager import db_manager
+from src.utils.excel_export import (write_styled_workbook, export_students_to_excmanual,
+                                    export_exam_schedule_to_excmanual, export_combined_schedule_to_excmanual,
+                                    MAX_COLUMN_WIDTH)
+from src.utils.batch_export import export_all_seating_plans, find_seated_exams
+from src.utils.pdf_export import export_seating_plan_pdf
+from src.utils.exam_cards import export_exam_cards, iter_exam_cards
+from src.utils.export_cache import export_cache
+from src.utils.background_jobs import BackgroundJob, JobCancelled, atomic_export
+from src.utils.pdf_theme import paragraph_style, table_style
+from src.utils.door_lists import export_door_lists, iter_door_lists, split_ranges, sort_key, surname_of
+from src.utils.schedule_feeds import export_schedule_feed, iter_ics, iter_schedule
+from src.utils.seating import SeatingPlanGenerator
+
+def setup_test_database():
+    """Point db_manager at a fresh temporary database with one scheduled exam"""
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_exports.db")
+    db_manager.initialize_database()
+    export_cache.directory = tempfile.mkdtemp()
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (1, 1, 'EXP101', 'Export Basics')
+        """)
+        course_id = cursor.lastrowid
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name)
+            VALUES (?, 1, ?, ?)
+        """, [(i + 10, f"X{i:04d}", f"Student {i}") for i in range(5)])
+        cursor.execute("INSERT INTO student_courses (student_id, course_id) SELECT id, ? FROM students", (course_id,))
+        cursor.execute("""
+            INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+            VALUES (30, 1, 'X-01', 'Export Room', 8, 2, 2, 2)
+        """)
+        classroom_id = cursor.lastrowid
+        cursor.executemany("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            VALUES (?, ?, 1, ?, '09:00', 60)
+        """, [(20, course_id, '2026-01-05'), (21, course_id, '2026-01-12')])
+        cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) SELECT id, ? FROM exams", (classroom_id,))
+    
+    for exam in db_manager.execute_query("SELECT id FROM exams"):
+        SeatingPlanGenerator(exam["id"]).generate_seating()
+
+def test_styled_workbook():
+    """Header and zebra rows carry named styles, widths follow the content"""
+    print("\nTesting streaming styled workbook...")
+    file_path = os.path.join(tempfile.mkdtemp(), "styled.xlsx")
+    rows = ((i, "x" * (i % 3), None if i == 2 else "y" * 80) for i in range(1, 6))
+    count = write_styled_workbook(file_path, ["No", "Short", "Long"], rows)
+    assert count == 5
+    
+    ws = load_workbook(file_path).active
+    assert ws.max_row == 6
+    assert ws["A1"].style == "export_header"
+    assert [ws.cell(row, 1).style for row in (2, 3, 4)] == ["export_row_alt", "export_row", "export_row_alt"]
+    assert ws["C3"].value is None and ws["C3"].style == "export_row"
+    assert ws.column_dimensions["B"].width == len("Short") + 2
+    assert ws.column_dimensions["C"].width == MAX_COLUMN_WIDTH
+    
+    progress = []
+    write_styled_workbook(file_path, ["No"], ((i,) for i in range(2500)), progress_callback=progress.append)
+    assert progress == [1000, 2000]
+    print("✓ Named styles applied, empty cells styled, widths capped, progress reported")
+
+def test_database_exports():
+    """Student and schedule exports stream rows from the database"""
+    print("\nTesting database exports...")
+    setup_test_database()
+    folder = tempfile.mkdtemp()
+    
+    students = load_workbook(export_students_to_excmanual(output_path=os.path.join(folder, "s.xlsx"))).active
+    assert students.max_row == 6
+    assert students["A2"].value == "X0000"
+    assert students["D2"].value == "EXP101"
+    
+    schedule = load_workbook(export_exam_schedule_to_excmanual(1, os.path.join(folder, "e.xlsx"))).active
+    assert [cell.value for cell in schedule[2]][:3] == ["2026-01-05", "09:00", "EXP101"]
+    
+    db_manager.execute_update("DELETE FROM exams")
+    try:
+        export_exam_schedule_to_excmanual(1, os.path.join(folder, "empty.xlsx"))
+        assert False, "empty schedule was exported"
+    except ValueError:
+        pass
+    assert not os.path.exists(os.path.join(folder, "empty.xlsx"))
+    print("✓ Students and schedule exported, empty schedule rejected")
+
+def test_batch_seating_export():
+    """Every seated exam in the range lands in the ZIP as PDF and Excel"""
+    print("\nTesting batch seating export...")
+    setup_test_database()
+    assert len(find_seated_exams(1)) == 2
+    
+    progress = []
+    buffer = io.BytesIO()
+    result = export_all_seating_plans(buffer, department_id=1, start_date="2026-01-01", end_date="2026-01-07",
+                                      progress_callback=lambda done, total: progress.append((done, total)),
+                                      max_workers=2)
+    assert result == {"exported": 1, "errors": []}
+    assert progress == [(1, 1)]
+    
+    with zipfile.ZipFile(buffer) as archive:
+        names = archive.namelist()
+        assert names == ["2026-01-05_0900_EXP101.pdf", "2026-01-05_0900_EXP101.xlsx"]
+        assert archive.read(names[0]).startswith(b"%PDF")
+        sheet = load_workbook(io.BytesIO(archive.read(names[1]))).active
+        assert sheet.max_row == 6
+    print(f"✓ {len(names)} files streamed into the archive")
+
+def test_layout_renderers():
+    """Canvas layouts reuse one desk grid form, the drawing path still works"""
+    print("\nTesting classroom layout renderers...")
+    setup_test_database()
+    exam_id = find_seated_exams(1)[0]["id"]
+    
+    pdfs = {}
+    for renderer in ("canvas", "drawing"):
+        buffer = io.BytesIO()
+        export_seating_plan_pdf(exam_id, buffer, layout_renderer=renderer)
+        pdfs[renderer] = buffer.getvalue()
+        assert pdfs[renderer].startswith(b"%PDF")
+    # One desk grid form plus the shared page header/footer form
+    assert pdfs["canvas"].count(b"/Subtype /Form") == 2
+    assert pdfs["drawing"].count(b"/Subtype /Form") == 1
+    
+    try:
+        export_seating_plan_pdf(exam_id, io.BytesIO(), layout_renderer="svg")
+        assert False, "unknown renderer accepted"
+    except ValueError:
+        pass
+    print("✓ Desk grid drawn once as a form, unknown renderer rejected")
+
+def test_exam_cards():
+    """Every student gets one card page listing all their exams and seats"""
+    print("\nTesting exam cards...")
+    setup_test_database()
+    
+    cards = list(iter_exam_cards(1))
+    assert [card[0] for card in cards] == [f"X{i:04d}" for i in range(5)]
+    exams = cards[0][4]
+    assert [exam[:3] for exam in exams] == [("2026-01-05", "09:00", "EXP101"), ("2026-01-12", "09:00", "EXP101")]
+    assert exams[0][4] == "Export Room" and exams[0][5].startswith("Row ")
+    
+    progress = []
+    buffer = io.BytesIO()
+    result = export_exam_cards(buffer, 1, progress_callback=lambda done, total: progress.append((done, total)),
+                               max_workers=2, cards_per_file=2)
+    assert result == {"students": 5, "files": 3}
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+    
+    with zipfile.ZipFile(buffer) as archive:
+        pages = [archive.read(name).count(b"/Type /Page\n") for name in archive.namelist()]
+    assert pages == [2, 2, 1]
+    print(f"✓ {result['students']} cards rendered into {result['files']} PDF files")
+
+def test_export_cache():
+    """A repeated export is copied from the cache, a data change rebuilds it"""
+    print("\nTesting export cache...")
+    setup_test_database()
+    folder = tempfile.mkdtemp()
+    exam_id = find_seated_exams(1)[0]["id"]
+    
+    first = export_seating_plan_pdf(exam_id, os.path.join(folder, "first.pdf"))
+    assert len(os.listdir(export_cache.directory)) == 1
+    
+    cached = os.path.join(export_cache.directory, os.listdir(export_cache.directory)[0])
+    with open(cached, "ab") as f:
+        f.write(b"%cached")
+    second = export_seating_plan_pdf(exam_id, os.path.join(folder, "second.pdf"), progress_callback=print)
+    with open(second, "rb") as f:
+        assert f.read().endswith(b"%cached")
+    
+    db_manager.execute_update("UPDATE students SET name = 'Renamed' WHERE student_no = 'X0000'")
+    third = export_seating_plan_pdf(exam_id, os.path.join(folder, "third.pdf"))
+    with open(third, "rb") as f:
+        assert not f.read().endswith(b"%cached")
+    assert len(os.listdir(export_cache.directory)) == 2
+    
+    max_bytes, export_cache.max_bytes = export_cache.max_bytes, os.path.getsize(third)
+    try:
+        export_seating_plan_pdf(exam_id, os.path.join(folder, "fourth.pdf"), layout_renderer="drawing")
+        assert len(os.listdir(export_cache.directory)) == 1
+    finally:
+        export_cache.max_bytes = max_bytes
+    assert os.path.getsize(first) > 0
+    
+    # A job served from the cache still completes its progress
+    progress = []
+    job = BackgroundJob(lambda job: export_seating_plan_pdf(
+        exam_id, os.path.join(folder, "fifth.pdf"), layout_renderer="drawing", progress_callback=job.report_progress
+    ))
+    job.signals.progress.connect(lambda done, total: progress.append((done, total)))
+    job.run()
+    assert progress == [(1, 1)]
+    print("✓ Cache hit served, stale entry rebuilt, oldest entries evicted")
+
+def test_atomic_export():
+    """A failed or cancelled export keeps the file it would have overwritten"""
+    print("\nTesting atomic export files...")
+    folder = tempfile.mkdtemp()
+    file_path = os.path.join(folder, "plan.txt")
+    with open(file_path, "w") as f:
+        f.write("old")
+    
+    def write(path, error):
+        with open(path, "w") as f:
+            f.write("partial")
+        if error:
+            raise error
+        return path
+    
+    for error in (RuntimeError("export failed"), JobCancelled()):
+        try:
+            atomic_export(lambda path, job: write(path, error), file_path)(job=None)
+        except (RuntimeError, JobCancelled):
+            pass
+        with open(file_path) as f:
+            assert f.read() == "old"
+        assert os.listdir(folder) == ["plan.txt"]
+    
+    written = atomic_export(lambda path, job: write(path, None), file_path)(job=None)
+    assert written.endswith(".txt") and written != file_path
+    with open(file_path) as f:
+        assert f.read() == "partial"
+    assert os.listdir(folder) == ["plan.txt"]
+    print("✓ Existing file kept on failure and cancel, replaced on success")
+
+def test_schedule_feeds():
+    """Feeds are valid line by line and narrow down to a room or a student"""
+    print("\nTesting schedule feeds...")
+    setup_test_database()
+    
+    lines = iter_ics(iter_schedule(1), "Export Department, long name " + "x" * 80)
+    assert next(lines) == "BEGIN:VCALENDAR\r\n"
+    
+    buffer = io.StringIO()
+    export_schedule_feed(buffer, "ics", department_id=1)
+    calendar = buffer.getvalue()
+    assert calendar.count("BEGIN:VEVENT") == 2
+    assert "DTSTART:20260105T090000\r\n" in calendar and "DTEND:20260105T100000\r\n" in calendar
+    assert all(len(line.encode("utf-8")) <= 75 for line in calendar.split("\r\n"))
+    
+    classroom_id = db_manager.execute_query("SELECT id FROM classrooms")[0]["id"]
+    buffer = io.StringIO()
+    assert export_schedule_feed(buffer, "ndjson", classroom_id=classroom_id) == 2
+    assert json.loads(buffer.getvalue().splitlines()[0])["classrooms"] == "Export Room"
+    
+    student_id = db_manager.execute_query("SELECT id FROM students WHERE student_no = 'X0001'")[0]["id"]
+    buffer = io.StringIO()
+    export_schedule_feed(buffer, "ndjson", student_id=student_id)
+    exams = [json.loads(line) for line in buffer.getvalue().splitlines()]
+    assert [exam["date"] for exam in exams] == ["2026-01-05", "2026-01-12"]
+    assert exams[0]["seat"]["classroom"] == "Export Room" and exams[0]["seat"]["row"] >= 1
+    print(f"✓ Calendar, room and student feeds streamed ({len(calendar)} bytes of iCalendar)")
+
+def test_pdf_theme():
+    """Styles and page decorations are built once and shared by every export"""
+    print("\nTesting PDF theme...")
+    setup_test_database()
+    exam_id = find_seated_exams(1)[0]["id"]
+    
+    assert paragraph_style("PlanTitle") is paragraph_style("PlanTitle")
+    assert table_style() is table_style() and table_style() is not table_style(11, 12)
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+            VALUES (31, 1, 'X-02', 'Second Room', 8, 2, 2, 2)
+        """)
+        cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)",
+                       (exam_id, cursor.lastrowid))
+    SeatingPlanGenerator(exam_id).generate_seating()
+    
+    buffer = io.BytesIO()
+    export_seating_plan_pdf(exam_id, buffer)
+    pdf = buffer.getvalue()
+    assert pdf.count(b"/Type /Page\n") >= 2
+    # Every page places the same desk grid and header/footer forms
+    assert pdf.count(b"/Subtype /Form") == 2
+    print("✓ Shared styles reused, header and footer drawn once per document")
+
+def test_door_lists():
+    """Surname ranges come from seating, or from enrollment when nothing is seated"""
+    print("\nTesting door lists...")
+    setup_test_database()
+    
+    assert surname_of("Ayşe Işık") == "IŞIK" and surname_of("Ali İnce") == "İNCE"
+    ranges = split_ranges([("AKSOY", "A1"), ("KAYA", "A1"), ("KOÇ", "B2"), ("ZORLU", "B2")])
+    assert [(r["from"], r["to"], r["classroom"], r["students"]) for r in ranges] == \
+        [("A", "KA", "A1", 2), ("KO", "Z", "B2", 2)]
+    
+    # Letters outside the Turkish alphabet sort after Z instead of before A
+    surnames = ["WAGNER", "ÇELİK", "AKSOY", "ZORLU", "ÉMILE"]
+    assert sorted(surnames, key=lambda surname: sort_key(surname, surname)) == \
+        ["AKSOY", "ÇELİK", "ZORLU", "WAGNER", "ÉMILE"]
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("DELETE FROM exam_seating WHERE exam_id = (SELECT MAX(id) FROM exams)")
+        cursor.execute("UPDATE students SET name = 'Öğrenci ' || substr('ÇBADE', display_id - 9, 1) || 'soy'")
+        cursor.execute("UPDATE classrooms SET rows = 1, cols = 1, seat_mask = NULL")
+    
+    seated, unseated = iter_door_lists(1)
+    assert seated["source"] == "seating" and sum(r["students"] for r in seated["ranges"]) == 5
+    assert unseated["source"] == "enrollment"
+    # Two usable seats in the room, the rest of the alphabet is unassigned
+    assert [(r["from"], r["to"], r["classroom"], r["students"]) for r in unseated["ranges"]] == \
+        [("A", "B", "Export Room", 2), ("Ç", "E", None, 3)]
+    
+    buffer = io.BytesIO()
+    progress = []
+    result = export_door_lists(buffer, 1, "2026-01-12", "2026-01-12", progress_callback=progress.append)
+    assert result == {"exams": 1, "ranges": 2} and progress == [1]
+    with zipfile.ZipFile(buffer) as archive:
+        assert sorted(archive.namelist()) == ["door_lists.pdf", "door_lists.xlsx"]
+        sheet = load_workbook(io.BytesIO(archive.read("door_lists.xlsx"))).active
+        assert sheet.max_row == 3
+    print("✓ Ranges split from seating and enrollment, PDF and Excel written in one batch")
+
+def test_door_lists_seated_rooms():
+    """A randomly seated multi-room exam gets one alphabetical block per classroom"""
+    print("\nTesting door lists of a multi-room seated exam...")
+    setup_test_database()
+    surnames = ["Aksoy", "Yılmaz", "Çelik", "Kaya", "Öztürk", "Demir", "Şahin", "Wagner", "İnce", "Ünal", "Zorlu"]
+    
+    with db_manager.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name)
+            VALUES (?, 1, ?, ?)
+        """, [(i + 100, f"R{i:04d}", f"Öğrenci{i} {surnames[i % len(surnames)]}") for i in range(55)])
+        cursor.execute("""
+            INSERT OR IGNORE INTO student_courses (student_id, course_id)
+            SELECT s.id, c.id FROM students s, courses c WHERE c.code = 'EXP101'
+        """)
+        exam_id = cursor.execute("SELECT id FROM exams WHERE date = '2026-01-12'").fetchone()[0]
+        cursor.execute("DELETE FROM exam_classrooms WHERE exam_id = ?", (exam_id,))
+        for room in range(4):
+            cursor.execute("""
+                INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+                VALUES (?, 1, ?, ?, 16, 2, 4, 2)
+            """, (40 + room, f"R-0{room}", f"Hall {room}"))
+            cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)", (exam_id, cursor.lastrowid))
+    SeatingPlanGenerator(exam_id).generate_seating()
+    
+    exam, = iter_door_lists(1, "2026-01-12", "2026-01-12")
+    assert exam["source"] == "seating"
+    assert [r["classroom"] for r in exam["ranges"]] == ["Hall 0", "Hall 1", "Hall 2", "Hall 3"]
+    assert sum(r["students"] for r in exam["ranges"]) == 60
+    
+    seated = db_manager.execute_query("""
+        SELECT cl.name as classroom, s.name FROM exam_seating es
+        JOIN classrooms cl ON es.classroom_id = cl.id
+        JOIN students s ON es.student_id = s.id
+        WHERE es.exam_id = ?
+    """, (exam_id,))
+    for door_range in exam["ranges"]:
+        names = door_range["names"]
+        assert sorted(row["name"] for row in seated if row["classroom"] == door_range["classroom"]) == sorted(names)
+        assert names == sorted(names, key=lambda name: sort_key(surname_of(name), name))
+        assert (door_range["from"], door_range["to"]) == (surname_of(names[0]), surname_of(names[-1]))
+    
+    buffer = io.BytesIO()
+    assert export_door_lists(buffer, 1, "2026-01-12", "2026-01-12") == {"exams": 1, "ranges": 4}
+    print(f"✓ {len(exam['ranges'])} classroom blocks for {len(seated)} randomly seated students")
+
+def test_combined_schedule():
+    """All departments go into one workbook, one sheet each, with enrollment counts"""
+    print("\nTesting combined schedule export...")
+    setup_test_database()
+    folder = tempfile.mkdtemp()
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("UPDATE departments SET code = 'EXP/2' WHERE id = 2")
+        cursor.execute("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (2, 2, 'OTH201', 'Other Course')
+        """)
+        cursor.execute("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            VALUES (22, ?, 2, '2026-01-06', '13:00', 90)
+        """, (cursor.lastrowid,))
+    
+    path = export_combined_schedule_to_excmanual(os.path.join(folder, "all.xlsx"))
+    workbook = load_workbook(path)
+    codes = {row["id"]: row["code"] for row in db_manager.execute_query("SELECT id, code FROM departments")}
+    assert sorted(workbook.sheetnames) == sorted([codes[1], "EXP_2"])
+    
+    sheet = workbook[codes[1]]
+    assert sheet.max_row == 3
+    assert [cell.value for cell in sheet[2]][:3] == ["2026-01-05", "09:00", "EXP101"]
+    assert sheet["G2"].value == 5
+    assert workbook["EXP_2"]["G2"].value == 0
+    print(f"✓ {len(workbook.sheetnames)} department sheets written from one query")
+
+def main():
+    print("=" * 70)
+    print("EXPORTS - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Styled workbook", test_styled_workbook),
+        ("Database exports", test_database_exports),
+        ("Batch seating export", test_batch_seating_export),
+        ("Layout renderers", test_layout_renderers),
+        ("Exam cards", test_exam_cards),
+        ("Export cache", test_export_cache),
+        ("Atomic export files", test_atomic_export),
+        ("Schedule feeds", test_schedule_feeds),
+        ("PDF theme", test_pdf_theme),
+        ("Door lists", test_door_lists),
+        ("Door lists of seated rooms", test_door_lists_seated_rooms),
+        ("Combined schedule", test_combined_schedule),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,213 @@
+"""
+Test Script for incremental seating updates
+Checks that late enrollment changes only touch the affected seats:
+1. Dropped students free their seat
+2. Newcomers take the nearest free seat
+3. Everyone else keeps their published seat
+"""
+
+import os
+import sys
+import tempfile
+
+from src.database.db_manager import db_manager
+from src.utils.seating import SeatingPlanGenerator, FreeSeatIndex, load_exam_seating
+
+def setup_test_database():
+    """Point db_manager at a fresh temporary database with one seated exam"""
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_incremental_seating.db")
+    db_manager.initialize_database()
+    
+    conn = db_manager.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (1, 1, 'TEST101', 'Test Course')
+        """)
+        course_id = cursor.lastrowid
+        
+        cursor.execute("""
+            INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+            VALUES (1, 1, 'T-01', 'Test Room', 12, 3, 2, 2)
+        """)
+        classroom_id = cursor.lastrowid
+        
+        for i in range(10):
+            cursor.execute("""
+                INSERT INTO students (display_id, department_id, student_no, name)
+                VALUES (?, 1, ?, ?)
+            """, (i + 1, f"T{i:04d}", f"Test Student {i}"))
+            if i < 8:
+                cursor.execute("INSERT INTO student_courses (student_id, course_id) VALUES (?, ?)",
+                               (cursor.lastrowid, course_id))
+        
+        cursor.execute("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            VALUES (1, ?, 1, '2026-01-05', '09:00', 75)
+        """, (course_id,))
+        exam_id = cursor.lastrowid
+        cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)", (exam_id, classroom_id))
+        conn.commit()
+    finally:
+        conn.close()
+    
+    return exam_id, course_id
+
+def load_seats(exam_id):
+    rows = db_manager.execute_query(
+        "SELECT student_id, classroom_id, row, col, seat_position FROM exam_seating WHERE exam_id = ?",
+        (exam_id,)
+    )
+    return {r["student_id"]: (r["classroom_id"], r["row"], r["col"], r["seat_position"]) for r in rows}
+
+def test_free_seat_index():
+    """Free seats come out front-first and can be returned"""
+    print("\nTesting free-seat index...")
+    classroom = {"id": 1, "rows": 2, "cols": 2, "seats_per_desk": 1}
+    index = FreeSeatIndex([classroom], occupied=[(1, 0, 0, 1)])
+    
+    assert index.free_count() == 3
+    assert index.take() == (1, 0, 1, 1)
+    index.release(1, 0, 0, 1)
+    assert index.take() == (1, 0, 0, 1)
+    print("✓ Front-most free seat is taken first")
+
+def test_sync_with_enrollment():
+    """Late enrollment changes keep everyone else's seat"""
+    print("\nTesting seating sync with enrollment...")
+    exam_id, course_id = setup_test_database()
+    generator = SeatingPlanGenerator(exam_id)
+    assert generator.generate_seating()
+    before = load_seats(exam_id)
+    
+    dropped = next(iter(before))
+    db_manager.execute_update("DELETE FROM student_courses WHERE student_id = ? AND course_id = ?",
+                              (dropped, course_id))
+    newcomers = [row["id"] for row in db_manager.execute_query(
+        "SELECT id FROM students WHERE id NOT IN (SELECT student_id FROM student_courses) AND id != ?",
+        (dropped,)
+    )]
+    for student_id in newcomers:
+        db_manager.execute_update("INSERT INTO student_courses (student_id, course_id) VALUES (?, ?)",
+                                  (student_id, course_id))
+    
+    result = generator.sync_with_enrollment()
+    after = load_seats(exam_id)
+    
+    assert result["removed"] == [dropped]
+    assert sorted(result["added"]) == sorted(newcomers)
+    assert dropped not in after
+    assert all(after[sid] == seat for sid, seat in before.items() if sid != dropped)
+    assert before[dropped] in [after[sid] for sid in newcomers]
+    print(f"✓ {len(newcomers)} newcomers placed, 1 seat freed, {len(before) - 1} seats unchanged")
+
+def test_sync_is_atomic():
+    """A failed insert keeps the dropped student's seat instead of freeing it"""
+    print("\nTesting atomic seating sync...")
+    exam_id, course_id = setup_test_database()
+    generator = SeatingPlanGenerator(exam_id)
+    assert generator.generate_seating()
+    before = load_seats(exam_id)
+    
+    dropped = next(iter(before))
+    db_manager.execute_update("DELETE FROM student_courses WHERE student_id = ? AND course_id = ?",
+                              (dropped, course_id))
+    newcomer = db_manager.execute_query(
+        "SELECT id FROM students WHERE id NOT IN (SELECT student_id FROM student_courses) AND id != ?",
+        (dropped,)
+    )[0]["id"]
+    db_manager.execute_update("INSERT INTO student_courses (student_id, course_id) VALUES (?, ?)",
+                              (newcomer, course_id))
+    db_manager.execute_update("""
+        CREATE TRIGGER fail_seat_insert BEFORE INSERT ON exam_seating
+        BEGIN SELECT RAISE(ABORT, 'insert failed'); END
+    """)
+    
+    try:
+        generator.sync_with_enrollment()
+        assert False, "failing insert was ignored"
+    except Exception as e:
+        assert "insert failed" in str(e)
+    assert load_seats(exam_id) == before
+    print("✓ Delete rolled back together with the failed insert")
+
+def test_add_and_remove_student():
+    """Single-student operations write only their own row"""
+    print("\nTesting single-student add/remove...")
+    exam_id, course_id = setup_test_database()
+    generator = SeatingPlanGenerator(exam_id)
+    assert generator.generate_seating()
+    before = load_seats(exam_id)
+    
+    student_id = next(iter(before))
+    seat = before[student_id]
+    assert generator.remove_student(student_id)
+    assert not generator.remove_student(student_id)
+    assert generator.add_student(student_id) == seat
+    assert load_seats(exam_id) == before
+    print("✓ Freed seat is reused by the next newcomer")
+
+def test_load_exam_seating():
+    """Seats are grouped per classroom, empty classrooms are still listed"""
+    print("\nTesting seating load per classroom...")
+    exam_id, course_id = setup_test_database()
+    db_manager.execute_update("""
+        INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+        VALUES (2, 1, 'T-00', 'Annex', 2, 1, 2, 1)
+    """)
+    annex_id = db_manager.execute_query("SELECT id FROM classrooms WHERE code = 'T-00'")[0]["id"]
+    db_manager.execute_update("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)", (exam_id, annex_id))
+    generator = SeatingPlanGenerator(exam_id)
+    assert generator.generate_seating()
+    
+    annex, room = load_exam_seating(exam_id)
+    assert (annex["name"], room["name"]) == ("Annex", "Test Room")
+    assert annex["seats"] == [] and annex["seating_grid"] == {} and annex["total_students"] == 0
+    assert room["total_students"] == 8 and len(room["seating_grid"]) == 8
+    positions = [(seat["row"], seat["col"], seat["seat_position"]) for seat in room["seats"]]
+    assert positions == sorted(positions)
+    assert set(room["seating_grid"]) == set(positions)
+    
+    only_annex = generator.get_seating_by_classroom(annex_id)
+    assert only_annex["id"] == annex_id and only_annex["seats"] == []
+    assert generator.get_seating_by_classroom(room["id"])["total_students"] == 8
+    print("✓ 8 seats grouped into their classroom, empty classroom kept")
+
+def main():
+    print("=" * 70)
+    print("INCREMENTAL SEATING - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Free-seat index", test_free_seat_index),
+        ("Sync with enrollment", test_sync_with_enrollment),
+        ("Atomic sync", test_sync_is_atomic),
+        ("Add and remove student", test_add_and_remove_student),
+        ("Load exam seating", test_load_exam_seating),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,155 @@
+"""
+Test Script for the whole-schedule audit
+Checks every finding of audit_schedule on a small fixture:
+1. Students with two exams in one slot
+2. Classrooms booked twice in a slot, also by another department
+3. Exams whose rooms cannot hold their students
+4. Students with too many exams on one day
+"""
+
+import os
+import sys
+import tempfile
+
+from src.database.db_manager import db_manager
+from src.utils.schedule_audit import audit_schedule
+
+def setup_test_database():
+    """
+    Point db_manager at a fresh temporary database with two departments' schedules
+    
+    Department A has four exams on one day. Student A0000 sits A101 and A102
+    at 09:00 and A103 at 13:00; A102 has two students in a one-seat room; the
+    A101 room is also booked by department B's B101. Department B books one
+    more room twice at 13:00.
+    """
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_schedule_audit.db")
+    db_manager.initialize_database()
+    
+    with db_manager.transaction() as cursor:
+        dept_a, dept_b = [row[0] for row in cursor.execute("SELECT id FROM departments ORDER BY id LIMIT 2")]
+        
+        courses = {}
+        for display_id, (department_id, code) in enumerate([
+            (dept_a, "A101"), (dept_a, "A102"), (dept_a, "A103"), (dept_a, "A104"),
+            (dept_b, "B101"), (dept_b, "B102"), (dept_b, "B103"),
+        ], start=1):
+            cursor.execute("""
+                INSERT INTO courses (display_id, department_id, code, name)
+                VALUES (?, ?, ?, ?)
+            """, (display_id, department_id, code, f"Course {code}"))
+            courses[code] = cursor.lastrowid
+        
+        rooms = {}
+        for display_id, (code, rows, cols, seats) in enumerate([
+            ("R1", 1, 2, 2), ("R2", 1, 1, 1), ("R3", 3, 2, 2), ("R4", 3, 2, 2),
+        ], start=1):
+            cursor.execute("""
+                INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (display_id, dept_a, code, f"Room {code}", rows * cols * seats, rows, cols, seats))
+            rooms[code] = cursor.lastrowid
+        
+        students = []
+        for i in range(2):
+            cursor.execute("""
+                INSERT INTO students (display_id, department_id, student_no, name)
+                VALUES (?, ?, ?, ?)
+            """, (i + 1, dept_a, f"A{i:04d}", f"Audit Student {i}"))
+            students.append(cursor.lastrowid)
+        cursor.executemany("INSERT INTO student_courses (student_id, course_id) VALUES (?, ?)", [
+            (students[0], courses["A101"]), (students[0], courses["A102"]), (students[0], courses["A103"]),
+            (students[1], courses["A102"]), (students[1], courses["A104"]),
+        ])
+        
+        for display_id, (code, start_time, room) in enumerate([
+            ("A101", "09:00", "R1"), ("A102", "09:00", "R2"), ("A103", "13:00", "R3"), ("A104", "16:00", "R3"),
+            ("B101", "09:00", "R1"), ("B102", "13:00", "R4"), ("B103", "13:00", "R4"),
+        ], start=1):
+            department_id = dept_a if code.startswith("A") else dept_b
+            cursor.execute("""
+                INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+                VALUES (?, ?, ?, '2026-01-05', ?, 60)
+            """, (display_id, courses[code], department_id, start_time))
+            cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)",
+                           (cursor.lastrowid, rooms[room]))
+    
+    return dept_a, dept_b
+
+def test_department_audit():
+    """A department audit reports each kind of problem once"""
+    print("\nTesting department audit...")
+    dept_a, _ = setup_test_database()
+    report = audit_schedule(dept_a)
+    
+    assert report["exam_count"] == 4
+    
+    assert len(report["student_clashes"]) == 1
+    clash = report["student_clashes"][0]
+    assert (clash["student_no"], clash["start_time"]) == ("A0000", "09:00")
+    assert sorted(clash["courses"]) == ["A101", "A102"]
+    print("✓ Student clash found")
+    
+    assert len(report["room_conflicts"]) == 1
+    conflict = report["room_conflicts"][0]
+    assert (conflict["classroom"], conflict["start_time"]) == ("Room R1", "09:00")
+    assert sorted(conflict["courses"]) == ["A101", "B101"]
+    print("✓ Room shared with another department found double-booked")
+    
+    assert len(report["capacity_shortfalls"]) == 1
+    shortfall = report["capacity_shortfalls"][0]
+    assert (shortfall["course_code"], shortfall["students"], shortfall["capacity"]) == ("A102", 2, 1)
+    print("✓ Capacity shortfall found")
+    
+    assert len(report["heavy_days"]) == 1
+    heavy = report["heavy_days"][0]
+    assert (heavy["student_no"], heavy["exam_count"]) == ("A0000", 3)
+    assert audit_schedule(dept_a, heavy_day_threshold=4)["heavy_days"] == []
+    print("✓ Heavy day found")
+
+def test_all_departments_audit():
+    """Without a department every double-booked room is reported"""
+    print("\nTesting audit of all departments...")
+    setup_test_database()
+    report = audit_schedule()
+    
+    assert report["exam_count"] == 7
+    assert [(c["classroom"], c["start_time"]) for c in report["room_conflicts"]] == [
+        ("Room R1", "09:00"), ("Room R4", "13:00")
+    ]
+    print(f"✓ {len(report['room_conflicts'])} double-booked rooms found")
+
+def main():
+    print("=" * 70)
+    print("SCHEDULE AUDIT - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Department audit", test_department_audit),
+        ("All departments audit", test_all_departments_audit),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,139 @@
+"""
+Test Script for classroom seat masks
+Checks the seat patterns that decide which seats may be used:
+1. Each named pattern keeps the expected seats
+2. Masks survive packing into a stored bitmap
+3. Effective capacity follows the pattern or the stored bitmap
+4. The seating generator never uses a masked seat
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+from src.database.db_manager import db_manager
+from src.utils.seat_masks import (build_seat_mask, pack_seat_mask, unpack_seat_mask,
+                                  effective_capacity, iter_usable_seats)
+from src.utils.seating import SeatingPlanGenerator
+
+def test_build_seat_mask():
+    """Named patterns keep the expected seats"""
+    print("\nTesting seat mask patterns...")
+    assert build_seat_mask(3, 2, 2).all()
+    
+    skip_seat = build_seat_mask(3, 2, 2, "skip_seat")
+    assert skip_seat.shape == (3, 2, 2)
+    assert skip_seat[0].tolist() == [[True, False], [True, False]]
+    
+    checkerboard = build_seat_mask(2, 2, 1, "checkerboard")
+    assert checkerboard[:, :, 0].tolist() == [[True, False], [False, True]]
+    
+    skip_row = build_seat_mask(3, 2, 2, "skip_row")
+    assert skip_row[0].all() and not skip_row[1].any() and skip_row[2].all()
+    
+    assert build_seat_mask(2, 2, 2, "unknown").all()
+    print("✓ all, skip_seat, checkerboard and skip_row masks built")
+
+def test_pack_round_trip():
+    """Stored bitmaps unpack to the same mask, also when the size is not a multiple of 8"""
+    print("\nTesting seat mask bitmaps...")
+    for shape in [(3, 2, 2), (5, 3, 1), (7, 5, 3)]:
+        mask = build_seat_mask(*shape, "checkerboard")
+        mask[0, 0, 0] = False
+        bitmap = pack_seat_mask(mask)
+        assert len(bitmap) == -(-mask.size // 8)
+        assert np.array_equal(unpack_seat_mask(bitmap, *shape), mask)
+    print("✓ Masks round-trip through packed bitmaps")
+
+def test_effective_capacity():
+    """Capacity counts usable seats from the pattern, or from a stored bitmap"""
+    print("\nTesting effective capacity...")
+    classroom = {"rows": 4, "cols": 3, "seats_per_desk": 2}
+    assert effective_capacity(classroom) == 24
+    assert effective_capacity(dict(classroom, seat_pattern="skip_seat")) == 12
+    assert effective_capacity(dict(classroom, seat_pattern="skip_row")) == 12
+    
+    mask = np.zeros((4, 3, 2), dtype=bool)
+    mask[1, 2, 1] = mask[3, 0, 0] = True
+    custom = dict(classroom, seat_pattern="skip_seat", seat_mask=pack_seat_mask(mask))
+    assert effective_capacity(custom) == 2
+    assert list(iter_usable_seats(custom)) == [(1, 2, 2), (3, 0, 1)]
+    
+    # A bitmap too short for the room is ignored in favour of the pattern
+    assert effective_capacity(dict(classroom, seat_pattern="skip_seat", seat_mask=b"\xff")) == 12
+    print("✓ Capacity follows patterns and stored bitmaps")
+
+def test_seating_skips_masked_seats():
+    """Generated seating only uses seats the mask allows"""
+    print("\nTesting seating with a seat mask...")
+    db_manager.db_path = os.path.join(tempfile.mkdtemp(), "test_seat_masks.db")
+    db_manager.initialize_database()
+    
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO courses (display_id, department_id, code, name)
+            VALUES (1, 1, 'MASK101', 'Mask Course')
+        """)
+        course_id = cursor.lastrowid
+        cursor.executemany("""
+            INSERT INTO students (display_id, department_id, student_no, name)
+            VALUES (?, 1, ?, ?)
+        """, [(i + 1, f"M{i:04d}", f"Mask Student {i}") for i in range(8)])
+        cursor.execute("INSERT INTO student_courses (student_id, course_id) SELECT id, ? FROM students", (course_id,))
+        cursor.execute("""
+            INSERT INTO classrooms (display_id, department_id, code, name, capacity, rows, cols, seats_per_desk, seat_pattern)
+            VALUES (1, 1, 'M-01', 'Mask Room', 24, 4, 3, 2, 'checkerboard')
+        """)
+        classroom_id = cursor.lastrowid
+        cursor.execute("""
+            INSERT INTO exams (display_id, course_id, department_id, date, start_time, duration)
+            VALUES (1, ?, 1, '2026-01-05', '09:00', 60)
+        """, (course_id,))
+        exam_id = cursor.lastrowid
+        cursor.execute("INSERT INTO exam_classrooms (exam_id, classroom_id) VALUES (?, ?)", (exam_id, classroom_id))
+    
+    assert SeatingPlanGenerator(exam_id).generate_seating()
+    
+    mask = build_seat_mask(4, 3, 2, "checkerboard")
+    seats = db_manager.execute_query("SELECT row, col, seat_position FROM exam_seating WHERE exam_id = ?", (exam_id,))
+    assert len(seats) == 8
+    assert all(mask[seat["row"], seat["col"], seat["seat_position"] - 1] for seat in seats)
+    print(f"✓ {len(seats)} students seated on checkerboard seats only")
+
+def main():
+    print("=" * 70)
+    print("SEAT MASKS - VERIFICATION TEST")
+    print("=" * 70)
+    
+    tests = [
+        ("Seat mask patterns", test_build_seat_mask),
+        ("Bitmap round trip", test_pack_round_trip),
+        ("Effective capacity", test_effective_capacity),
+        ("Seating skips masked seats", test_seating_skips_masked_seats),
+    ]
+    
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            results.append((test_name, False))
+    
+    print("\n" + "=" * 70)
+    print("TEST RESULTS")
+    print("=" * 70)
+    
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    passed = sum(1 for _, result in results if result)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)